@@ -0,0 +1,59 @@
+"""Per-request CPU cost of decoding a large `PostFeedResponse`
+
+Compares the current single-pass pipeline (`iter.request._parse_response`)
+with the previous one, which parsed the body with `response.json()` and then
+again with `model_validate_json(response.text)`.
+
+    python -m benchmarks.bench_decode [posts]
+"""
+import json
+import sys
+import timeit
+
+from requests import Response
+
+from iter.models.base import Error
+from iter.models.responses import PostFeedResponse
+from iter.request import _parse_response, loads
+
+from benchmarks.payloads import post_feed
+
+
+def make_response(body: bytes) -> Response:
+    res = Response()
+    res.status_code = 200
+    res._content = body
+    res.headers['Content-Type'] = 'application/json'
+    return res
+
+def legacy_parse(response, response_schema):
+    data = response.json()
+    if isinstance(data, dict) and data.get('error'):
+        return Error.model_validate_json(response.text)
+    response.raise_for_status()
+    return response_schema.model_validate_json(response.text)
+
+def bench(func, body: bytes, number: int) -> float:
+    """Mean microseconds per call"""
+    return timeit.timeit(lambda: func(make_response(body), PostFeedResponse), number=number) / number * 1e6
+
+def main():
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else [20, 100, 500]
+    results = []
+    for size in sizes:
+        body = json.dumps(post_feed(size)).encode()
+        number = max(5, 2000 // size)
+        legacy = bench(legacy_parse, body, number)
+        current = bench(_parse_response, body, number)
+        results.append({
+            'posts': size,
+            'body_bytes': len(body),
+            'legacy_us': round(legacy, 1),
+            'single_pass_us': round(current, 1),
+            'speedup': round(legacy / current, 2),
+        })
+    print(json.dumps({'json_backend': loads.__module__, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
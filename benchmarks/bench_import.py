@@ -0,0 +1,74 @@
+"""Startup cost of `import iter` and `Client()`, for short-lived workers
+
+Runs `python -X importtime -c "import iter"` in fresh interpreters and
+reports the total import time, the slowest modules (by their own and by
+cumulative time) and whether optional heavy dependencies were imported,
+which they should not be until used. `Client()` is timed with and without
+`lazy_me` against a `FakeServer`.
+
+    python -m benchmarks.bench_import [runs]
+"""
+import json
+import statistics
+import subprocess
+import sys
+import timeit
+from typing import Dict, List, Tuple
+
+# imported only by the features that need them
+LAZY_MODULES = ('DrissionPage', 'iter.manual_auth', 'iter.async_client', 'httpx')
+
+
+def importtime(statement: str = 'import iter') -> Dict[str, Tuple[int, int]]:
+    """`-X importtime` of `statement` in a new interpreter: module -> (self_us, cumulative_us)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(own), int(cumulative))
+    return modules
+
+
+def top(modules: Dict[str, Tuple[int, int]], key: int, n: int = 10) -> List[dict]:
+    slowest = sorted(modules.items(), key=lambda item: item[1][key], reverse=True)[:n]
+    return [{'module': name, 'self_ms': round(own / 1e3, 2), 'cumulative_ms': round(cumulative / 1e3, 2)} for name, (own, cumulative) in slowest]
+
+
+def bench_client() -> Dict[str, float]:
+    from iter import Client
+    from iter.fake_server import FakeServer
+
+    server = FakeServer()
+    token, cookies = server.login()
+    transport = server.transport()
+
+    def construct(lazy_me: bool):
+        return Client(token=token, cookies=cookies, session_file=None, use_manual_login=False, transport=transport, base_url=server.base_url, lazy_me=lazy_me)
+
+    return {
+        'eager_me_us': round(min(timeit.repeat(lambda: construct(False), number=20, repeat=3)) / 20 * 1e6, 1),
+        'lazy_me_us': round(min(timeit.repeat(lambda: construct(True), number=20, repeat=3)) / 20 * 1e6, 1),
+    }
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    samples = [importtime() for _ in range(runs)]
+    totals = [modules['iter'][1] / 1e3 for modules in samples]
+    # the run with the median total is representative of the per-module times
+    median = sorted(samples, key=lambda modules: modules['iter'][1])[runs // 2]
+    report = {
+        'import_iter_ms': {'best': round(min(totals), 2), 'median': round(statistics.median(totals), 2), 'runs': runs},
+        'modules_imported': len(median),
+        'lazy_modules_imported': [name for name in LAZY_MODULES if name in median],
+        'slowest_self': top(median, 0),
+        'slowest_cumulative': top(median, 1),
+        'client': bench_client(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Synthetic API payloads shaped like real ITD responses"""
+from uuid import uuid4
+
+
+def user(i: int = 0) -> dict:
+    return {
+        'id': str(uuid4()),
+        'username': f'user_{i}',
+        'displayName': f'User {i}',
+        'avatar': '🦈',
+        'verified': i % 3 == 0,
+        'followersCount': i * 7,
+    }
+
+def attachment(i: int = 0) -> dict:
+    return {
+        'id': str(uuid4()),
+        'type': 'image',
+        'url': f'https://cdn.example.com/{i}.png',
+        'thumbnailUrl': f'https://cdn.example.com/{i}_thumb.png',
+        'width': 1280,
+        'height': 720,
+        'filename': f'{i}.png',
+        'mimeType': 'image/png',
+        'size': 123456,
+        'createdAt': '2026-01-30T12:58:14.228+03',
+    }
+
+def comment(i: int = 0, replies: int = 0) -> dict:
+    return {
+        'id': str(uuid4()),
+        'content': f'Comment number {i} ' * 4,
+        'author': user(i),
+        'likesCount': i,
+        'repliesCount': replies,
+        'isLiked': False,
+        'createdAt': '2026-01-30T12:58:14.228Z',
+        'attachments': [],
+        'replies': [comment(i * 100 + j) for j in range(replies)],
+    }
+
+def post(i: int = 0) -> dict:
+    content = f'Post *{i}* with _formatting_ and a [link](https://example.com) ' * 5
+    return {
+        'id': str(uuid4()),
+        'content': content,
+        'author': user(i),
+        'attachments': [attachment(i * 10 + j) for j in range(i % 4)],
+        'spans': [{'type': 'bold', 'offset': 5, 'length': 1}, {'type': 'link', 'offset': 30, 'length': 4, 'url': 'https://example.com'}],
+        'likesCount': i * 3,
+        'commentsCount': i,
+        'repostsCount': 0,
+        'viewsCount': i * 42,
+        'createdAt': '2026-01-30T12:58:14.228+03',
+        'isLiked': bool(i % 2),
+        'wallRecipientId': None,
+        'poll': None,
+    }
+
+def post_feed(n: int) -> dict:
+    return {'data': {'posts': [post(i) for i in range(n)], 'pagination': {'limit': n, 'nextCursor': '42', 'hasMore': True}}}
+
+def comments(n: int, replies: int = 3) -> dict:
+    return {'data': {'comments': [comment(i, replies) for i in range(n)], 'total': n, 'hasMore': True, 'nextCursor': n}}
+
+def user_list(n: int) -> dict:
+    return {'data': {'users': [user(i) for i in range(n)], 'pagination': {'page': 1, 'limit': n, 'total': n * 3, 'hasMore': True}}}
+
+def markdown(size: int) -> str:
+    """Densely formatted markdown of roughly `size` characters"""
+    chunk = '*bold* _under_ ~strike~ `mono` /italic/ !spoiler! @mention [link](https://x.y) plain text '
+    return (chunk * (size // len(chunk) + 1))[:size]
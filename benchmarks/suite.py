@@ -0,0 +1,191 @@
+"""Micro-benchmarks of the client's CPU hot paths
+
+Covers markdown parsing, response model validation, `validate_datetime`, the
+per-request overhead of `fetch` on an in-process transport and the cost of
+importing `iter` and constructing a `Client` (per module import times are
+in `benchmarks.bench_import`). Results are printed (or written
+with `-o`) as JSON, so runs of different releases can be diffed.
+
+    python -m benchmarks.suite [-o results.json] [--only markdown,models] [--quick]
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from typing import Callable, Dict, List
+
+from requests import Request
+
+from benchmarks import payloads
+
+
+def measure(func: Callable[[], object], min_time: float = 0.2, repeat: int = 5) -> Dict[str, float]:
+    """Microseconds per call: best and median of `repeat` runs of about `min_time` seconds each"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    runs = [t / number * 1e6 for t in timer.repeat(repeat, number)]
+    return {'best_us': round(min(runs), 2), 'median_us': round(statistics.median(runs), 2), 'loops': number}
+
+
+def bench_markdown(quick: bool) -> List[dict]:
+    from iter.md import parse_markdown
+
+    sizes = [100, 1_000, 10_000] if quick else [100, 1_000, 10_000, 100_000]
+    results = []
+    for size in sizes:
+        text = payloads.markdown(size)
+        results.append({'name': 'md.parse_markdown', 'bytes': len(text.encode()), **measure(lambda: parse_markdown(text), repeat=3)})
+    return results
+
+
+def bench_models(quick: bool) -> List[dict]:
+    from iter.models.responses import CommentsResponse, PostFeedResponse, UserListResponse
+
+    cases = [
+        (PostFeedResponse, payloads.post_feed),
+        (CommentsResponse, payloads.comments),
+        (UserListResponse, payloads.user_list),
+    ]
+    results = []
+    for model, payload in cases:
+        for n in ([20, 100] if quick else [20, 100, 1000]):
+            body = json.dumps(payload(n)).encode()
+            results.append({
+                'name': f'{model.__name__}.model_validate_json',
+                'items': n,
+                'bytes': len(body),
+                **measure(lambda: model.model_validate_json(body), repeat=3)
+            })
+    return results
+
+
+def bench_datetime(quick: bool) -> List[dict]:
+    from iter.models.base import validate_datetime
+
+    values = {
+        'short_offset': '2026-01-30T12:58:14.228+03',
+        'full_offset': '2026-01-30T12:58:14.228+03:00',
+        'utc': '2026-01-30T12:58:14.228Z',
+    }
+    return [{'name': 'validate_datetime', 'input': label, **measure(lambda: validate_datetime(value))} for label, value in values.items()]
+
+
+def bench_fetch(quick: bool) -> List[dict]:
+    from iter import request
+    from iter.models.user import UserFull
+    from iter.request import _build_fetch_request, _parse_response, bind_client, dump_exchange, fetch
+    from iter.transport import LocalTransport, RequestsTransport
+
+    body = json.dumps({**payloads.user(1), 'createdAt': '2026-01-30T12:58:14.228Z', 'bio': 'bio ' * 20}).encode()
+    transport = LocalTransport(lambda req: (200, body, {'Content-Type': 'application/json'}))
+
+    class Bound:
+        """Bare client settings: no rate limiter or retries, only the transport"""
+        base_url = request.DEFAULT_BASE_URL
+        rate_limiter = None
+        retry_policy = None
+        single_flight = None
+        validator_cache = None
+
+    Bound.transport = transport
+    session = RequestsTransport().session
+    prepared = _build_fetch_request('token', 'get', 'users/me', {'limit': 20}, None)
+    response = transport.send(**prepared)
+
+    def full_fetch():
+        with bind_client(Bound):
+            return fetch('token', 'get', 'users/me', response_schema=UserFull)
+
+    logger = logging.getLogger('iter.request')
+    level, propagate = logger.level, logger.propagate
+    results = [
+        {'name': 'fetch.build_request', **measure(lambda: _build_fetch_request('token', 'get', 'users/me', {'limit': 20}, None))},
+        {'name': 'fetch.prepare_request', **measure(lambda: session.prepare_request(Request(**prepared)))},
+        {'name': 'fetch.local_transport_send', **measure(lambda: transport.send(**prepared))},
+        {'name': 'fetch.dump', **measure(lambda: dump_exchange(prepared, response))},
+        {'name': 'fetch.decode', 'bytes': len(body), **measure(lambda: _parse_response(response, UserFull))},
+        {'name': 'fetch.total', 'debug_log': False, **measure(full_fetch)},
+    ]
+    try:
+        # dumps are built and handed to logging, but not printed
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        handler = logging.NullHandler()
+        logger.addHandler(handler)
+        results.append({'name': 'fetch.total', 'debug_log': True, **measure(full_fetch)})
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = propagate
+    return results
+
+
+def bench_startup(quick: bool) -> List[dict]:
+    runs = 3 if quick else 7
+    code = 'import time; t = time.perf_counter(); import iter; print(time.perf_counter() - t)'
+    imports = [float(subprocess.check_output([sys.executable, '-c', code], text=True)) * 1e3 for _ in range(runs)]
+
+    from iter.fake_server import FakeServer
+
+    server = FakeServer()
+    token, cookies = server.login()
+    transport = server.transport()
+
+    from iter import Client
+
+    def construct(lazy_me: bool = False):
+        return Client(token=token, cookies=cookies, session_file=None, use_manual_login=False, transport=transport, base_url=server.base_url, lazy_me=lazy_me)
+
+    return [
+        {'name': 'import iter', 'best_ms': round(min(imports), 2), 'median_ms': round(statistics.median(imports), 2), 'runs': runs},
+        {'name': 'Client()', 'note': 'includes get_me on the fake server', **measure(construct, repeat=3)},
+        {'name': 'Client(lazy_me=True)', **measure(lambda: construct(True), repeat=3)},
+    ]
+
+
+BENCHMARKS = {
+    'markdown': bench_markdown,
+    'models': bench_models,
+    'datetime': bench_datetime,
+    'fetch': bench_fetch,
+    'startup': bench_startup,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file')
+    parser.add_argument('--only', help=f'Comma-separated groups: {", ".join(BENCHMARKS)}')
+    parser.add_argument('--quick', action='store_true', help='Smaller inputs and fewer runs')
+    args = parser.parse_args()
+
+    groups = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = set(groups) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'Unknown benchmark groups: {", ".join(sorted(unknown))}')
+
+    from iter.request import loads
+
+    report = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'json_backend': loads.__module__,
+        'timestamp': int(time.time()),
+        'results': {group: BENCHMARKS[group](args.quick) for group in groups},
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
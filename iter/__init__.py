@@ -1,4 +1,16 @@
 import logging
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 
-from iter.client import Client as Client
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+from iter.client import Client as Client
+
+if TYPE_CHECKING:
+    from iter.async_client import AsyncClient as AsyncClient
+
+def __getattr__(name: str):
+    # the async client is imported on first use, sync-only programs start faster
+    if name == 'AsyncClient':
+        from iter.async_client import AsyncClient
+        return AsyncClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
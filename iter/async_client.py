@@ -0,0 +1,1127 @@
+import asyncio
+from datetime import datetime
+from functools import wraps
+from uuid import UUID
+from typing import Iterable, Optional
+
+import verboselogs
+
+from iter import md
+from iter.client import BaseClient, _is_expired_token, _status_code
+from iter.models.user import UserPrivacyData
+from iter.request import DEFAULT_BASE_URL, bind_client, get_cookies_string, set_cookies
+from iter.ratelimit import RateLimiter
+from iter.retry import RetryPolicy
+from iter.singleflight import SingleFlight
+from iter.conditional import ValidatorCache
+from iter.session import SessionStore
+from iter.pagination import checked
+from iter.upload import MultipartUpload, Progress, Source
+from iter.transport import AsyncHttpxTransport, Transport
+from iter.routes.polls import vote
+from iter.models.media import Attachment, PollData
+from iter.routes.pins import get_pins, remove_pin, set_pin
+from iter.routes.users import get_user, update_profile, follow, unfollow, get_followers, get_following, update_privacy
+from iter.routes.etc import get_top_clans, get_who_to_follow, get_platform_status
+from iter.routes.comments import get_comments, add_comment, add_reply_comment, delete_comment, get_replies, like_comment, unlike_comment
+from iter.routes.hashtags import get_hashtags, get_posts_by_hashtag
+from iter.routes.notifications import get_notifications, mark_all_as_read, mark_as_read, mark_batch_as_read, get_unread_notifications_count, MAX_READ_BATCH
+from iter.routes.posts import create_post, get_posts, get_post, edit_post, delete_post, pin_post, repost, restore_post, view_post, get_liked_posts, get_user_posts, like_post, unlike_post
+from iter.routes.reports import report
+from iter.routes.search import search
+from iter.routes.files import delete_file, get_file, upload_file
+from iter.routes.auth import change_password, logout, refresh_token
+from iter.routes.verification import verify, get_verification_status
+
+from iter.enums import NotificationType, PostsTab, ReportTargetType, ReportTargetReason
+from iter.exceptions import (
+    NoCookie, SamePassword, InvalidOldPassword, NotFound, ValidationError, UserBanned,
+    PendingRequestExists, Forbidden, UsernameTaken, CantFollowYourself, Unauthorized,
+    CantRepostYourPost, AlreadyReposted, AlreadyReported, TooLarge, PinNotOwned, NoContent,
+    NotFoundOrForbidden, OptionsNotBelong, NotMultipleChoice,
+    RequiresVerification, InvalidFileType, NotVerified
+)
+from iter.models.base import Error
+
+logger = verboselogs.VerboseLogger(__name__)
+
+
+def refresh_on_error(func):
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        with bind_client(self):
+            if self.cookies:
+                await self._refresh_ahead()
+                token = self.token
+                try:
+                    return await func(self, *args, **kwargs)
+                except (Unauthorized, *self.transport.request_errors) as e:
+                    if not _is_expired_token(e):
+                        raise
+                    await self._refresh_expired(token)
+                    return await func(self, *args, **kwargs)
+            else:
+                return await func(self, *args, **kwargs)
+    return wrapper
+
+
+class AsyncClient(BaseClient):
+    """Asyncio version of `Client`, by default on `httpx.AsyncClient`
+
+    Every method of `Client` is available as a coroutine. All requests of one
+    client share a single connection pool, so many calls can run concurrently
+    with `asyncio.gather`:
+
+        async with AsyncClient(token='...', cookies='...') as c:
+            users = await asyncio.gather(*(c.get_user(name) for name in names))
+
+    Unlike `Client`, the current user is not requested on construction. It is
+    fetched when entering `async with` (or by awaiting `get_me`).
+    """
+    def __init__(self, token: Optional[str] = None, cookies: Optional[str] = None, session_file: Optional[str | SessionStore] = "session.json", email: Optional[str] = None, password: Optional[str] = None, use_manual_login: bool = True, max_connections: int = 100, max_keepalive_connections: int = 20, rate_limiter: RateLimiter | bool = True, retry_policy: RetryPolicy | bool = True, transport: Optional[Transport] = None, base_url: str = DEFAULT_BASE_URL, single_flight: SingleFlight | bool = True, validator_cache: ValidatorCache | bool = False, refresh_margin: float = 60):
+        """
+        Args:
+            session_file (str | SessionStore | None, optional): JSON file the token and cookies are kept in, or a `SessionStore` shared with other processes. None to not keep them. Defaults to "session.json".
+            max_connections (int, optional): Maximum open connections. Defaults to 100.
+            max_keepalive_connections (int, optional): Idle connections kept open. Defaults to 20.
+            transport (Transport | None, optional): Async transport sending the requests. An `AsyncHttpxTransport` with the limits above if None. Defaults to None.
+            base_url (str, optional): API root. Defaults to `DEFAULT_BASE_URL`.
+            single_flight (SingleFlight | bool, optional): Await identical concurrent GET requests once, False to disable. Defaults to True.
+            validator_cache (ValidatorCache | bool, optional): Revalidate repeated GET requests with ETag / Last-Modified, True for a default `ValidatorCache`. Returned models are then shared between callers. Defaults to False.
+            refresh_margin (float, optional): Refresh the access token in a background task this many seconds before its `exp`, 0 to only refresh after a 401. Defaults to 60.
+        """
+        if transport is not None and not transport.is_async:
+            raise ValueError('AsyncClient needs an async transport, e.g. AsyncHttpxTransport')
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self._refresh_lock = asyncio.Lock()
+        self._expired_lock = asyncio.Lock()
+        self._ahead: Optional[asyncio.Task] = None
+        super().__init__(token, cookies, session_file, email, password, use_manual_login, rate_limiter, retry_policy, transport, base_url, single_flight, validator_cache, refresh_margin)
+
+    def _create_transport(self):
+        return AsyncHttpxTransport(max_connections=self.max_connections, max_keepalive_connections=self.max_keepalive_connections)
+
+    async def __aenter__(self):
+        me = await self.get_me()
+        self.me = None if isinstance(me, Error) else me
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the connection pool"""
+        await self.transport.aclose()
+
+    async def _refresh_ahead(self):
+        """Renew the access token shortly before it expires, without blocking requests"""
+        left = self._expires_in()
+        if left is None:
+            return
+        token = self.token
+        if left <= 1:
+            # requests with this token would fail anyway, wait for the new one
+            await self._refresh_expired(token)
+        elif self._ahead is None or self._ahead.done():
+            self._ahead = asyncio.create_task(self._refresh_in_background(token))
+
+    async def _refresh_in_background(self, token: Optional[str]):
+        try:
+            await self._refresh_expired(token)
+        except Exception as e:
+            # the token still works until it expires, then a 401 refreshes it again
+            self._ahead_failed = token
+            logger.warning(f"Early token refresh failed: {e}")
+
+    async def _refresh_expired(self, token: Optional[str]):
+        """Refresh the expired access `token` unless another task already did"""
+        # concurrent calls fail together, one refresh is enough
+        async with self._expired_lock:
+            if self.token == token:
+                logger.notice("Access token expired or expiring, attempting refresh")
+                await self.refresh_auth()
+
+    async def refresh_auth(self):
+        """Refresh access token and update the rotated refresh cookie"""
+        if self.use_manual_login and not self.cookies:
+            return await asyncio.to_thread(self._manual_login)
+
+        token = self.token
+        # the cookie jar is rewritten during refresh, so one refresh at a time,
+        # also across processes sharing the session store
+        async with self._refresh_lock:
+            lock = self._store_lock()
+            await asyncio.to_thread(lock.__enter__)
+            try:
+                if await asyncio.to_thread(self._adopt_stored, token):
+                    return self.token
+                return await self._refresh()
+            finally:
+                lock.__exit__(None, None, None)
+
+    async def _refresh(self):
+        """Refresh request itself, called under the refresh locks"""
+        try:
+            logger.info("Refreshing access token")
+
+            set_cookies(self.cookies, self.transport, self.cookie_domain)
+
+            with bind_client(self):
+                new_token: str = await refresh_token(self.cookies)
+            self.token = new_token.replace('Bearer ', '')
+
+            self.cookies = get_cookies_string(self.transport)
+
+            self._save_session()
+
+            return self.token
+        except self.transport.request_errors as e:
+            if self.use_manual_login and _status_code(e) in [401, 403]:
+                logger.info("Refresh token expired or revoked. Manual login required")
+                return await asyncio.to_thread(self._manual_login)
+            raise e
+
+    @refresh_on_error
+    async def logout(self) -> dict:
+        """Logout from account
+
+        Raises:
+            NoCookie: No cookies
+
+        Returns:
+            dict: API response
+        """
+        if not self.cookies:
+            raise NoCookie()
+
+        res = await logout(self.cookies)
+
+        return res
+    
+    @refresh_on_error
+    async def change_password(self, old: str, new: str) -> dict:
+        """Change password
+
+        Args:
+            old (str): Old password
+            new (str): New password
+
+        Raises:
+            NoCookie: No cookie
+            SamePassword: Same passwords
+            InvalidOldPassword: Invalid old password
+
+        Returns:
+            dict: API response `{'message': 'Password changed successfully'}`
+        """
+        if not self.cookies:
+            raise NoCookie()
+
+        res = await change_password(self.cookies, self.token, old, new)
+        if isinstance(res, Error):
+            match res.code:
+                case 'SAME_PASSWORD':
+                    raise SamePassword()
+                case 'INVALID_OLD_PASSWORD':
+                    raise InvalidOldPassword()
+
+        return res
+
+
+# --- API methods ---
+
+    @refresh_on_error
+    async def get_user(self, username: str):
+        """Get user
+
+        Args:
+            username (str): username or "me"
+
+        Raises:
+            NotFound: User not found
+            UserBanned: User banned
+        """
+        user = await get_user(self.token, username)
+        if isinstance(user, Error):
+            match user.code:
+                case 'NOT_FOUND':
+                    raise NotFound('User')
+                case 'USER_BLOCKED':
+                    raise UserBanned()
+
+        return user
+
+    @refresh_on_error
+    async def get_me(self):
+        """Get current user (me)
+        """
+        return await self.get_user('me')
+
+    @refresh_on_error
+    async def update_profile(self, username: str | None = None, display_name: str | None = None, bio: str | None = None, banner_id: UUID | None = None):
+        """Update profile
+
+        Args:
+            username (str | None, optional): username. Defaults to None.
+            display_name (str | None, optional): Display name. Defaults to None.
+            bio (str | None, optional): Biography (about). Defaults to None.
+            banner_id (UUID | None, optional): Banner UUID. Defaults to None.
+
+        Raises:
+            ValidationError: Validation error
+            UsernameTaken: Username is already taken
+            InvalidFileType: Banner cannot be animated
+        """
+        res = await update_profile(self.token, bio, display_name, username, banner_id)
+        if isinstance(res, Error):
+            match res.code:
+                case 'VALIDATION_ERROR':
+                    if hasattr(res, 'data') and 'found' in res.data:
+                         raise ValidationError(*list(res.data['found'].items())[0])
+                case 'USERNAME_TAKEN':
+                    raise UsernameTaken()
+                case 'PHONE_VERIFICATION_REQUIRED':
+                    raise NotVerified(self.me.id if self.me else None)
+                case 'GIF_REQUIRES_VERIFICATION':
+                    raise RequiresVerification('GIF banner')
+            if res.message == 'Баннер может быть только изображением':
+                raise InvalidFileType()
+                
+        
+        return res
+
+    @refresh_on_error
+    async def update_privacy(self, privacy: UserPrivacyData):
+        """Update privacy settings
+
+        Args:
+            privacy (UserPrivacyData): Privacy data
+        """
+        res = await update_privacy(self.token, privacy)
+
+        return res
+
+    @refresh_on_error
+    async def follow(self, username: str):
+        """Follow user
+
+        Args:
+            username (str): username
+
+        Raises:
+            NotFound: User not found
+            CantFollowYourself: Cannot follow yourself
+        """
+        res = await follow(self.token, username)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFound('User')
+                case 'VALIDATION_ERROR':
+                    raise CantFollowYourself()
+        
+        return res
+
+    @refresh_on_error
+    async def unfollow(self, username: str):
+        """Unfollow user
+
+        Args:
+            username (str): username
+
+        Raises:
+            NotFound: User not found
+        """
+        res = await unfollow(self.token, username)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFound('User')
+
+        return res
+
+    @refresh_on_error
+    async def get_followers(self, username: str, limit: int = 30, page: int = 1):
+        """Get user followers
+
+        Args:
+            username (str): username
+            limit (int, optional): Limit. Defaults to 30.
+            page (int, optional): Page (increment by 1 for pagination). Defaults to 1.
+
+        Raises:
+            NotFound: User not found
+        """
+        res = await get_followers(self.token, username, limit, page)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFound('User')
+
+        return res
+
+    @refresh_on_error
+    async def get_following(self, username: str, limit: int = 30, page: int = 1):
+        """Get user followings
+
+        Args:
+            username (str): username
+            limit (int, optional): Limit. Defaults to 30.
+            page (int, optional): Page (increment by 1 for pagination). Defaults to 1.
+
+        Raises:
+            NotFound: User not found
+        """
+        res = await get_following(self.token, username, limit, page)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFound('User')
+
+        return res
+
+    @refresh_on_error
+    async def verify(self, file_url: str):
+        """Send verification request
+
+        Args:
+            file_url (str): Video URL
+
+        Raises:
+            PendingRequestExists: Request already pending
+        """
+        res = await verify(self.token, file_url)
+        if isinstance(res, Error):
+            match res.code:
+                case 'PENDING_REQUEST_EXISTS':
+                    raise PendingRequestExists()
+        
+        return res
+
+    @refresh_on_error
+    async def get_verification_status(self):
+        """Get verification status
+        """
+        res = await get_verification_status(self.token)
+
+        return res
+
+    @refresh_on_error
+    async def get_who_to_follow(self):
+        """Get list of popular users (who to follow)
+        """
+        res = await get_who_to_follow(self.token)          
+
+        return res
+
+    @refresh_on_error
+    async def get_top_clans(self):
+        """Get top clans
+        """
+        res = await get_top_clans(self.token)
+
+        return res
+
+    @refresh_on_error
+    async def get_platform_status(self):
+        """Get platform status
+        """
+        res = await get_platform_status(self.token)
+
+        return res
+
+    @refresh_on_error
+    async def add_comment(self, post_id: UUID, content: str, attachment_ids: list[UUID] = [], parse_md: bool = True):
+        """Add comment
+
+        Args:
+            post_id (str): Post UUID
+            content (str): Content
+            attachment_ids (list[UUID]): List of attached file UUIDs
+            reply_comment_id (UUID | None, optional): Reply comment ID. Defaults to None.
+            parse_md (bool, optional): Parse md in content
+
+        Raises:
+            ValidationError: Validation error
+            NotFound: Post not found
+            NotVerified: Phone authorrizatioon required
+        """
+        formated = None
+        if parse_md:
+            formated, content = md.parse_markdown(content)
+
+        res = await add_comment(self.token, post_id, content, attachment_ids, formated)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFound('Post')
+                case 'VALIDATION_ERROR':
+                    if hasattr(res, 'data') and 'found' in res.data:
+                         raise ValidationError(*list(res.data['found'].items())[0])
+                case 'PHONE_VERIFICATION_REQUIRED':
+                    raise NotVerified(self.me.id if self.me else None)
+
+        return res
+
+    @refresh_on_error
+    async def add_reply_comment(self, comment_id: UUID, content: str, author_id: UUID | None = None, attachment_ids: list[UUID] = [], parse_md: bool = True):
+        """Add reply comment
+
+        Args:
+            comment_id (str): Comment UUID
+            content (str): Content
+            author_id (UUID | None, optional): ID of the user who sent the comment. Defaults to None.
+            attachment_ids (list[UUID]): List of attached file UUIDs
+
+        Raises:
+            ValidationError: Validation error
+            NotFound: User or Comment not found
+            NoContent: Validation error resulting in no content
+            NotVerified: Phone authorrizatioon required
+        """
+        formated = None
+        if parse_md:
+            formated, content = md.parse_markdown(content)
+
+        res = await add_reply_comment(self.token, comment_id, content, author_id, attachment_ids, formated)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFound('Comment')
+                case 'VALIDATION_ERROR':
+                    if hasattr(res, 'data') and 'found' in res.data:
+                         raise ValidationError(*list(res.data['found'].items())[0])
+                    raise NoContent()
+                case 'FAILED_QUERY':
+                    raise NotFound('User')
+                case 'PHONE_VERIFICATION_REQUIRED':
+                    raise NotVerified(self.me.id if self.me else None)
+        
+        return res
+
+    @refresh_on_error
+    async def get_comments(self, post_id: UUID, limit: int = 20, cursor: int = 0, sort: str = 'popular'):
+        """Get list of comments
+
+        Args:
+            post_id (UUID): Post UUID
+            limit (int, optional): Limit. Defaults to 20.
+            cursor (int, optional): Cursor (how many to skip). Defaults to 0.
+            sort (str, optional): Sorting. Defaults to 'popular'.
+
+        Raises:
+            NotFound: Post not found
+        """
+        res = await get_comments(self.token, post_id, limit, cursor, sort)
+        if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
+            or getattr(res, 'status_code', None) == 404): raise NotFound("Post")
+
+        return res
+
+    @refresh_on_error
+    async def get_replies(self, comment_id: UUID, limit: int = 50, page: int = 1, sort: str = 'oldest'):
+        """Get list of replies
+
+        Args:
+            comment_id (UUID): Comment UUID
+            limit (int, optional): Limit. Defaults to 50.
+            page (int, optional): Page. Defaults to 1.
+            sort (str, optional): Sorting. Defaults to 'oldest'.
+
+        Raises:
+            NotFound: Comment not found
+        """
+        res = await get_replies(self.token, comment_id, page, limit, sort)
+        if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
+            or getattr(res, 'status_code', None) == 404): raise NotFound("User")
+
+        return res
+
+    @refresh_on_error
+    async def like_comment(self, id: UUID):
+        """Like comment
+
+        Args:
+            id (UUID): Comment UUID
+
+        Raises:
+            NotFound: Comment not found
+        """
+        res = await like_comment(self.token, id)
+        if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
+            or getattr(res, 'status_code', None) == 404): raise NotFound("Comment")
+
+        return res
+
+    @refresh_on_error
+    async def unlike_comment(self, id: UUID):
+        """Unlike comment
+
+        Args:
+            id (UUID): Comment UUID
+
+        Raises:
+            NotFound: Comment not found
+        """
+        res = await unlike_comment(self.token, id)
+        if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
+            or getattr(res, 'status_code', None) == 404): raise NotFound("Comment")
+
+
+        return res
+
+    @refresh_on_error
+    async def delete_comment(self, id: UUID):
+        """Delete comment
+
+        Args:
+            id (UUID): Comment UUID
+
+        Raises:
+            NotFound: Comment not found
+            Forbidden: No permission to delete
+        """
+        res = await delete_comment(self.token, id)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFound('Comment')
+                case 'FORBIDDEN':
+                    raise Forbidden('delete comment')
+
+    @refresh_on_error
+    async def get_hashtags(self, limit: int = 10):
+        """Get list of popular hashtags
+
+        Args:
+            limit (int, optional): Limit. Defaults to 10.
+        """
+        res = await get_hashtags(self.token, limit)
+
+        return res
+
+    @refresh_on_error
+    async def get_posts_by_hashtag(self, hashtag: str, limit: int = 20, cursor: UUID | None = None):
+        """Get posts by hashtag
+
+        Args:
+            hashtag (str): Hashtag (without #)
+            limit (int, optional): Limit. Defaults to 20.
+            cursor (UUID | None, optional): Cursor (UUID of the last post to fetch data after). Defaults to None.
+        """
+        res = await get_posts_by_hashtag(self.token, hashtag, limit, cursor)
+
+        return res
+
+    @refresh_on_error
+    async def get_notifications(self, limit: int = 20, offset: int = 0, type: NotificationType | None = None):
+        """Get notifications
+
+        Args:
+            limit (int, optional): Limit. Defaults to 20.
+            offset (int, optional): Offset. Defaults to 0.
+            type (NotificationType | None, optional): Only notifications of this type, None for all. Defaults to None.
+        """
+        res = await get_notifications(self.token, limit, offset, type.value if type else None)
+
+        return res
+
+    @refresh_on_error
+    async def mark_as_read(self, id: UUID):
+        """Mark notification as read
+
+        Args:
+            id (UUID): Notification UUID
+        """
+        res = await mark_as_read(self.token, id)
+        return res
+
+    @refresh_on_error
+    async def mark_batch_as_read(self, ids: Iterable[UUID]) -> int:
+        """Mark notifications as read, up to `MAX_READ_BATCH` per request
+
+        Args:
+            ids (Iterable[UUID]): Notification UUIDs
+
+        Raises:
+            RequestFailed: The API returned an error
+
+        Returns:
+            int: Notifications that were unread
+        """
+        ids = list(dict.fromkeys(ids))
+        count = 0
+        for start in range(0, len(ids), MAX_READ_BATCH):
+            res = await mark_batch_as_read(self.token, ids[start:start + MAX_READ_BATCH])
+            count += checked(res).count
+        return count
+
+    @refresh_on_error
+    async def mark_all_as_read(self):
+        """Mark all notifications as read"""
+        await mark_all_as_read(self.token)
+
+    @refresh_on_error
+    async def get_unread_notifications_count(self):
+        """Get unread notifications count
+        """
+        res = await get_unread_notifications_count(self.token)
+
+        return res
+
+    @refresh_on_error
+    async def create_post(self, content: str, wall_recipient_id: UUID | None = None, attach_ids: list[UUID] = [], poll: PollData | None = None, parse_md: bool = True):
+        """Create post
+
+        Args:
+            content (str): Content
+            wall_recipient_id (UUID | None, optional): UUID of the user (to create a post on their wall). Defaults to None.
+            attach_ids (list[UUID], optional): UUIDs of attachments. Defaults to [].
+
+        Raises:
+            NotFound: User not found
+            ValidationError: Validation error
+            RequiresVerification: You need verification to use video
+            Forbidden: You don`t own some files
+        """
+
+        formated = None
+        if parse_md:
+            formated, content = md.parse_markdown(content)
+
+        res = await create_post(self.token, content, wall_recipient_id, attach_ids, formated, poll.poll if poll else None)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFound('Wall recipient')
+                case 'VALIDATION_ERROR':
+                    if hasattr(res, 'data') and 'found' in res.data:
+                         raise ValidationError(*list(res.data['found'].items())[0])
+                case 'PHONE_VERIFICATION_REQUIRED':
+                    raise NotVerified(self.me.id if self.me else None)
+                case 'VIDEO_REQUIRES_VERIFICATION':
+                    raise RequiresVerification('Video')
+                
+            if res.message == 'Некоторые файлы не принадлежат вам':
+                raise Forbidden('post - some files not owned')
+        
+        return res
+
+    @refresh_on_error
+    async def get_posts(self, cursor: int = 0, tab: PostsTab = PostsTab.POPULAR, limit: int = 20):
+        """Get list of posts
+
+        Args:
+            cursor (int, optional): Page. Defaults to 0.
+            tab (PostsTab, optional): Tab (popular or following). Defaults to PostsTab.POPULAR.
+            limit (int, optional): Limit. Defaults to 20.
+        """
+        res = await get_posts(self.token, limit=limit, cursor=cursor, tab=tab.value)
+
+        return res
+
+    @refresh_on_error
+    async def get_post(self, id: UUID):
+        """Get post
+
+        Args:
+            id (UUID): Post UUID
+
+        Raises:
+            NotFound: Post not found
+        """
+        res = await get_post(self.token, id)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFound('Post')
+
+        return res
+
+    @refresh_on_error
+    async def edit_post(self, id: UUID, content: str):
+        """Edit post
+
+        Args:
+            id (UUID): Post UUID
+            content (str): Content
+
+        Raises:
+            NotFound: Post not found
+            Forbidden: No access
+            ValidationError: Validation error
+        """
+        res = await edit_post(self.token, id, content)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFound('Post')
+                case 'FORBIDDEN':
+                    raise Forbidden('edit post')
+                case 'VALIDATION_ERROR':
+                    if hasattr(res, 'found'):
+                         raise ValidationError(*list(res.found.items())[0])
+
+        return res
+
+    @refresh_on_error
+    async def delete_post(self, id: UUID):
+        """Delete post
+
+        Args:
+            id (UUID): Post UUID
+
+        Raises:
+            NotFound: Post not found
+            Forbidden: No access
+        """
+        res = await delete_post(self.token, id)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFound('Post')
+                case 'FORBIDDEN':
+                    raise Forbidden('delete post')
+
+    @refresh_on_error
+    async def pin_post(self, id: UUID):
+        """Pin post
+
+        Args:
+            id (UUID): Post UUID
+
+        Raises:
+            NotFound: Post not found
+            Forbidden: No access
+        """
+        res = await pin_post(self.token, id)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFound('Post')
+                case 'FORBIDDEN':
+                    raise Forbidden('pin post')
+
+    @refresh_on_error
+    async def repost(self, id: UUID, content: str | None = None):
+        """Repost post
+
+        Args:
+            id (UUID): Post UUID
+            content (str | None, optional): Content (additional comment). Defaults to None.
+
+        Raises:
+            NotFound: Post not found
+            AlreadyReposted: Post already reposted
+            CantRepostYourPost: Cannot repost your own post
+            ValidationError: Validation error
+        """
+        res = await repost(self.token, id, content)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFound('Post')
+                case 'CONFLICT':
+                    raise AlreadyReposted()
+                case 'VALIDATION_ERROR':
+                    if hasattr(res, 'message') and res.message == 'Cannot repost your own post':
+                        raise CantRepostYourPost()
+                    if hasattr(res, 'data') and 'found' in res.data:
+                         raise ValidationError(*list(res.data['found'].items())[0])
+                case 'PHONE_VERIFICATION_REQUIRED':
+                    raise NotVerified(self.me.id if self.me else None)
+
+        return res
+
+    @refresh_on_error
+    async def view_post(self, id: UUID):
+        """View post
+
+        Args:
+            id (UUID): Post UUID
+
+        Raises:
+            NotFound: Post not found
+        """
+        res = await view_post(self.token, id)
+        if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
+            or getattr(res, 'status_code', None) == 404): raise NotFound("Post")
+
+    @refresh_on_error
+    async def get_user_posts(self, username_or_id: str | UUID, limit: int = 20, cursor: datetime | None = None):
+        """Get user posts
+
+        Args:
+            username_or_id (str | UUID): UUID or username of the user
+            limit (int, optional): Limit. Defaults to 20.
+            cursor (datetime | None, optional): Offset (next_cursor). Defaults to None.
+
+        Raises:
+            NotFound: User not found
+        """
+        res = await get_user_posts(self.token, username_or_id, limit, cursor)
+        if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
+            or getattr(res, 'status_code', None) == 404): raise NotFound("User")
+
+        return res
+
+    @refresh_on_error
+    async def get_liked_posts(self, username_or_id: str | UUID, limit: int = 20, cursor: datetime | None = None):
+        """Get liked posts by user
+
+        Args:
+            username_or_id (str | UUID): UUID or username of the user
+            limit (int, optional): Limit. Defaults to 20.
+            cursor (datetime | None, optional): Offset (next_cursor). Defaults to None.
+
+        Raises:
+            NotFound: User not found
+        """
+        res = await get_liked_posts(self.token, username_or_id, limit, cursor)
+        if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
+            or getattr(res, 'status_code', None) == 404): raise NotFound("User")
+
+        return res
+
+    @refresh_on_error
+    async def report(self, id: UUID, type: ReportTargetType = ReportTargetType.POST, reason: ReportTargetReason = ReportTargetReason.OTHER, description: str | None = None):
+        """Send report
+
+        Args:
+            id (UUID): Target UUID
+            type (ReportTargetType, optional): Target type (post/user/comment). Defaults to ReportTargetType.POST.
+            reason (ReportTargetReason, optional): Reason. Defaults to ReportTargetReason.OTHER.
+            description (str | None, optional): Description. Defaults to None.
+
+        Raises:
+            NotFound: Target not found
+            AlreadyReported: Report already sent
+            ValidationError: Validation error
+        """
+        res = await report(self.token, id, type.value, reason.value, description)
+        if isinstance(res, Error):
+            match res.code:
+                case 'VALIDATION_ERROR':
+                    # Heuristics based on error message if precise code isn't available
+                    msg = getattr(res, 'message', '') or ''
+                    if 'не найден' in msg or 'not found' in msg:
+                        raise NotFound(type.value.title())
+                    if 'Вы уже отправляли жалобу' in msg or 'already reported' in msg:
+                        raise AlreadyReported(type.value.title())
+                    
+                    if hasattr(res, 'data') and 'found' in res.data:
+                         raise ValidationError(*list(res.data['found'].items())[-1])
+        
+        return res
+
+    @refresh_on_error
+    async def search(self, query: str, user_limit: int = 5, hashtag_limit: int = 5):
+        """Search users and hashtags
+
+        Args:
+            query (str): Query
+            user_limit (int, optional): User limit. Defaults to 5.
+            hashtag_limit (int, optional): Hashtag limit. Defaults to 5.
+
+        Raises:
+            TooLarge: Query too long
+        """
+        res = await search(self.token, query, user_limit, hashtag_limit)
+        if isinstance(res, Error):
+            match res.code:
+                case 'URI_TOO_LONG': # or appropriate code for 414
+                    raise TooLarge()
+        
+        return res
+
+    @refresh_on_error
+    async def search_user(self, query: str, limit: int = 5):
+        """Search users
+
+        Args:
+            query (str): Query
+            limit (int, optional): Limit. Defaults to 5.
+        """
+        return await self.search(query, limit, 1)
+
+    @refresh_on_error
+    async def search_hashtag(self, query: str, limit: int = 5):
+        """Search hashtags
+
+        Args:
+            query (str): Query
+            limit (int, optional): Limit. Defaults to 5.
+        """
+        return await self.search(query, 1, limit)
+
+    async def upload_file(self, name: str, data: Source | None = None, progress: Progress | None = None):
+        """Upload file
+
+        The file is streamed in chunks, so memory use does not grow with its size.
+
+        Args:
+            name (str): Filename, or the path of the file if `data` is None
+            data (str | PathLike | bytes | BinaryIO | None, optional): Path, content or binary file object. Defaults to None.
+            progress (Callable[[int, int], None] | None, optional): Called with `(bytes sent, total bytes)` while uploading. Defaults to None.
+        """
+        upload = MultipartUpload(name if data is None else data, name if data is not None else None, progress=progress)
+        return await self._upload_file(upload)
+
+    @refresh_on_error
+    async def _upload_file(self, upload: MultipartUpload):
+        # the upload is created once, so a retry after a token refresh rewinds the same file
+        return await upload_file(self.token, upload.filename, upload)
+
+    async def update_banner(self, name: str):
+        """Update banner (shortcut for upload_file + update_profile)
+
+        Args:
+            name (str): Path of the image
+        """
+        file_id = (await self.upload_file(name)).id
+        return await self.update_profile(banner_id=file_id)
+
+    @refresh_on_error
+    async def restore_post(self, post_id: UUID):
+        """Restore deleted post
+
+        Args:
+            post_id: Post UUID
+        """
+        await restore_post(self.token, post_id)
+
+    @refresh_on_error
+    async def like_post(self, post_id: UUID):
+        """Like post
+
+        Args:
+            post_id (UUID): Post UUID
+
+        Raises:
+            NotFound: Post not found
+        """
+        res = await like_post(self.token, post_id)
+        if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
+            or getattr(res, 'status_code', None) == 404): raise NotFound("Post")
+
+        return res
+
+    @refresh_on_error
+    async def unlike_post(self, post_id: UUID):
+        """Unlike post
+
+        Args:
+            post_id (UUID): Post UUID
+
+        Raises:
+            NotFound: Post not found
+        """
+        res = await unlike_post(self.token, post_id)
+        if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
+            or getattr(res, 'status_code', None) == 404): raise NotFound("Post")
+
+        return res
+
+    @refresh_on_error
+    async def get_pins(self):
+        """Get list of pins
+        """
+        res = await get_pins(self.token)
+
+        return res
+
+    @refresh_on_error
+    async def remove_pin(self):
+        """Remove pin"""
+        await remove_pin(self.token)
+
+    @refresh_on_error
+    async def set_pin(self, slug: str):
+        """Set pin
+
+        Args:
+            slug (str): Pin slug
+
+        Raises:
+            ValidationError: Validation error
+            PinNotOwned: Pin not owned
+        """
+        res = await set_pin(self.token, slug)
+        if isinstance(res, Error):
+            match res.code:
+                case 'VALIDATION_ERROR':
+                    if hasattr(res, 'found'):
+                        raise ValidationError(*list(res.found.items())[0])
+                case 'PIN_NOT_OWNED':
+                    raise PinNotOwned(slug)
+        
+        return res
+    
+    @refresh_on_error
+    async def vote(self, ids: list[UUID]):
+        """Vote for options in poll
+
+        Args:
+            ids (list[UUID]): UUIDs of options in poll
+
+        Raises:
+            EmptyOptions: Пустые варианты
+            NotFound: Пост не найден или в посте нет опроса
+            OptionsNotBelong: Неверные варианты (варинты не пренадлежат опросу)
+            NotMultipleChoice: Можно выбрать только 1 вариант (для опросов, где не разрешены несколько ответов)
+        """
+
+        res = await vote(self.token, ids)
+        if isinstance(res, Error):
+            match (res.code, res.message):
+                case ('NOT_FOUND', 'Один или несколько вариантов не принадлежат этому опросу'):
+                    raise NotFound('Poll')
+                case ('NOT_FOUND', _):
+                    raise NotFound('Post')
+                case ('VALIDATION_ERROR', 'Один или несколько вариантов не принадлежат этому опросу'):
+                    raise OptionsNotBelong()
+                case ('VALIDATION_ERROR', 'В этом опросе можно выбрать только один вариант'):
+                    raise NotMultipleChoice()
+
+
+        return res
+    
+    @refresh_on_error
+    async def get_file(self, id: UUID) -> Attachment:
+        """Получить файл
+
+        Args:
+            id (UUID): UUID файла
+
+        Raises:
+            NotFoundOrForbidden: Файл не найден или нет доступа
+
+        Returns:
+            File: Файл
+        """
+        res = await get_file(self.token, id)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFoundOrForbidden('File')
+
+        return res
+
+    @refresh_on_error
+    async def delete_file(self, id: UUID) -> Attachment:
+        """Удалить файл
+
+        Args:
+            id (UUID): UUID файла
+
+        Raises:
+            NotFound: Файл не найден
+        """
+        res = await delete_file(self.token, id)
+        if isinstance(res, Error):
+            match res.code:
+                case 'NOT_FOUND':
+                    raise NotFound('File')
+
+        return res
\ No newline at end of file
@@ -0,0 +1,91 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Tuple
+
+Call = Callable[[], Any] | Tuple[Any, ...]
+
+
+def _run(call: Call) -> Any:
+    if callable(call):
+        return call()
+    func, *args = call
+    return func(*args)
+
+def _collect(futures: List[Future], return_exceptions: bool) -> List[Any]:
+    results = []
+    for future in futures:
+        error = future.exception()
+        if error is not None and not return_exceptions:
+            for f in futures:
+                f.cancel()
+            raise error
+        results.append(error if error is not None else future.result())
+    return results
+
+
+class Batch:
+    """Runs many calls of one `Client` concurrently on a bounded thread pool
+
+    Every `Client` method is available on the batch and returns a `Future`
+    instead of the result:
+
+        with client.batch(max_workers=8) as batch:
+            for id in ids:
+                batch.get_post(id)
+        posts = batch.results() # in call order, exceptions in place of failed calls
+
+    Calls go through the client as usual, so they share its rate limiter,
+    connection pool and token refresh.
+    """
+    def __init__(self, client, max_workers: int = 8):
+        """
+        Args:
+            client (Client): Client making the calls.
+            max_workers (int, optional): Calls running at the same time. Defaults to 8.
+        """
+        self.client = client
+        self.futures: List[Future] = []
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='iter-batch')
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> Future:
+        """Run `func(*args, **kwargs)` as part of the batch"""
+        future = self._executor.submit(func, *args, **kwargs)
+        self.futures.append(future)
+        return future
+
+    def __getattr__(self, name: str) -> Callable[..., Future]:
+        method = getattr(self.client, name)
+        if not callable(method) or name.startswith('_'):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.submit(method, *args, **kwargs)
+
+    def results(self, return_exceptions: bool = True) -> List[Any]:
+        """Wait for all calls and return their results in call order
+
+        Args:
+            return_exceptions (bool, optional): Put the exception of a failed call in its place, raise the first one if False. Defaults to True.
+        """
+        return _collect(self.futures, return_exceptions)
+
+    def close(self, cancel: bool = False):
+        """Wait for running calls and stop the workers, dropping queued calls if `cancel`"""
+        self._executor.shutdown(wait=True, cancel_futures=cancel)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        # an exception in the block cancels calls that have not started
+        self.close(cancel=exc_type is not None)
+
+
+def gather(calls: Iterable[Call], max_workers: int = 8, return_exceptions: bool = True) -> List[Any]:
+    """Run calls on a thread pool and return their results in order
+
+    Args:
+        calls (Iterable[Callable | tuple]): Zero-argument callables or `(func, *args)` tuples, e.g. `(client.get_post, id)`.
+        max_workers (int, optional): Calls running at the same time. Defaults to 8.
+        return_exceptions (bool, optional): Put the exception of a failed call in its place, raise the first one if False. Defaults to True.
+    """
+    calls = list(calls)
+    with ThreadPoolExecutor(min(max_workers, len(calls)) or 1, thread_name_prefix='iter-batch') as executor:
+        return _collect([executor.submit(_run, call) for call in calls], return_exceptions)
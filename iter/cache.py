@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+from pydantic import BaseModel
+
+# seconds an entity is served from the cache, per kind
+DEFAULT_TTL: Dict[str, float] = {
+    'user': 60,
+    'post': 30,
+    'file': 600,
+    'comments': 15,
+    'replies': 15,
+}
+
+
+class EntityCache:
+    """Size-bounded LRU of entities returned by `Client`, with a TTL per kind
+
+    Kinds are `user`, `post`, `file`, `comments` and `replies`. The client's
+    mutating calls keep entries consistent: likes and follows patch the
+    counters of cached entities from the server's answer, edits and deletions
+    evict them. Changes made by other clients are only seen after the TTL.
+    Cached models are shared between callers, patches replace them with
+    copies instead of modifying them.
+    """
+    def __init__(self, max_entries: int = 4096, ttl: Optional[Mapping[str, float]] = None):
+        """
+        Args:
+            max_entries (int, optional): Entities kept, least recently used are dropped first. Defaults to 4096.
+            ttl (Mapping[str, float] | None, optional): Seconds per kind, merged over `DEFAULT_TTL`. Defaults to None.
+        """
+        self.max_entries = max_entries
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        self._entries: OrderedDict[Tuple[str, Hashable], Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0 # entries dropped by the LRU, TTL or invalidation
+
+    def get(self, kind: str, key: Hashable) -> Any:
+        """Cached entity, None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[(kind, key)]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end((kind, key))
+            self.hits += 1
+            return entry[1]
+
+    def put(self, kind: str, key: Hashable, value: Any):
+        with self._lock:
+            self._set(kind, key, value, time.monotonic() + self.ttl.get(kind, 0))
+
+    def _set(self, kind: str, key: Hashable, value: Any, expires: float):
+        self._entries[(kind, key)] = (expires, value)
+        self._entries.move_to_end((kind, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def patch(self, kind: str, key: Hashable, **fields):
+        """Replace a cached model with a copy updated with `fields`, keeping its expiry"""
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is not None and isinstance(entry[1], BaseModel):
+                self._entries[(kind, key)] = (entry[0], entry[1].model_copy(update=fields))
+
+    def replace(self, kind: str, func: Callable[[Hashable, Any], Any]):
+        """Replace cached entities of `kind` for which `func(key, value)` returns a new value
+
+        `func` returns None to keep the entity, or `EVICT` to drop it.
+        """
+        with self._lock:
+            for (entry_kind, key), (expires, value) in list(self._entries.items()):
+                if entry_kind != kind:
+                    continue
+                new = func(key, value)
+                if new is EVICT:
+                    del self._entries[(kind, key)]
+                    self.evictions += 1
+                elif new is not None:
+                    self._entries[(kind, key)] = (expires, new)
+
+    def evict(self, kind: str, key: Hashable):
+        with self._lock:
+            if self._entries.pop((kind, key), None) is not None:
+                self.evictions += 1
+
+    def evict_where(self, kind: str, predicate: Callable[[Hashable], bool]):
+        """Evict entities of `kind` whose key matches `predicate`"""
+        self.replace(kind, lambda key, value: EVICT if predicate(key) else None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+# returned by a `EntityCache.replace` callback to drop the entity
+EVICT = object()
+
+
+def patch_comment(response: Any, comment_id: str, **fields) -> Any:
+    """Copy of a comments / replies response with comment `comment_id` updated, None if it has no such comment"""
+    comments = getattr(response, 'comments', None)
+    if comments is None:
+        comments = getattr(response, 'replies', None)
+        attr = 'replies'
+    else:
+        attr = 'comments'
+    if not comments:
+        return None
+
+    changed = False
+    patched = []
+    for comment in comments:
+        if str(comment.id) == comment_id:
+            comment = comment.model_copy(update=fields)
+            changed = True
+        elif comment.replies:
+            replies = [r.model_copy(update=fields) if str(r.id) == comment_id else r for r in comment.replies]
+            if any(a is not b for a, b in zip(replies, comment.replies)):
+                comment = comment.model_copy(update={'replies': replies})
+                changed = True
+        patched.append(comment)
+    return response.model_copy(update={attr: patched}) if changed else None
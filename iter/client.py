@@ -1,29 +1,47 @@
 from datetime import datetime
 from requests import Response
+from pydantic import BaseModel
 import logging, verboselogs
 from uuid import UUID
 
 from iter import md
-from iter.models.user import UserPrivacyData
-from iter.request import get_cookies_string, set_cookies
+from iter.models.user import User, UserFull, UserPrivacyData
+from iter.models.post import Comment, Post
+from iter.models.notification import Notification
+from iter.request import DEFAULT_BASE_URL, bind_client, get_cookies_string, set_cookies
+from iter.ratelimit import RateLimiter
+from iter.retry import RetryPolicy
+from iter.singleflight import SingleFlight
+from iter.conditional import ValidatorCache
+from iter.cache import EVICT, EntityCache, patch_comment
+from iter.batch import Batch, Call, gather
+from iter.upload import MultipartUpload, Progress, Source, Upload
+from iter.upload_cache import UploadCache, content_key
+from iter.session import FileSessionStore, Session, SessionStore
+from iter.snapshot import Snapshot
+from iter.pagination import Pager, checked
+from iter.transport import RequestsTransport, Transport
 from iter.routes.polls import vote
 from iter.models.media import Attachment, PollData
 from iter.routes.pins import get_pins, remove_pin, set_pin
 
 logger = verboselogs.VerboseLogger(__name__)
 
+import base64
 import json
-import os
-from _io import BufferedReader
-from typing import cast, Optional
+import threading
+import time
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Any, Callable, cast, Iterable, Optional
+from urllib.parse import urlsplit
 
-from requests.exceptions import ConnectionError, HTTPError
 # Import your routes
 from iter.routes.users import get_user, update_profile, follow, unfollow, get_followers, get_following, update_privacy
 from iter.routes.etc import get_top_clans, get_who_to_follow, get_platform_status
 from iter.routes.comments import get_comments, add_comment, add_reply_comment, delete_comment, get_replies, like_comment, unlike_comment
 from iter.routes.hashtags import get_hashtags, get_posts_by_hashtag
-from iter.routes.notifications import get_notifications, mark_all_as_read, mark_as_read, get_unread_notifications_count
+from iter.routes.notifications import get_notifications, mark_all_as_read, mark_as_read, mark_batch_as_read, get_unread_notifications_count, MAX_READ_BATCH
 from iter.routes.posts import create_post, get_posts, get_post, edit_post, delete_post, pin_post, repost, restore_post, view_post, get_liked_posts, get_user_posts, like_post, unlike_post
 from iter.routes.reports import report
 from iter.routes.search import search
@@ -31,52 +49,126 @@ from iter.routes.files import delete_file, get_file, upload_file
 from iter.routes.auth import refresh_token, change_password, logout
 from iter.routes.verification import verify, get_verification_status
 
-from iter.manual_auth import auth
 
-from iter.enums import PostsTab, ReportTargetType, ReportTargetReason
+from iter.enums import NotificationType, PostsTab, ReportTargetType, ReportTargetReason
 from iter.exceptions import (
     NoCookie, NoAuthData, SamePassword, InvalidOldPassword, NotFound, ValidationError, UserBanned,
     PendingRequestExists, Forbidden, UsernameTaken, CantFollowYourself, Unauthorized,
     CantRepostYourPost, AlreadyReposted, AlreadyReported, TooLarge, PinNotOwned, NoContent,
     AlreadyFollowing, NotFoundOrForbidden, OptionsNotBelong, NotMultipleChoice, EmptyOptions,
-    RequiresVerification, InvalidFileType, EditExpired, NotVerified
+    RequiresVerification, InvalidFileType, EditExpired, NotVerified, UploadFailed
 )
 from iter.models.base import Error
+from iter.models.responses import FollowResponse, LikeResponse, PinsListResponse, PlatformStatusResponse
+
+def _status_code(e: Exception) -> Optional[int]:
+    # HTTP errors of requests and httpx both carry the response
+    response = getattr(e, 'response', None)
+    return response.status_code if response is not None else None
+
+def _is_expired_token(e: Exception) -> bool:
+    # network errors and 5xx are retried by RetryPolicy, only 401 means the token expired
+    return isinstance(e, Unauthorized) or _status_code(e) == 401
+
+_NOT_LOADED: Any = object() # `me` of a `lazy_me` client before its first access
+
+@lru_cache(maxsize=16)
+def _token_claims(token: Optional[str]) -> dict:
+    """Claims of a JWT access token (not verified), empty if it is not one"""
+    if not token or token.count('.') != 2:
+        return {}
+    payload = token.split('.')[1]
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    except ValueError:
+        return {}
+    return claims if isinstance(claims, dict) else {}
+
+def _token_expiry(token: Optional[str]) -> Optional[float]:
+    """`exp` claim (Unix time) of a JWT access token, None if it has none"""
+    try:
+        return float(_token_claims(token)['exp'])
+    except (KeyError, TypeError, ValueError):
+        return None
 
 def refresh_on_error(func):
     def wrapper(self, *args, **kwargs):
-        if self.cookies:
-            try:
-                return func(self, *args, **kwargs)
-            except (Unauthorized, ConnectionError, HTTPError):
-                logger.notice("Access token expired, attempting refresh")
-                self.refresh_auth()
+        with bind_client(self):
+            if self.cookies:
+                self._refresh_ahead()
+                token = self.token
+                try:
+                    return func(self, *args, **kwargs)
+                except (Unauthorized, *self.transport.request_errors) as e:
+                    if not _is_expired_token(e):
+                        raise
+                    self._refresh_expired(token)
+                    return func(self, *args, **kwargs)
+            else:
                 return func(self, *args, **kwargs)
-        else:
-            return func(self, *args, **kwargs)
     return wrapper
 
 
-class Client:
-    def __init__(self, token: Optional[str] = None, cookies: Optional[str] = None, session_file: Optional[str] = "session.json", email: Optional[str] = None, password: Optional[str] = None, use_manual_login: bool = True):
+class BaseClient:
+    """Authentication and session handling shared by `Client` and `AsyncClient`"""
+    def __init__(self, token: Optional[str] = None, cookies: Optional[str] = None, session_file: Optional[str | SessionStore] = "session.json", email: Optional[str] = None, password: Optional[str] = None, use_manual_login: bool = True, rate_limiter: RateLimiter | bool = True, retry_policy: RetryPolicy | bool = True, transport: Optional[Transport] = None, base_url: str = DEFAULT_BASE_URL, single_flight: SingleFlight | bool = True, validator_cache: ValidatorCache | bool = False, refresh_margin: float = 60):
         self.token = token.replace('Bearer ', '') if token else None
         self.cookies = cookies
 
         self.use_manual_login = use_manual_login
-        self.session_file = session_file
+        if isinstance(session_file, SessionStore):
+            self.session_store: Optional[SessionStore] = session_file
+            self.session_file = None
+        else:
+            self.session_store = FileSessionStore(session_file) if session_file else None
+            self.session_file = session_file
+        self._from_store = False # the session was loaded from `session_store`
 
         self.email = email
         self.password = password
+        self.refresh_margin = refresh_margin
+        self._ahead_failed: Optional[str] = None # token whose early refresh failed
+
+        self.base_url = base_url if base_url.endswith('/') else base_url + '/'
+        self.transport = transport if transport is not None else self._create_transport()
+        self.me = None
+
+        if rate_limiter is True:
+            rate_limiter = RateLimiter()
+        self.rate_limiter = rate_limiter or None
+
+        if retry_policy is True:
+            retry_policy = RetryPolicy()
+        self.retry_policy = retry_policy or None
+
+        if single_flight is True:
+            single_flight = SingleFlight()
+        self.single_flight = single_flight or None
+
+        if validator_cache is True:
+            validator_cache = ValidatorCache()
+        self.validator_cache = validator_cache or None
 
         is_auth = self.auth()
         if not is_auth:
             raise NoAuthData
-        
-        me = self.get_me()
-        self.me = None if isinstance(me, Error) else me
+
+    def _create_transport(self) -> Transport:
+        """Transport used for this client's requests when none is passed"""
+        raise NotImplementedError
+
+    def _expires_in(self) -> Optional[float]:
+        """Seconds until the access token expires if it is due for an early refresh, else None"""
+        if not self.refresh_margin or self.token == self._ahead_failed:
+            return None
+        expiry = _token_expiry(self.token)
+        if expiry is None:
+            return None
+        left = expiry - time.time()
+        return left if left <= self.refresh_margin else None
 
     def auth(self):
-        if (self.session_file 
+        if (self.session_store
             and not self.token 
             and not self.cookies):
             self._load_session()
@@ -88,26 +180,67 @@ class Client:
 
         return self.token and self.cookies
 
+    @property
+    def cookie_domain(self) -> str:
+        """Domain the refresh cookie belongs to"""
+        return cast(str, urlsplit(self.base_url).hostname)
+
     def _save_session(self):
-        """Saves current credentials to a JSON file."""
-        data = {
-            "token": self.token,
-            "cookies": self.cookies
-        }
-        with open(self.session_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
+        """Saves current credentials to the session store."""
+        if not self.session_store:
+            return
+        self.session_store.save({'token': self.token, 'cookies': self.cookies})
 
     def _load_session(self):
-        """Loads credentials from the session file."""
-        if os.path.exists(self.session_file):
-            try:
-                with open(self.session_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.token = data.get("token")
-                    self.cookies = data.get("cookies")
-                    set_cookies(self.cookies)
-            except Exception as e:
-                logger.warning(f"Failed to load session file: {e}")
+        """Loads credentials from the session store."""
+        try:
+            data = self.session_store.load()
+        except Exception as e:
+            logger.warning(f"Failed to load session file: {e}")
+            return
+        if data:
+            self._use_session(data)
+            self._from_store = True
+
+    def _use_session(self, data: Session):
+        self.token = data.get('token')
+        self.cookies = data.get('cookies')
+        set_cookies(self.cookies, self.transport, self.cookie_domain)
+
+    def _adopt_stored(self, token: Optional[str]) -> bool:
+        """Take the session another client (e.g. another process) saved after refreshing `token`
+
+        Call with the store locked. The stored session is only taken if it
+        belongs to the same account and is not older than `token`.
+        """
+        if not self.session_store:
+            return False
+        try:
+            data = self.session_store.load()
+        except Exception as e:
+            logger.warning(f"Failed to load session file: {e}")
+            return False
+        stored = data.get('token') if data else None
+        if not stored or stored == token:
+            return False
+
+        ours, theirs = _token_claims(token), _token_claims(stored)
+        if 'sub' in ours and 'sub' in theirs:
+            if ours['sub'] != theirs['sub']:
+                return False
+        elif not self._from_store:
+            return False # can not tell whose session it is
+        # `exp` has whole seconds: a token refreshed in the same second has the same one
+        if _token_expiry(stored) is not None and _token_expiry(token) is not None and _token_expiry(stored) < _token_expiry(token):
+            return False
+
+        logger.info("Using the access token refreshed by another client")
+        self._use_session(data)
+        return True
+
+    def _store_lock(self):
+        """Lock of the session store, shared with other processes using it"""
+        return self.session_store.lock() if self.session_store else nullcontext()
 
     def _manual_login(self):
         """Triggers the manual authentication flow."""
@@ -115,6 +248,8 @@ class Client:
             logger.info('Manual login canceled')
             return None
         logger.info("Starting manual login")
+        # pulls in DrissionPage, so only imported when a browser login is needed
+        from iter.manual_auth import auth
         new_data = auth(self.email, self.password)
         if new_data:
             self.token = new_data.get('token', '').replace('Bearer ', '')
@@ -127,29 +262,243 @@ class Client:
             return self.token
         logger.warning("Manual login failed")
 
+
+class Client(BaseClient):
+    def __init__(self, token: Optional[str] = None, cookies: Optional[str] = None, session_file: Optional[str | SessionStore] = "session.json", email: Optional[str] = None, password: Optional[str] = None, use_manual_login: bool = True, pool_size: int = 10, max_connections_per_host: int = 32, keep_alive: bool = True, rate_limiter: RateLimiter | bool = True, retry_policy: RetryPolicy | bool = True, transport: Optional[Transport] = None, base_url: str = DEFAULT_BASE_URL, single_flight: SingleFlight | bool = True, validator_cache: ValidatorCache | bool = False, entity_cache: EntityCache | bool = False, upload_cache: UploadCache | str | None = None, refresh_margin: float = 60, lazy_me: bool = False, snapshot: Snapshot | str | bool = False):
+        """
+        Every client has its own connection pool and cookie jar, so several
+        clients (accounts) can be used in one process, and one client can be
+        shared between threads.
+
+        Args:
+            session_file (str | SessionStore | None, optional): JSON file the token and cookies are kept in, or a `SessionStore` (e.g. `SqliteSessionStore`) shared with other processes. None to not keep them. Defaults to "session.json".
+            pool_size (int, optional): Number of per-host connection pools. Defaults to 10.
+            max_connections_per_host (int, optional): Connections kept open to one host, set it to at least the number of threads using the client. Defaults to 32.
+            keep_alive (bool, optional): Reuse connections between requests. Defaults to True.
+            rate_limiter (RateLimiter | bool, optional): Limiter that delays requests to stay under the API rate limits. Pass an instance to share it between clients of one account, or False to disable. Defaults to True.
+            retry_policy (RetryPolicy | bool, optional): Retries of failed GET and idempotent requests, False to disable. Defaults to True.
+            transport (Transport | None, optional): Sends the requests, e.g. `HttpxTransport()` for HTTP/2. A `RequestsTransport` with the pool settings above if None. Defaults to None.
+            base_url (str, optional): API root, e.g. the URL of a `FakeServer`. Defaults to `DEFAULT_BASE_URL`.
+            single_flight (SingleFlight | bool, optional): Send identical GET requests made at the same time (e.g. by several threads) once and share the result, False to disable. Defaults to True.
+            validator_cache (ValidatorCache | bool, optional): Send repeated GET requests as conditional ones and reuse the parsed model when the response is unchanged, True for a default `ValidatorCache`. Callers then share the returned models and must not modify them. Defaults to False.
+            entity_cache (EntityCache | bool, optional): Serve `get_user`, `get_post`, `get_file`, `get_comments` and `get_replies` from memory until their TTL expires, True for an `EntityCache` with default TTLs. Defaults to False.
+            upload_cache (UploadCache | str | None, optional): Reuse the attachment of identical content instead of uploading it again, a path to keep the cache in a file. Defaults to None.
+            refresh_margin (float, optional): Refresh the access token in the background this many seconds before its `exp`, 0 to only refresh after a 401. Defaults to 60.
+            lazy_me (bool, optional): Fetch `me` on first access instead of in the constructor, which then makes no requests. Defaults to False.
+            snapshot (Snapshot | str | bool, optional): Start from `me`, pins, platform and verification status saved by an earlier run and revalidate them in the background, True to keep the snapshot next to the session file, a path to keep it there. Defaults to False.
+        """
+        if transport is not None and transport.is_async:
+            raise ValueError('Client needs a sync transport, use AsyncClient for async ones')
+        self.pool_size = pool_size
+        self.max_connections_per_host = max_connections_per_host
+        self.keep_alive = keep_alive
+        self._refresh_lock = threading.RLock()
+        self._ahead: Optional[threading.Thread] = None
+        self._ahead_lock = threading.Lock()
+
+        if entity_cache is True:
+            entity_cache = EntityCache()
+        self.entity_cache = entity_cache or None
+        self.upload_cache = UploadCache(upload_cache) if isinstance(upload_cache, str) else upload_cache
+
+        super().__init__(token, cookies, session_file, email, password, use_manual_login, rate_limiter, retry_policy, transport, base_url, single_flight, validator_cache, refresh_margin)
+
+        self._me = _NOT_LOADED
+        self._revalidator: Optional[threading.Thread] = None
+        self.snapshot = self._open_snapshot(snapshot)
+        if self.snapshot is not None:
+            me = self.snapshot.get('me', UserFull)
+            if me is not None:
+                self._me = me
+
+        if not lazy_me and self._me is _NOT_LOADED:
+            self._load_me()
+        if self.snapshot is not None:
+            self._revalidator = threading.Thread(target=self._revalidate, name='iter-snapshot', daemon=True)
+            self._revalidator.start()
+
+    def _load_me(self) -> Optional[User]:
+        me = self.get_me()
+        if isinstance(me, Error):
+            self._me = None
+            return None
+        previous = self._me
+        self._me = me
+        if self.snapshot is not None:
+            if isinstance(previous, User) and previous.id != me.id:
+                self.snapshot.clear() # the snapshot was of another account
+            self._snapshot('me', me)
+        return me
+
+    def _open_snapshot(self, snapshot: Snapshot | str | bool) -> Optional[Snapshot]:
+        if snapshot is True:
+            path = self.session_store.snapshot_path() if self.session_store else None
+            if path is None:
+                raise ValueError('snapshot=True needs a session file to keep the snapshot next to, pass a path instead')
+            snapshot = Snapshot(path)
+        elif isinstance(snapshot, str):
+            snapshot = Snapshot(snapshot)
+        if not snapshot:
+            return None
+        snapshot.load(_token_claims(self.token).get('sub'))
+        return snapshot
+
+    def _revalidate(self):
+        """Fetch the snapshot items that are due again, in the background after starting"""
+        stale = self.snapshot.stale()
+        for name in stale:
+            try:
+                if name == 'me':
+                    self._load_me()
+                else:
+                    getattr(self, f'get_{name}')()
+            except Exception as e:
+                logger.warning(f"Failed to revalidate {name} of the snapshot: {e}")
+        if stale:
+            self.snapshot.save()
+
+    def _snapshotted(self, name: str, schema: Optional[type[BaseModel]] = None) -> Any:
+        # the revalidating thread always asks the server
+        if self.snapshot is None or threading.current_thread() is self._revalidator:
+            return None
+        return self.snapshot.get(name, schema)
+
+    def _snapshot(self, name: str, value):
+        if self.snapshot is not None and self.snapshot.put(name, value) and threading.current_thread() is not self._revalidator:
+            self.snapshot.save()
+
+    def _unsnapshot(self, name: str):
+        if self.snapshot is not None:
+            self.snapshot.discard(name)
+            self.snapshot.save()
+
+    @property
+    def me(self) -> Optional[User]:
+        """Current user, None if it could not be fetched"""
+        if self._me is _NOT_LOADED:
+            return self._load_me()
+        return self._me
+
+    @me.setter
+    def me(self, value: Optional[User]):
+        self._me = value
+
+    def _create_transport(self):
+        return RequestsTransport(self.pool_size, self.max_connections_per_host, self.keep_alive)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close pooled connections"""
+        self.transport.close()
+
+    def batch(self, max_workers: int = 8) -> Batch:
+        """Run many calls of this client concurrently, see `Batch`
+
+        Args:
+            max_workers (int, optional): Calls running at the same time, at most `max_connections_per_host` is useful. Defaults to 8.
+        """
+        return Batch(self, max_workers)
+
+    def gather(self, calls: Iterable[Call], max_workers: int = 8, return_exceptions: bool = True) -> list:
+        """Run calls concurrently and return their results in order
+
+            posts = client.gather((client.get_post, id) for id in ids)
+
+        Args:
+            calls (Iterable[Callable | tuple]): Zero-argument callables or `(method, *args)` tuples.
+            max_workers (int, optional): Calls running at the same time. Defaults to 8.
+            return_exceptions (bool, optional): Put the exception of a failed call in its place, raise the first one if False. Defaults to True.
+        """
+        return gather(calls, max_workers, return_exceptions)
+
+    def _cached(self, kind: str, key):
+        return self.entity_cache.get(kind, key) if self.entity_cache else None
+
+    def _cache(self, kind: str, key, value):
+        if self.entity_cache and not isinstance(value, (Error, Response)):
+            self.entity_cache.put(kind, key, value)
+
+    def _update_follow(self, username: str, res):
+        if self.entity_cache and isinstance(res, FollowResponse):
+            self.entity_cache.patch('user', username.lower(), followers_count=res.followers_count, is_following=res.following)
+            self.entity_cache.evict('user', 'me')
+
+    def _invalidate_comment(self, comment_id: UUID, **fields):
+        """Patch a cached comment with `fields`, or evict the lists holding it if none are given"""
+        if not self.entity_cache:
+            return
+        id = str(comment_id)
+        for kind in ('comments', 'replies'):
+            if fields:
+                self.entity_cache.replace(kind, lambda key, value: patch_comment(value, id, **fields))
+            else:
+                self.entity_cache.replace(kind, lambda key, value: EVICT if patch_comment(value, id) is not None else None)
+
+    def _refresh_ahead(self):
+        """Renew the access token shortly before it expires, without blocking requests"""
+        left = self._expires_in()
+        if left is None:
+            return
+        token = self.token
+        if left <= 1:
+            # requests with this token would fail anyway, wait for the new one
+            self._refresh_expired(token)
+            return
+        with self._ahead_lock:
+            if self._ahead is None or not self._ahead.is_alive():
+                self._ahead = threading.Thread(target=self._refresh_in_background, args=(token,), name='iter-refresh', daemon=True)
+                self._ahead.start()
+
+    def _refresh_in_background(self, token: Optional[str]):
+        try:
+            self._refresh_expired(token)
+        except Exception as e:
+            # the token still works until it expires, then a 401 refreshes it again
+            self._ahead_failed = token
+            logger.warning(f"Early token refresh failed: {e}")
+
+    def _refresh_expired(self, token: Optional[str]):
+        """Refresh the expired access `token` unless another thread already did"""
+        # concurrent calls (e.g. in a batch) fail together, one refresh is enough
+        with self._refresh_lock:
+            if self.token == token:
+                logger.notice("Access token expired or expiring, attempting refresh")
+                self.refresh_auth()
+
     def refresh_auth(self):
         """Refresh access token and update the rotated refresh cookie"""
         if self.use_manual_login and not self.cookies:
             return self._manual_login()
 
-        try:
-            logger.info("Refreshing access token")
+        token = self.token
+        # the cookie jar is rewritten during refresh, so one refresh at a time,
+        # also across processes sharing the session store
+        with self._refresh_lock, bind_client(self), self._store_lock():
+            if self._adopt_stored(token):
+                return self.token
+            try:
+                logger.info("Refreshing access token")
 
-            set_cookies(self.cookies)
+                set_cookies(self.cookies, self.transport, self.cookie_domain)
 
-            new_token: str = refresh_token(self.cookies)
-            self.token = new_token.replace('Bearer ', '')
+                new_token: str = refresh_token(self.cookies)
+                self.token = new_token.replace('Bearer ', '')
 
-            self.cookies = get_cookies_string()
+                self.cookies = get_cookies_string(self.transport)
 
-            self._save_session()
-            
-            return self.token
-        except HTTPError as e:
-            if self.use_manual_login and e.response is not None and e.response.status_code in [401, 403]:
-                logger.info("Refresh token expired or revoked. Manual login required")
-                return self._manual_login()
-            raise e
+                self._save_session()
+                
+                return self.token
+            except self.transport.request_errors as e:
+                if self.use_manual_login and _status_code(e) in [401, 403]:
+                    logger.info("Refresh token expired or revoked. Manual login required")
+                    return self._manual_login()
+                raise e
         
     @refresh_on_error
     def logout(self) -> dict:
@@ -211,6 +560,10 @@ class Client:
             NotFound: User not found
             UserBanned: User banned
         """
+        user = self._cached('user', username.lower())
+        if user is not None:
+            return user
+
         user = get_user(self.token, username)
         if isinstance(user, Error):
             match user.code:
@@ -219,6 +572,7 @@ class Client:
                 case 'USER_BLOCKED':
                     raise UserBanned()
 
+        self._cache('user', username.lower(), user)
         return user
 
     @refresh_on_error
@@ -256,8 +610,12 @@ class Client:
                     raise RequiresVerification('GIF banner')
             if res.message == 'Баннер может быть только изображением':
                 raise InvalidFileType()
-                
-        
+
+        if self.entity_cache:
+            self.entity_cache.evict('user', 'me')
+            if self.me and self.me.username:
+                self.entity_cache.evict('user', self.me.username.lower())
+        self._unsnapshot('me')
         return res
 
     @refresh_on_error
@@ -289,7 +647,8 @@ class Client:
                     raise NotFound('User')
                 case 'VALIDATION_ERROR':
                     raise CantFollowYourself()
-        
+
+        self._update_follow(username, res)
         return res
 
     @refresh_on_error
@@ -308,6 +667,7 @@ class Client:
                 case 'NOT_FOUND':
                     raise NotFound('User')
 
+        self._update_follow(username, res)
         return res
 
     @refresh_on_error
@@ -330,6 +690,25 @@ class Client:
 
         return res
 
+    def iter_followers(self, username: str, limit: int | None = None, page_size: int | None = None, prefetch: bool = True, position: str | None = None) -> Pager[User]:
+        """Iterate over all followers of a user, page by page
+
+        Args:
+            username (str): username
+            limit (int | None, optional): Items to return at most, None for all. Defaults to None.
+            page_size (int | None, optional): Items per request. Defaults to 30, the `get_followers` default.
+            prefetch (bool, optional): Request the next page while the current one is consumed. Defaults to True.
+            position (str | None, optional): `position` of an earlier iterator to continue from. Defaults to None.
+
+        Raises:
+            NotFound: User not found
+        """
+        def fetch_page(page: int, size: int):
+            res = checked(self.get_followers(username, size, page))
+            return res.users, page + 1 if res.pagination.hasMore else None
+
+        return Pager(fetch_page, 1, limit, page_size or 30, prefetch, position, fixed_page_size=True)
+
     @refresh_on_error
     def get_following(self, username: str, limit: int = 30, page: int = 1):
         """Get user followings
@@ -350,6 +729,25 @@ class Client:
 
         return res
 
+    def iter_following(self, username: str, limit: int | None = None, page_size: int | None = None, prefetch: bool = True, position: str | None = None) -> Pager[User]:
+        """Iterate over all followed users of a user, page by page
+
+        Args:
+            username (str): username
+            limit (int | None, optional): Items to return at most, None for all. Defaults to None.
+            page_size (int | None, optional): Items per request. Defaults to 30, the `get_following` default.
+            prefetch (bool, optional): Request the next page while the current one is consumed. Defaults to True.
+            position (str | None, optional): `position` of an earlier iterator to continue from. Defaults to None.
+
+        Raises:
+            NotFound: User not found
+        """
+        def fetch_page(page: int, size: int):
+            res = checked(self.get_following(username, size, page))
+            return res.users, page + 1 if res.pagination.hasMore else None
+
+        return Pager(fetch_page, 1, limit, page_size or 30, prefetch, position, fixed_page_size=True)
+
     @refresh_on_error
     def verify(self, file_url: str):
         """Send verification request
@@ -366,14 +764,19 @@ class Client:
                 case 'PENDING_REQUEST_EXISTS':
                     raise PendingRequestExists()
         
+        self._unsnapshot('verification_status')
         return res
 
     @refresh_on_error
     def get_verification_status(self):
         """Get verification status
         """
-        res = get_verification_status(self.token)
+        res = self._snapshotted('verification_status')
+        if res is not None:
+            return res
 
+        res = get_verification_status(self.token)
+        self._snapshot('verification_status', res)
         return res
 
     @refresh_on_error
@@ -396,8 +799,12 @@ class Client:
     def get_platform_status(self):
         """Get platform status
         """
-        res = get_platform_status(self.token)
+        res = self._snapshotted('platform_status', PlatformStatusResponse)
+        if res is not None:
+            return res
 
+        res = get_platform_status(self.token)
+        self._snapshot('platform_status', res)
         return res
 
     @refresh_on_error
@@ -431,6 +838,9 @@ class Client:
                 case 'PHONE_VERIFICATION_REQUIRED':
                     raise NotVerified(self.me.id if self.me else None)
 
+        if self.entity_cache:
+            self.entity_cache.evict('post', str(post_id))
+            self.entity_cache.evict_where('comments', lambda key: key[0] == str(post_id))
         return res
 
     @refresh_on_error
@@ -466,7 +876,10 @@ class Client:
                     raise NotFound('User')
                 case 'PHONE_VERIFICATION_REQUIRED':
                     raise NotVerified(self.me.id if self.me else None)
-        
+
+        if self.entity_cache:
+            self.entity_cache.evict_where('replies', lambda key: key[0] == str(comment_id))
+            self._invalidate_comment(comment_id)
         return res
 
     @refresh_on_error
@@ -482,12 +895,38 @@ class Client:
         Raises:
             NotFound: Post not found
         """
+        key = (str(post_id), limit, cursor, sort)
+        cached = self._cached('comments', key)
+        if cached is not None:
+            return cached
+
         res = get_comments(self.token, post_id, limit, cursor, sort)
         if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
             or (isinstance(res, Response) and res.status_code == 404)): raise NotFound("Post")
 
+        self._cache('comments', key, res)
         return res
 
+    def iter_comments(self, post_id: UUID, sort: str = 'popular', limit: int | None = None, page_size: int | None = None, prefetch: bool = True, position: str | None = None) -> Pager[Comment]:
+        """Iterate over all comments of a post, page by page
+
+        Args:
+            post_id (UUID): Post UUID
+            sort (str, optional): Sorting. Defaults to 'popular'.
+            limit (int | None, optional): Items to return at most, None for all. Defaults to None.
+            page_size (int | None, optional): Items per request. Defaults to 20, the `get_comments` default.
+            prefetch (bool, optional): Request the next page while the current one is consumed. Defaults to True.
+            position (str | None, optional): `position` of an earlier iterator to continue from. Defaults to None.
+
+        Raises:
+            NotFound: Post not found
+        """
+        def fetch_page(cursor: int, size: int):
+            res = checked(self.get_comments(post_id, size, cursor, sort))
+            return res.comments, res.next_cursor if res.has_more else None
+
+        return Pager(fetch_page, 0, limit, page_size or 20, prefetch, position)
+
     @refresh_on_error
     def get_replies(self, comment_id: UUID, limit: int = 50, page: int = 1, sort: str = 'oldest'):
         """Get list of replies
@@ -501,12 +940,38 @@ class Client:
         Raises:
             NotFound: Comment not found
         """
+        key = (str(comment_id), limit, page, sort)
+        cached = self._cached('replies', key)
+        if cached is not None:
+            return cached
+
         res = get_replies(self.token, comment_id, page, limit, sort)
         if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
             or (isinstance(res, Response) and res.status_code == 404)): raise NotFound("User")
 
+        self._cache('replies', key, res)
         return res
 
+    def iter_replies(self, comment_id: UUID, sort: str = 'oldest', limit: int | None = None, page_size: int | None = None, prefetch: bool = True, position: str | None = None) -> Pager[Comment]:
+        """Iterate over all replies to a comment, page by page
+
+        Args:
+            comment_id (UUID): Comment UUID
+            sort (str, optional): Sorting. Defaults to 'oldest'.
+            limit (int | None, optional): Items to return at most, None for all. Defaults to None.
+            page_size (int | None, optional): Items per request. Defaults to 50, the `get_replies` default.
+            prefetch (bool, optional): Request the next page while the current one is consumed. Defaults to True.
+            position (str | None, optional): `position` of an earlier iterator to continue from. Defaults to None.
+
+        Raises:
+            NotFound: Comment not found
+        """
+        def fetch_page(page: int, size: int):
+            res = checked(self.get_replies(comment_id, size, page, sort))
+            return res.replies, page + 1 if res.pagination.hasMore else None
+
+        return Pager(fetch_page, 1, limit, page_size or 50, prefetch, position, fixed_page_size=True)
+
     @refresh_on_error
     def like_comment(self, id: UUID):
         """Like comment
@@ -521,6 +986,8 @@ class Client:
         if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
             or (isinstance(res, Response) and res.status_code == 404)): raise NotFound("Comment")
 
+        if isinstance(res, LikeResponse):
+            self._invalidate_comment(id, likes_count=res.likes_count, is_liked=res.liked)
         return res
 
     @refresh_on_error
@@ -537,7 +1004,8 @@ class Client:
         if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
             or (isinstance(res, Response) and res.status_code == 404)): raise NotFound("Comment")
 
-
+        if isinstance(res, LikeResponse):
+            self._invalidate_comment(id, likes_count=res.likes_count, is_liked=res.liked)
         return res
 
     @refresh_on_error
@@ -559,6 +1027,8 @@ class Client:
                 case 'FORBIDDEN':
                     raise Forbidden('delete comment')
 
+        self._invalidate_comment(id)
+
     @refresh_on_error
     def get_hashtags(self, limit: int = 10):
         """Get list of popular hashtags
@@ -583,18 +1053,54 @@ class Client:
 
         return res
 
+    def iter_posts_by_hashtag(self, hashtag: str, limit: int | None = None, page_size: int | None = None, prefetch: bool = True, position: str | None = None) -> Pager[Post]:
+        """Iterate over all posts with a hashtag, page by page
+
+        Args:
+            hashtag (str): Hashtag (without #)
+            limit (int | None, optional): Items to return at most, None for all. Defaults to None.
+            page_size (int | None, optional): Items per request. Defaults to 20, the `get_posts_by_hashtag` default.
+            prefetch (bool, optional): Request the next page while the current one is consumed. Defaults to True.
+            position (str | None, optional): `position` of an earlier iterator to continue from. Defaults to None.
+        """
+        def fetch_page(cursor: int | str, size: int):
+            res = checked(self.get_posts_by_hashtag(hashtag, size, cursor))
+            if not res.pagination.hasMore or not res.posts:
+                return res.posts, None
+            # continue after the last post if the server sends no cursor
+            return res.posts, res.pagination.nextCursor or str(res.posts[-1].id)
+
+        return Pager(fetch_page, 0, limit, page_size or 20, prefetch, position)
+
     @refresh_on_error
-    def get_notifications(self, limit: int = 20, offset: int = 0):
+    def get_notifications(self, limit: int = 20, offset: int = 0, type: NotificationType | None = None):
         """Get notifications
 
         Args:
             limit (int, optional): Limit. Defaults to 20.
             offset (int, optional): Offset. Defaults to 0.
+            type (NotificationType | None, optional): Only notifications of this type, None for all. Defaults to None.
         """
-        res = get_notifications(self.token, limit, offset)
+        res = get_notifications(self.token, limit, offset, type.value if type else None)
 
         return res
 
+    def iter_notifications(self, type: NotificationType | None = None, limit: int | None = None, page_size: int | None = None, prefetch: bool = True, position: str | None = None) -> Pager[Notification]:
+        """Iterate over all notifications, page by page
+
+        Args:
+            type (NotificationType | None, optional): Only notifications of this type, None for all. Defaults to None.
+            limit (int | None, optional): Items to return at most, None for all. Defaults to None.
+            page_size (int | None, optional): Items per request. Defaults to 20, the `get_notifications` default.
+            prefetch (bool, optional): Request the next page while the current one is consumed. Defaults to True.
+            position (str | None, optional): `position` of an earlier iterator to continue from. Defaults to None.
+        """
+        def fetch_page(offset: int, size: int):
+            res = checked(self.get_notifications(size, offset, type))
+            return res.notifications, offset + len(res.notifications) if res.has_more else None
+
+        return Pager(fetch_page, 0, limit, page_size or 20, prefetch, position)
+
     @refresh_on_error
     def mark_as_read(self, id: UUID):
         """Mark notification as read
@@ -605,6 +1111,26 @@ class Client:
         res = mark_as_read(self.token, id)
         return res
 
+    @refresh_on_error
+    def mark_batch_as_read(self, ids: Iterable[UUID]) -> int:
+        """Mark notifications as read, up to `MAX_READ_BATCH` per request
+
+        Args:
+            ids (Iterable[UUID]): Notification UUIDs
+
+        Raises:
+            RequestFailed: The API returned an error
+
+        Returns:
+            int: Notifications that were unread
+        """
+        ids = list(dict.fromkeys(ids))
+        count = 0
+        for start in range(0, len(ids), MAX_READ_BATCH):
+            res = mark_batch_as_read(self.token, ids[start:start + MAX_READ_BATCH])
+            count += checked(res).count
+        return count
+
     @refresh_on_error
     def mark_all_as_read(self):
         """Mark all notifications as read"""
@@ -657,17 +1183,34 @@ class Client:
         return res
 
     @refresh_on_error
-    def get_posts(self, cursor: int = 0, tab: PostsTab = PostsTab.POPULAR):
+    def get_posts(self, cursor: int = 0, tab: PostsTab = PostsTab.POPULAR, limit: int = 20):
         """Get list of posts
 
         Args:
             cursor (int, optional): Page. Defaults to 0.
             tab (PostsTab, optional): Tab (popular or following). Defaults to PostsTab.POPULAR.
+            limit (int, optional): Limit. Defaults to 20.
         """
-        res = get_posts(self.token, cursor=cursor, tab=tab.value)
+        res = get_posts(self.token, limit=limit, cursor=cursor, tab=tab.value)
 
         return res
 
+    def iter_posts(self, tab: PostsTab = PostsTab.POPULAR, limit: int | None = None, page_size: int | None = None, prefetch: bool = True, position: str | None = None) -> Pager[Post]:
+        """Iterate over the posts of a feed tab, page by page
+
+        Args:
+            tab (PostsTab, optional): Tab (popular or following). Defaults to PostsTab.POPULAR.
+            limit (int | None, optional): Items to return at most, None for all. Defaults to None.
+            page_size (int | None, optional): Items per request. Defaults to 20, the `get_posts` default.
+            prefetch (bool, optional): Request the next page while the current one is consumed. Defaults to True.
+            position (str | None, optional): `position` of an earlier iterator to continue from. Defaults to None.
+        """
+        def fetch_page(cursor: int, size: int):
+            res = checked(self.get_posts(cursor, tab, size))
+            return res.posts, int(res.pagination.nextCursor) if res.pagination.hasMore and res.pagination.nextCursor else None
+
+        return Pager(fetch_page, 0, limit, page_size or 20, prefetch, position)
+
     @refresh_on_error
     def get_post(self, id: UUID):
         """Get post
@@ -678,12 +1221,17 @@ class Client:
         Raises:
             NotFound: Post not found
         """
+        res = self._cached('post', str(id))
+        if res is not None:
+            return res
+
         res = get_post(self.token, id)
         if isinstance(res, Error):
             match res.code:
                 case 'NOT_FOUND':
                     raise NotFound('Post')
 
+        self._cache('post', str(id), res)
         return res
 
     @refresh_on_error
@@ -710,6 +1258,8 @@ class Client:
                     if hasattr(res, 'found'):
                          raise ValidationError(*list(res.found.items())[0])
 
+        if self.entity_cache:
+            self.entity_cache.evict('post', str(id))
         return res
 
     @refresh_on_error
@@ -731,6 +1281,10 @@ class Client:
                 case 'FORBIDDEN':
                     raise Forbidden('delete post')
 
+        if self.entity_cache:
+            self.entity_cache.evict('post', str(id))
+            self.entity_cache.evict_where('comments', lambda key: key[0] == str(id))
+
     @refresh_on_error
     def pin_post(self, id: UUID):
         """Pin post
@@ -813,6 +1367,25 @@ class Client:
 
         return res
 
+    def iter_user_posts(self, username_or_id: str | UUID, limit: int | None = None, page_size: int | None = None, prefetch: bool = True, position: str | None = None) -> Pager[Post]:
+        """Iterate over all posts of a user (and on their wall), page by page
+
+        Args:
+            username_or_id (str | UUID): UUID or username of the user
+            limit (int | None, optional): Items to return at most, None for all. Defaults to None.
+            page_size (int | None, optional): Items per request. Defaults to 20, the `get_user_posts` default.
+            prefetch (bool, optional): Request the next page while the current one is consumed. Defaults to True.
+            position (str | None, optional): `position` of an earlier iterator to continue from. Defaults to None.
+
+        Raises:
+            NotFound: User not found
+        """
+        def fetch_page(cursor: str | None, size: int):
+            res = checked(self.get_user_posts(username_or_id, size, cursor))
+            return res.posts, res.pagination.nextCursor if res.pagination.hasMore else None
+
+        return Pager(fetch_page, None, limit, page_size or 20, prefetch, position)
+
     @refresh_on_error
     def get_liked_posts(self, username_or_id: str | UUID, limit: int = 20, cursor: datetime | None = None):
         """Get liked posts by user
@@ -831,6 +1404,25 @@ class Client:
 
         return res
 
+    def iter_liked_posts(self, username_or_id: str | UUID, limit: int | None = None, page_size: int | None = None, prefetch: bool = True, position: str | None = None) -> Pager[Post]:
+        """Iterate over all posts liked by a user, page by page
+
+        Args:
+            username_or_id (str | UUID): UUID or username of the user
+            limit (int | None, optional): Items to return at most, None for all. Defaults to None.
+            page_size (int | None, optional): Items per request. Defaults to 20, the `get_liked_posts` default.
+            prefetch (bool, optional): Request the next page while the current one is consumed. Defaults to True.
+            position (str | None, optional): `position` of an earlier iterator to continue from. Defaults to None.
+
+        Raises:
+            NotFound: User not found
+        """
+        def fetch_page(cursor: str | None, size: int):
+            res = checked(self.get_liked_posts(username_or_id, size, cursor))
+            return res.posts, res.pagination.nextCursor if res.pagination.hasMore else None
+
+        return Pager(fetch_page, None, limit, page_size or 20, prefetch, position)
+
     @refresh_on_error
     def report(self, id: UUID, type: ReportTargetType = ReportTargetType.POST, reason: ReportTargetReason = ReportTargetReason.OTHER, description: str | None = None):
         """Send report
@@ -902,25 +1494,144 @@ class Client:
         """
         return self.search(query, 1, limit)
 
-    @refresh_on_error
-    def upload_file(self, name: str, data: BufferedReader):
+    def upload_file(self, name: str, data: Source | None = None, progress: Progress | None = None):
         """Upload file
 
+        The file is streamed in chunks, so memory use does not grow with its size.
+
         Args:
-            name (str): Filename
-            data (BufferedReader): Content (open('name', 'rb'))
+            name (str): Filename, or the path of the file if `data` is None
+            data (str | PathLike | bytes | BinaryIO | None, optional): Path, content or binary file object. Defaults to None.
+            progress (Callable[[int, int], None] | None, optional): Called with `(bytes sent, total bytes)` while uploading. Defaults to None.
+        """
+        upload = MultipartUpload(name if data is None else data, name if data is not None else None, progress=progress)
+        return self._store(upload)[0]
+
+    def _store(self, upload: MultipartUpload) -> tuple[Attachment | Error, bool]:
+        """Upload result and whether it is a new file (not reused from `upload_cache`)"""
+        if self.upload_cache is None:
+            return self._upload_file(upload), True
+
+        key = content_key(upload, self.me.id if self.me else None)
+        attachment = self.upload_cache.lookup(key, self._check_upload)
+        if attachment is not None:
+            return attachment, False
+
+        res = self._upload_file(upload)
+        if isinstance(res, Attachment):
+            self.upload_cache.put(key, res)
+        return res, True
+
+    def upload_files(self, files: Iterable[Upload], max_workers: int = 4) -> list[Attachment]:
+        """Upload several files concurrently
+
+        If any upload fails, the files uploaded by this call are deleted.
+
+        Args:
+            files (Iterable[str | PathLike | tuple[str, data]]): Paths, or `(filename, path | bytes | file object)` pairs
+            max_workers (int, optional): Uploads running at the same time. Defaults to 4.
+
+        Raises:
+            UploadFailed: A file was not uploaded
+
+        Returns:
+            list[Attachment]: Attachments in the order of `files`
         """
-        res = upload_file(self.token, name, data)
+        return self._upload_all(files, max_workers)[0]
+
+    def _upload_all(self, files: Iterable[Upload], max_workers: int) -> tuple[list[Attachment], list[Attachment]]:
+        """Attachments of `files` and the ones among them uploaded by this call"""
+        uploads = [MultipartUpload(file[1], file[0]) if isinstance(file, tuple) else MultipartUpload(file) for file in files]
+        results = self.gather([(self._store, upload) for upload in uploads], max_workers)
+
+        new = [res[0] for res in results if isinstance(res, tuple) and isinstance(res[0], Attachment) and res[1]]
+        for upload, res in zip(uploads, results):
+            if isinstance(res, tuple) and isinstance(res[0], Attachment):
+                continue
+            self._delete_uploads(new)
+            if isinstance(res, BaseException):
+                raise UploadFailed(upload.filename, str(res)) from res
+            raise UploadFailed(upload.filename, res[0].message if isinstance(res[0], Error) else str(res[0]))
+        return [res[0] for res in results], new
+
+    def _delete_uploads(self, attachments: list[Attachment]):
+        for attachment in attachments:
+            try:
+                self.delete_file(attachment.id)
+            except Exception as e:
+                logger.warning(f"Failed to delete uploaded file {attachment.id}: {e}")
 
+    def _with_uploads(self, files: Iterable[Upload], max_workers: int, create: Callable[[list[UUID]], Any]):
+        """Upload `files`, then `create(attachment ids)`, deleting the new files if that fails"""
+        attachments, new = self._upload_all(files, max_workers)
+        try:
+            res = create([attachment.id for attachment in attachments])
+        except BaseException:
+            self._delete_uploads(new)
+            raise
+        if isinstance(res, Error):
+            self._delete_uploads(new)
         return res
 
+    def create_post_with_files(self, content: str, files: Iterable[Upload], wall_recipient_id: UUID | None = None, poll: PollData | None = None, parse_md: bool = True, max_workers: int = 4):
+        """Upload files concurrently and create a post with them
+
+        Files uploaded for the post are deleted if it is not created.
+
+        Args:
+            content (str): Content
+            files (Iterable[str | PathLike | tuple[str, data]]): Paths, or `(filename, path | bytes | file object)` pairs
+            wall_recipient_id (UUID | None, optional): UUID of the user (to create a post on their wall). Defaults to None.
+            max_workers (int, optional): Uploads running at the same time. Defaults to 4.
+
+        Raises:
+            UploadFailed: A file was not uploaded
+        """
+        return self._with_uploads(files, max_workers, lambda ids: self.create_post(content, wall_recipient_id, ids, poll, parse_md))
+
+    def add_comment_with_files(self, post_id: UUID, content: str, files: Iterable[Upload], parse_md: bool = True, max_workers: int = 4):
+        """Upload files concurrently and add a comment with them, see `create_post_with_files`
+
+        Args:
+            post_id (UUID): Post UUID
+            content (str): Content
+            files (Iterable[str | PathLike | tuple[str, data]]): Paths, or `(filename, path | bytes | file object)` pairs
+            max_workers (int, optional): Uploads running at the same time. Defaults to 4.
+        """
+        return self._with_uploads(files, max_workers, lambda ids: self.add_comment(post_id, content, ids, parse_md))
+
+    def add_reply_comment_with_files(self, comment_id: UUID, content: str, files: Iterable[Upload], author_id: UUID | None = None, parse_md: bool = True, max_workers: int = 4):
+        """Upload files concurrently and reply to a comment with them, see `create_post_with_files`
+
+        Args:
+            comment_id (UUID): Comment UUID
+            content (str): Content
+            files (Iterable[str | PathLike | tuple[str, data]]): Paths, or `(filename, path | bytes | file object)` pairs
+            author_id (UUID | None, optional): ID of the user who sent the comment. Defaults to None.
+            max_workers (int, optional): Uploads running at the same time. Defaults to 4.
+        """
+        return self._with_uploads(files, max_workers, lambda ids: self.add_reply_comment(comment_id, content, author_id, ids, parse_md))
+
+    def _check_upload(self, attachment: Attachment) -> Optional[Attachment]:
+        try:
+            res = self.get_file(attachment.id)
+        except (NotFound, NotFoundOrForbidden):
+            return None
+        # on other errors the content is uploaded again
+        return res if isinstance(res, Attachment) else None
+
+    @refresh_on_error
+    def _upload_file(self, upload: MultipartUpload):
+        # the upload is created once, so a retry after a token refresh rewinds the same file
+        return upload_file(self.token, upload.filename, upload)
+
     def update_banner(self, name: str):
         """Update banner (shortcut for upload_file + update_profile)
 
         Args:
-            name (str): Filename
+            name (str): Path of the image
         """
-        file_id = self.upload_file(name, cast(BufferedReader, open(name, 'rb'))).id
+        file_id = self.upload_file(name).id
         return self.update_profile(banner_id=file_id)
 
     @refresh_on_error
@@ -931,6 +1642,8 @@ class Client:
             post_id: Post UUID
         """
         restore_post(self.token, post_id)
+        if self.entity_cache:
+            self.entity_cache.evict('post', str(post_id))
 
     @refresh_on_error
     def like_post(self, post_id: UUID):
@@ -946,6 +1659,8 @@ class Client:
         if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
             or (isinstance(res, Response) and res.status_code == 404)): raise NotFound("Post")
 
+        if self.entity_cache and isinstance(res, LikeResponse):
+            self.entity_cache.patch('post', str(post_id), likes_count=res.likes_count, is_liked=res.liked)
         return res
 
     @refresh_on_error
@@ -962,20 +1677,27 @@ class Client:
         if ((isinstance(res, Error) and res.code == 'NOT_FOUND')
             or (isinstance(res, Response) and res.status_code == 404)): raise NotFound("Post")
 
+        if self.entity_cache and isinstance(res, LikeResponse):
+            self.entity_cache.patch('post', str(post_id), likes_count=res.likes_count, is_liked=res.liked)
         return res
 
     @refresh_on_error
     def get_pins(self):
         """Get list of pins
         """
-        res = get_pins(self.token)
+        res = self._snapshotted('pins', PinsListResponse)
+        if res is not None:
+            return res
 
+        res = get_pins(self.token)
+        self._snapshot('pins', res)
         return res
 
     @refresh_on_error
     def remove_pin(self):
         """Remove pin"""
         remove_pin(self.token)
+        self._unsnapshot('pins')
 
     @refresh_on_error
     def set_pin(self, slug: str):
@@ -996,7 +1718,8 @@ class Client:
                         raise ValidationError(*list(res.found.items())[0])
                 case 'PIN_NOT_OWNED':
                     raise PinNotOwned(slug)
-        
+        else:
+            self._unsnapshot('pins')
         return res
     
     @refresh_on_error
@@ -1041,12 +1764,17 @@ class Client:
         Returns:
             File: Файл
         """
+        res = self._cached('file', str(id))
+        if res is not None:
+            return res
+
         res = get_file(self.token, id)
         if isinstance(res, Error):
             match res.code:
                 case 'NOT_FOUND':
                     raise NotFoundOrForbidden('File')
 
+        self._cache('file', str(id), res)
         return res
 
     @refresh_on_error
@@ -1065,4 +1793,8 @@ class Client:
                 case 'NOT_FOUND':
                     raise NotFound('File')
 
+        if self.entity_cache:
+            self.entity_cache.evict('file', str(id))
+        if self.upload_cache is not None:
+            self.upload_cache.discard_id(id)
         return res
\ No newline at end of file
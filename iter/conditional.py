@@ -0,0 +1,75 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Mapping, Optional
+
+from pydantic import BaseModel
+
+
+class _Entry:
+    __slots__ = ('etag', 'last_modified', 'digest', 'result')
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], digest: bytes, result: BaseModel):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.result = result
+
+
+class ValidatorCache:
+    """Validators and parsed models of recent GET responses, for conditional requests
+
+    `fetch` sends `If-None-Match` / `If-Modified-Since` from the stored
+    `ETag` / `Last-Modified` and returns the stored model on `304 Not
+    Modified`. When the server sends no validators (or ignores them), a body
+    identical to the stored one is recognized by its hash and not validated
+    again. The stored model is returned as is, so callers share it and must not modify it.
+    """
+    def __init__(self, max_entries: int = 1024):
+        """
+        Args:
+            max_entries (int, optional): Responses remembered, least recently used are dropped first. Defaults to 1024.
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.not_modified = 0 # 304 responses answered from the cache
+        self.unchanged = 0 # identical bodies that skipped validation
+
+    @staticmethod
+    def digest(content: bytes) -> bytes:
+        return hashlib.blake2b(content, digest_size=16).digest()
+
+    def get(self, key: Hashable) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def headers(self, entry: Optional[_Entry]) -> Dict[str, str]:
+        """Conditional request headers for a stored response"""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, key: Hashable, headers: Mapping[str, str], digest: bytes, result: BaseModel):
+        entry = _Entry(headers.get('ETag'), headers.get('Last-Modified'), digest, result)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
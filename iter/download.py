@@ -0,0 +1,187 @@
+import mimetypes
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import verboselogs
+
+from iter.batch import gather
+from iter.exceptions import DownloadFailed
+from iter.models.media import Attachment
+from iter.singleflight import SingleFlight
+from iter.transport import RequestsTransport, Transport
+
+logger = verboselogs.VerboseLogger(__name__)
+
+
+class DownloadManager:
+    """Downloads attachments into a size-bounded on-disk cache
+
+    Files are streamed to `<cache_dir>/<attachment id>[.thumb]<ext>`, so an
+    attachment is downloaded once and later calls return the cached path.
+    Interrupted downloads resume from the partial file with a `Range`
+    request, and full downloads are checked against `Attachment.size`. When
+    the cache grows over `max_bytes`, least recently used files are deleted
+    (file modification times keep the order between runs).
+
+        downloads = DownloadManager('media', max_bytes=2 * 1024 ** 3, transport=client.transport)
+        paths = downloads.download_all(post.attachments for post in feed.posts)
+    """
+    def __init__(self, cache_dir: str = 'media', max_bytes: int = 1024 ** 3, transport: Optional[Transport] = None, max_workers: int = 4, retries: int = 3, timeout: float = 60, chunk_size: int = 64 * 1024):
+        """
+        Args:
+            cache_dir (str, optional): Directory the files are kept in. Defaults to 'media'.
+            max_bytes (int, optional): Total size of cached files. Defaults to 1 GiB.
+            transport (Transport | None, optional): Sync transport the files are fetched with, e.g. `client.transport`. A new `RequestsTransport` if None. Defaults to None.
+            max_workers (int, optional): Downloads running at the same time in `download_all`. Defaults to 4.
+            retries (int, optional): Resumed attempts after a broken download. Defaults to 3.
+            timeout (float, optional): Seconds to wait for the server between chunks. Defaults to 60.
+            chunk_size (int, optional): Bytes written at a time. Defaults to 64 KiB.
+        """
+        if transport is not None and transport.is_async:
+            raise ValueError('DownloadManager needs a sync transport')
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.transport = transport if transport is not None else RequestsTransport()
+        self.max_workers = max_workers
+        self.retries = retries
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._sizes: Dict[str, int] = {}
+
+        self.hits = 0
+        self.downloaded = 0 # bytes received
+        self.evictions = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        for name in os.listdir(cache_dir):
+            if not name.endswith('.part'):
+                self._sizes[name] = os.path.getsize(os.path.join(cache_dir, name))
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def _filename(self, attachment: Attachment, thumbnail: bool) -> str:
+        ext = os.path.splitext(urlsplit(attachment.thumbnailUrl if thumbnail else attachment.url).path)[1]
+        if not ext and attachment.mimeType:
+            ext = mimetypes.guess_extension(attachment.mimeType) or ''
+        return f'{attachment.id}{".thumb" if thumbnail else ""}{ext}'
+
+    def download(self, attachment: Attachment, prefer_thumbnail: bool = False) -> str:
+        """Path of the downloaded attachment, fetched unless it is cached
+
+        Args:
+            attachment (Attachment): Attachment to download.
+            prefer_thumbnail (bool, optional): Download the preview (`thumbnailUrl`) when the attachment has one. Defaults to False.
+
+        Raises:
+            DownloadFailed: The file could not be downloaded or has the wrong size
+        """
+        thumbnail = prefer_thumbnail and bool(attachment.thumbnailUrl)
+        name = self._filename(attachment, thumbnail)
+        path = os.path.join(self.cache_dir, name)
+
+        with self._lock:
+            cached = name in self._sizes
+        if cached and os.path.exists(path):
+            self.hits += 1
+            os.utime(path) # most recently used
+            return path
+
+        url = attachment.thumbnailUrl if thumbnail else attachment.url
+        # the preview's size is unknown, only the original can be verified
+        size = None if thumbnail else attachment.size
+        return self._flight.do(name, lambda: self._fetch(url, name, path, size))
+
+    def download_all(self, attachments: Iterable[Attachment], prefer_thumbnail: bool = False) -> List[str | Exception]:
+        """Download attachments concurrently, paths (or exceptions) in the order of `attachments`"""
+        return gather([(self.download, attachment, prefer_thumbnail) for attachment in attachments], self.max_workers)
+
+    def _fetch(self, url: str, name: str, path: str, size: Optional[int]) -> str:
+        part = path + '.part'
+        attempt = 0
+        while True:
+            try:
+                self._stream(url, part, size)
+                break
+            except self.transport.network_errors as e:
+                attempt += 1
+                if attempt > self.retries:
+                    raise DownloadFailed(url, str(e)) from e
+                logger.warning(f"Download of {url} interrupted, resuming ({attempt}/{self.retries})")
+                time.sleep(min(2 ** attempt / 4, 5))
+
+        received = os.path.getsize(part)
+        if size is not None and received != size:
+            os.remove(part)
+            raise DownloadFailed(url, f'expected {size} bytes, got {received}')
+        os.replace(part, path)
+
+        with self._lock:
+            self._sizes[name] = received
+        self._evict(keep=name)
+        return path
+
+    def _stream(self, url: str, part: str, size: Optional[int]):
+        """Download `url` into `part`, continuing after the bytes already in it"""
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        if size is not None and offset >= size:
+            offset = 0 # complete or broken, start over
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+
+        with self.transport.stream(url, headers, self.timeout, self.chunk_size) as response:
+            if response.status_code == 416:
+                pass # the partial file is longer than the file on the server
+            elif response.status_code not in (200, 206):
+                raise DownloadFailed(url, f'HTTP {response.status_code}')
+            else:
+                # a server ignoring Range sends the whole file again
+                resumed = response.status_code == 206
+                with open(part, 'ab' if resumed else 'wb') as f:
+                    for chunk in response.iter_bytes():
+                        f.write(chunk)
+                        self.downloaded += len(chunk)
+                return
+        os.remove(part)
+        self._stream(url, part, size)
+
+    def _evict(self, keep: str):
+        with self._lock:
+            total = sum(self._sizes.values())
+            if total <= self.max_bytes:
+                return
+            names = sorted(
+                (name for name in self._sizes if name != keep),
+                key=lambda name: _mtime(os.path.join(self.cache_dir, name))
+            )
+            for name in names:
+                if total <= self.max_bytes:
+                    break
+                total -= self._sizes.pop(name)
+                self.evictions += 1
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self._lock:
+            for name in self._sizes:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+            self._sizes.clear()
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
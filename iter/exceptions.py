@@ -161,4 +161,31 @@ class InvalidFileType(Exception):
 
 class EditExpired(Exception):
     def __str__(self) -> str:
-        return 'Editing allowed only in first 48 hours after posting'
\ No newline at end of file
+        return 'Editing allowed only in first 48 hours after posting'
+
+class UploadFailed(Exception):
+    def __init__(self, filename: str, reason: str):
+        self.filename = filename
+        self.reason = reason
+    def __str__(self) -> str:
+        return f'Failed to upload {self.filename}: {self.reason}'
+
+class DownloadFailed(Exception):
+    def __init__(self, url: str, reason: str):
+        self.url = url
+        self.reason = reason
+    def __str__(self) -> str:
+        return f'Failed to download {self.url}: {self.reason}'
+
+class RequestFailed(Exception):
+    def __init__(self, code: str, message: str):
+        self.code = code
+        self.message = message
+    def __str__(self) -> str:
+        return f'Request failed ({self.code}): {self.message}'
+
+class NoAccountAvailable(Exception):
+    def __init__(self, reason: str):
+        self.reason = reason
+    def __str__(self) -> str:
+        return f'No account available: {self.reason}'
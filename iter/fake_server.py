@@ -0,0 +1,1404 @@
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+from uuid import uuid4, uuid5, NAMESPACE_URL
+
+import verboselogs
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from iter.transport import AsyncLocalTransport, LocalRequest, LocalTransport, parse_multipart
+
+logger = verboselogs.VerboseLogger(__name__)
+
+Result = Tuple[int, Any, Dict[str, str]]
+
+AVATARS = ['🦊', '🐱', '🐼', '🐸', '🦉', '🐙', '🦄', '🐝']
+
+PINS = {
+    'early-bird': ('Ранняя пташка', 'Зарегистрировался в первый месяц'),
+    'writer': ('Писатель', 'Опубликовал 100 постов'),
+    'verified': ('Верифицирован', 'Прошел верификацию'),
+}
+
+# (method, endpoint template, handler); templates are relative to the API root
+ROUTES: List[Tuple[str, str, str]] = [
+    ('POST', 'v1/auth/refresh', '_refresh'),
+    ('POST', 'v1/auth/change-password', '_change_password'),
+    ('POST', 'v1/auth/logout', '_logout'),
+
+    ('GET', 'users/me/pins', '_get_pins'),
+    ('PUT', 'users/me/pin', '_set_pin'),
+    ('DELETE', 'users/me/pin', '_remove_pin'),
+    ('PUT', 'users/me/privacy', '_update_privacy'),
+    ('PUT', 'users/me', '_update_profile'),
+    ('GET', 'users/stats/top-clans', '_top_clans'),
+    ('GET', 'users/suggestions/who-to-follow', '_who_to_follow'),
+    ('POST', 'users/{username}/follow', '_follow'),
+    ('DELETE', 'users/{username}/follow', '_unfollow'),
+    ('GET', 'users/{username}/followers', '_followers'),
+    ('GET', 'users/{username}/following', '_following'),
+    ('GET', 'users/{username}', '_get_user'),
+
+    ('GET', 'posts', '_get_posts'),
+    ('POST', 'posts', '_create_post'),
+    ('GET', 'posts/user/{username}/liked', '_liked_posts'),
+    ('GET', 'posts/user/{username}', '_user_posts'),
+    ('GET', 'posts/{id}/comments', '_get_comments'),
+    ('POST', 'posts/{id}/comments', '_add_comment'),
+    ('POST', 'posts/{id}/like', '_like_post'),
+    ('DELETE', 'posts/{id}/like', '_unlike_post'),
+    ('POST', 'posts/{id}/pin', '_pin_post'),
+    ('POST', 'posts/{id}/repost', '_repost'),
+    ('POST', 'posts/{id}/view', '_view_post'),
+    ('POST', 'posts/{id}/restore', '_restore_post'),
+    ('GET', 'posts/{id}', '_get_post'),
+    ('PUT', 'posts/{id}', '_edit_post'),
+    ('DELETE', 'posts/{id}', '_delete_post'),
+
+    ('GET', 'comments/{id}/replies', '_get_replies'),
+    ('POST', 'comments/{id}/replies', '_add_reply'),
+    ('POST', 'comments/{id}/like', '_like_comment'),
+    ('DELETE', 'comments/{id}/like', '_unlike_comment'),
+    ('DELETE', 'comments/{id}', '_delete_comment'),
+
+    ('GET', 'hashtags/trending', '_trending'),
+    ('GET', 'hashtags/{hashtag}/posts', '_hashtag_posts'),
+    ('GET', 'search', '_search'),
+
+    ('GET', 'notifications', '_get_notifications'),
+    ('GET', 'notifications/count', '_notifications_count'),
+    ('POST', 'notifications/read-batch', '_read_batch'),
+    ('POST', 'notifications/read-all', '_read_all'),
+    ('POST', 'notifications/{id}/read', '_read'),
+
+    ('POST', 'files/upload', '_upload'),
+    ('GET', 'files/{id}', '_get_file'),
+    ('DELETE', 'files/{id}', '_delete_file'),
+
+    ('POST', 'poll/vote', '_vote'),
+    ('POST', 'reports', '_report'),
+    ('POST', 'verification/submit', '_verify'),
+    ('GET', 'verification/status', '_verification_status'),
+    ('GET', 'platform/status', '_platform_status'),
+]
+
+_COMPILED = [
+    (method, template, re.compile(re.sub(r'\{(\w+)\}', r'(?P<\1>[^/]+)', template)), handler)
+    for method, template, handler in ROUTES
+]
+
+_HASHTAG = re.compile(r'#(\w+)')
+
+_UNAVAILABLE = b'<html><body><h1>503 Service Temporarily Unavailable</h1></body></html>'
+
+
+class ApiError(Exception):
+    """Error response of the fake server (`{"error": {...}}` envelope)"""
+    def __init__(self, status: int, code: str, message: str = '', retry_after: Optional[int] = None):
+        self.status = status
+        self.code = code
+        self.message = message or code
+        self.retry_after = retry_after
+
+    def body(self) -> dict:
+        error: Dict[str, Any] = {'code': self.code, 'message': self.message}
+        if self.retry_after is not None:
+            error['retryAfter'] = self.retry_after
+        return {'error': error}
+
+
+def _iso(dt: Optional[datetime]) -> Optional[str]:
+    return dt.isoformat(timespec='milliseconds').replace('+00:00', 'Z') if dt else None
+
+def _parse_datetime(value: str) -> datetime:
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+def _read(data: Any) -> bytes:
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, str):
+        return data.encode()
+    return data.read()
+
+def _header(request: LocalRequest, name: str) -> Optional[str]:
+    name = name.lower()
+    for key, value in request.headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+def _cookie(request: LocalRequest, name: str) -> Optional[str]:
+    for part in (_header(request, 'Cookie') or '').split(';'):
+        key, _, value = part.strip().partition('=')
+        if key == name:
+            return value
+    return None
+
+def _attach_type(mime: str) -> str:
+    kind = mime.split('/')[0]
+    return kind if kind in ('image', 'video', 'audio') else 'file'
+
+
+class FakeServer:
+    """Offline stand-in for the ITD API
+
+    Implements the endpoints used by `iter.routes` on in-memory state: users,
+    follows, posts, comments, likes, files, notifications, pins, polls and
+    verification requests, with the same pagination styles as the real API
+    (page, offset and datetime cursors). Latency, server errors, dropped
+    connections and rate limits can be injected.
+
+    Use it in-process through a `LocalTransport`:
+
+        server = FakeServer()
+        server.populate(users=50)
+        c = server.client()
+
+    or over real HTTP with `serve()` (then point `Client(base_url=server.base_url)`
+    at it).
+    """
+    def __init__(
+        self,
+        base_url: str = 'http://itd.local/api/',
+        latency: float | Tuple[float, float] = 0,
+        error_rate: float = 0,
+        error_statuses: Iterable[int] = (500, 502, 503),
+        disconnect_rate: float = 0,
+        rate_limit: Optional[Tuple[int, float]] = None,
+        rate_limit_headers: bool = True,
+        token_ttl: Optional[float] = None,
+        etags: bool = True,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            base_url (str, optional): API root the server answers on. Defaults to 'http://itd.local/api/'.
+            latency (float | tuple[float, float], optional): Seconds added to every response, or a `(min, max)` range. Defaults to 0.
+            error_rate (float, optional): Share of requests answered with one of `error_statuses`. Defaults to 0.
+            error_statuses (Iterable[int], optional): Statuses of injected errors. Defaults to (500, 502, 503).
+            disconnect_rate (float, optional): Share of requests whose connection is dropped without a response. Defaults to 0.
+            rate_limit (tuple[int, float] | None, optional): `(requests, window seconds)` allowed per access token, None for no limit. Defaults to None.
+            rate_limit_headers (bool, optional): Send `X-RateLimit-*` headers with every response. Defaults to True.
+            token_ttl (float | None, optional): Lifetime of access tokens in seconds, None for no expiry. Defaults to None.
+            etags (bool, optional): Send `ETag` with GET responses and answer matching `If-None-Match` with 304. Defaults to True.
+            seed (int | None, optional): Seed for error injection and `populate`. Defaults to None.
+        """
+        self.base_url = base_url if base_url.endswith('/') else base_url + '/'
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.disconnect_rate = disconnect_rate
+        self.rate_limit = rate_limit
+        self.rate_limit_headers = rate_limit_headers
+        self.token_ttl = token_ttl
+        self.etags = etags
+        self.read_only = False
+
+        # requests served per `METHOD template`
+        self.calls: Counter = Counter()
+
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._clock = datetime.now(timezone.utc).replace(microsecond=0)
+        self._faults: List[List[Any]] = []
+        self._windows: Dict[str, List[float]] = {}
+        self._http: Optional[ThreadingHTTPServer] = None
+
+        self.users: Dict[str, dict] = {}
+        self.posts: Dict[str, dict] = {}
+        self.comments: Dict[str, dict] = {}
+        self.files: Dict[str, dict] = {}
+        self.polls: Dict[str, dict] = {}
+        self.notifications: Dict[str, List[dict]] = {}
+        self.verifications: Dict[str, dict] = {}
+        self.reports: List[dict] = []
+        self.tokens: Dict[str, Tuple[str, Optional[float]]] = {}
+        self.refresh_tokens: Dict[str, str] = {}
+        self._usernames: Dict[str, str] = {}
+        self._followers_of: Dict[str, Dict[str, datetime]] = {}
+        self._following_of: Dict[str, Dict[str, datetime]] = {}
+
+        self.me = self.add_user('tester', 'Tester', pins=['early-bird'])
+
+# --- setup ---
+
+    def add_user(self, username: str, display_name: Optional[str] = None, password: str = 'password', verified: bool = False, bio: str = '', pins: Iterable[str] = ()) -> dict:
+        """Create an account and return its stored user"""
+        with self._lock:
+            if username.lower() in self._usernames:
+                raise ValueError(f'Username {username} is taken')
+            now = self._now()
+            user = {
+                'id': str(uuid4()),
+                'username': username,
+                'displayName': display_name or username,
+                'avatar': AVATARS[len(self.users) % len(AVATARS)],
+                'banner': None,
+                'bio': bio,
+                'verified': verified,
+                'createdAt': now,
+                'password': password,
+                'isPrivate': False,
+                'wallAccess': 'everyone',
+                'likesVisibility': 'everyone',
+                'pins': {slug: now for slug in pins},
+                'pin': None,
+                'pinnedPostId': None,
+            }
+            self.users[user['id']] = user
+            self._usernames[username.lower()] = user['id']
+            self._followers_of[user['id']] = {}
+            self._following_of[user['id']] = {}
+            self.notifications[user['id']] = []
+            return user
+
+    def add_post(self, author: dict, content: str, created_at: Optional[datetime] = None, **fields) -> dict:
+        """Create a post as `author` without going through the API"""
+        with self._lock:
+            return self._new_post(author, content, created_at=created_at, **fields)
+
+    def add_comment(self, author: dict, post: dict, content: str, parent: Optional[dict] = None) -> dict:
+        """Create a comment (or a reply to `parent`) without going through the API"""
+        with self._lock:
+            return self._new_comment(author, post, content, parent)
+
+    def add_follow(self, follower: dict, target: dict):
+        with self._lock:
+            self._add_follow(follower, target)
+
+    def populate(self, users: int = 20, posts_per_user: int = 5, comments_per_post: int = 3, follows_per_user: int = 5) -> List[dict]:
+        """Fill the server with generated users, follows, posts, likes and comments
+
+        Returns:
+            list[dict]: Created users
+        """
+        with self._lock:
+            created = [self.add_user(f'user{len(self.users)}', f'User {len(self.users)}') for _ in range(users)]
+            everyone = list(self.users.values())
+            for user in created:
+                for target in self._rng.sample(everyone, min(follows_per_user, len(everyone))):
+                    if target is not user:
+                        self._add_follow(user, target)
+            for user in created:
+                for i in range(posts_per_user):
+                    tag = self._rng.choice(['новости', 'python', 'итд', 'мемы'])
+                    post = self._new_post(user, f'Пост {i} от {user["displayName"]} #{tag}')
+                    for liker in self._rng.sample(everyone, min(3, len(everyone))):
+                        post['likes'][liker['id']] = self._now()
+                    for j in range(comments_per_post):
+                        self._new_comment(self._rng.choice(everyone), post, f'Комментарий {j}')
+            return created
+
+    def login(self, user: Optional[dict] = None) -> Tuple[str, str]:
+        """Open a session for `user` (the default account if None)
+
+        Returns:
+            tuple[str, str]: Access token and the cookie string with the refresh token
+        """
+        user = user or self.me
+        with self._lock:
+            refresh = uuid4().hex
+            self.refresh_tokens[refresh] = user['id']
+            return self._issue_token(user), f'refresh_token={refresh}'
+
+    def transport(self) -> LocalTransport:
+        """In-process transport answering from this server"""
+        return LocalTransport(self.handle)
+
+    def async_transport(self) -> AsyncLocalTransport:
+        return AsyncLocalTransport(self.ahandle)
+
+    def client(self, user: Optional[dict] = None, **kwargs):
+        """`Client` logged in as `user` (the default account if None)
+
+        Requests go through `transport()` unless the server is serving HTTP.
+        Keyword arguments are passed to `Client`.
+        """
+        from iter.client import Client
+
+        return Client(**self._client_options(user, self.transport, kwargs))
+
+    def async_client(self, user: Optional[dict] = None, **kwargs):
+        """`AsyncClient` logged in as `user`, see `client`"""
+        from iter.async_client import AsyncClient
+
+        return AsyncClient(**self._client_options(user, self.async_transport, kwargs))
+
+    def _client_options(self, user, transport, kwargs) -> dict:
+        token, cookies = self.login(user)
+        options = dict(token=token, cookies=cookies, session_file=None, use_manual_login=False, base_url=self.base_url)
+        if self._http is None:
+            options['transport'] = transport()
+        options.update(kwargs)
+        return options
+
+# --- fault injection ---
+
+    def fail(self, status: int = 503, times: int = 1, path: Optional[str] = None):
+        """Answer the next `times` requests (to endpoints matching regex `path`) with `status`
+
+        Status 0 drops the connection instead. Status 429 is a rate limit error.
+        """
+        with self._lock:
+            self._faults.append([status, times, re.compile(path) if path else None])
+
+    def expire_tokens(self):
+        """Make every issued access token invalid, as if they had all expired"""
+        with self._lock:
+            self.tokens.clear()
+
+    def ban(self, user: dict):
+        """Answer every request of `user` with `ACCOUNT_BANNED`"""
+        user['banned'] = True
+
+# --- request handling ---
+
+    def _delay(self) -> float:
+        if isinstance(self.latency, tuple):
+            return self._rng.uniform(*self.latency)
+        return self.latency
+
+    def handle(self, request: LocalRequest) -> Result:
+        """`LocalTransport` handler"""
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        result = self.dispatch(request)
+        if result is None:
+            raise RequestsConnectionError('Connection dropped by FakeServer')
+        return result
+
+    async def ahandle(self, request: LocalRequest) -> Result:
+        """`AsyncLocalTransport` handler"""
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        result = self.dispatch(request)
+        if result is None:
+            raise RequestsConnectionError('Connection dropped by FakeServer')
+        return result
+
+    def dispatch(self, request: LocalRequest) -> Optional[Result]:
+        """Answer a request, None means the connection is dropped"""
+        base_path = urlsplit(self.base_url).path
+        if request.path.startswith('/media/'):
+            return self._media(request)
+        if not request.path.startswith(base_path):
+            return 404, ApiError(404, 'NOT_FOUND', 'Route not found').body(), {}
+        endpoint = request.path[len(base_path):].strip('/')
+
+        for method, template, pattern, handler in _COMPILED:
+            match = pattern.fullmatch(endpoint)
+            if match and method == request.method.upper():
+                break
+        else:
+            return 404, ApiError(404, 'NOT_FOUND', 'Route not found').body(), {}
+
+        with self._lock:
+            self.calls[f'{method} {template}'] += 1
+            fault = self._fault(endpoint)
+            if fault is not None:
+                return None if fault == 0 else self._error_response(fault)
+
+            headers: Dict[str, str] = {}
+            try:
+                self._check_rate_limit(request, headers)
+                if self.read_only and method != 'GET' and not template.startswith('v1/'):
+                    raise ApiError(503, 'READ_ONLY', 'Платформа в режиме только для чтения')
+                body = getattr(self, handler)(request, **match.groupdict())
+            except ApiError as e:
+                if e.retry_after is not None:
+                    headers['Retry-After'] = str(e.retry_after)
+                return e.status, e.body(), headers
+
+            if isinstance(body, tuple):
+                body, extra = body
+                headers.update(extra)
+            if self.etags and method == 'GET':
+                return self._tagged(request, body, headers)
+            return 200, body, headers
+
+    def _tagged(self, request: LocalRequest, body: Any, headers: Dict[str, str]) -> Result:
+        content = json.dumps(body, ensure_ascii=False, default=str).encode()
+        etag = f'W/"{hashlib.blake2b(content, digest_size=8).hexdigest()}"'
+        headers['ETag'] = etag
+        if _header(request, 'If-None-Match') == etag:
+            return 304, b'', headers
+        headers['Content-Type'] = 'application/json; charset=utf-8'
+        return 200, content, headers
+
+    def _fault(self, endpoint: str) -> Optional[int]:
+        for fault in self._faults:
+            status, times, pattern = fault
+            if times > 0 and (pattern is None or pattern.search(endpoint)):
+                fault[1] -= 1
+                if fault[1] == 0:
+                    self._faults.remove(fault)
+                return status
+        roll = self._rng.random()
+        if roll < self.disconnect_rate:
+            return 0
+        if roll < self.disconnect_rate + self.error_rate:
+            return self._rng.choice(self.error_statuses)
+        return None
+
+    def _error_response(self, status: int) -> Result:
+        if status == 429:
+            return 429, ApiError(429, 'RATE_LIMIT_EXCEEDED', 'Слишком много запросов', 1).body(), {'Retry-After': '1'}
+        # proxies in front of the API answer with HTML, not an error envelope
+        return status, _UNAVAILABLE, {'Content-Type': 'text/html'}
+
+    def _check_rate_limit(self, request: LocalRequest, headers: Dict[str, str]):
+        if not self.rate_limit:
+            return
+        limit, window = self.rate_limit
+        key = _header(request, 'Authorization') or _cookie(request, 'refresh_token') or 'anonymous'
+        now = time.monotonic()
+        state = self._windows.get(key)
+        if state is None or now - state[0] >= window:
+            state = self._windows[key] = [now, 0]
+        state[1] += 1
+        reset = max(1, int(state[0] + window - now + 0.999))
+
+        if self.rate_limit_headers:
+            headers['X-RateLimit-Limit'] = str(limit)
+            headers['X-RateLimit-Remaining'] = str(max(0, limit - int(state[1])))
+            headers['X-RateLimit-Reset'] = str(reset)
+            headers['X-RateLimit-Window'] = str(int(window))
+        if state[1] > limit:
+            raise ApiError(429, 'RATE_LIMIT_EXCEEDED', 'Слишком много запросов', reset)
+
+    def _media(self, request: LocalRequest) -> Result:
+        file = self.files.get(request.path.split('/')[2])
+        if file is None or request.method.upper() != 'GET':
+            return 404, b'Not Found', {'Content-Type': 'text/plain'}
+        content = file['content']
+        headers = {'Content-Type': file['mimeType'], 'Accept-Ranges': 'bytes'}
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', _header(request, 'Range') or '')
+        if match is None:
+            return 200, content, headers
+        start = int(match[1])
+        end = min(int(match[2]) if match[2] else len(content) - 1, len(content) - 1)
+        if start >= len(content):
+            return 416, b'', {**headers, 'Content-Range': f'bytes */{len(content)}'}
+        return 206, content[start:end + 1], {**headers, 'Content-Range': f'bytes {start}-{end}/{len(content)}'}
+
+# --- helpers ---
+
+    def _now(self) -> datetime:
+        # strictly increasing millisecond timestamps keep datetime cursors unambiguous
+        now = datetime.now(timezone.utc)
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        self._clock = max(now, self._clock + timedelta(milliseconds=1))
+        return self._clock
+
+    def _issue_token(self, user: dict) -> str:
+        # unsigned JWT, so clients can read `exp` like with the real API
+        claims: Dict[str, Any] = {'sub': user['id'], 'jti': uuid4().hex}
+        if self.token_ttl:
+            claims['exp'] = int(time.time() + self.token_ttl)
+        token = '.'.join(_b64url(json.dumps(part).encode()) for part in ({'alg': 'none', 'typ': 'JWT'}, claims)) + '.'
+        self.tokens[token] = (user['id'], time.monotonic() + self.token_ttl if self.token_ttl else None)
+        return token
+
+    def _viewer(self, request: LocalRequest) -> dict:
+        auth = _header(request, 'Authorization') or ''
+        entry = self.tokens.get(auth.replace('Bearer ', ''))
+        if entry is None or (entry[1] is not None and entry[1] < time.monotonic()):
+            raise ApiError(401, 'UNAUTHORIZED', 'Требуется авторизация')
+        user = self.users[entry[0]]
+        if user.get('banned'):
+            raise ApiError(403, 'ACCOUNT_BANNED', 'Аккаунт деактивирован')
+        return user
+
+    def _user_by_name(self, username: str, viewer: Optional[dict] = None) -> dict:
+        if username == 'me' and viewer is not None:
+            return viewer
+        user = self.users.get(username) or self.users.get(self._usernames.get(username.lower(), ''))
+        if user is None:
+            raise ApiError(404, 'NOT_FOUND', 'Пользователь не найден')
+        return user
+
+    def _post(self, post_id: str, deleted: bool = False) -> dict:
+        post = self.posts.get(post_id)
+        if post is None or (post['deletedAt'] and not deleted):
+            raise ApiError(404, 'NOT_FOUND', 'Пост не найден')
+        return post
+
+    def _comment(self, comment_id: str) -> dict:
+        comment = self.comments.get(comment_id)
+        if comment is None or comment['deleted']:
+            raise ApiError(404, 'NOT_FOUND', 'Комментарий не найден')
+        return comment
+
+    @staticmethod
+    def _body(request: LocalRequest) -> dict:
+        return request.json if isinstance(request.json, dict) else {}
+
+    @staticmethod
+    def _int(request: LocalRequest, name: str, default: int) -> int:
+        try:
+            return int(request.query.get(name, default))
+        except ValueError:
+            raise ApiError(400, 'VALIDATION_ERROR', f'Invalid {name}')
+
+    def _limit(self, request: LocalRequest, default: int) -> int:
+        limit = self._int(request, 'limit', default)
+        if not 1 <= limit <= 100:
+            raise ApiError(400, 'VALIDATION_ERROR', 'limit must be between 1 and 100')
+        return limit
+
+    def _notify(self, recipient: dict, actor: dict, type: str, target_id: str, preview: str = ''):
+        if recipient is actor:
+            return
+        self.notifications[recipient['id']].insert(0, {
+            'id': str(uuid4()),
+            'type': type,
+            'targetType': 'post',
+            'targetId': target_id,
+            'preview': preview[:100] or None,
+            'createdAt': self._now(),
+            'actorId': actor['id'],
+            'readAt': None,
+        })
+
+    def _add_follow(self, follower: dict, target: dict):
+        if target['id'] in self._following_of[follower['id']]:
+            return
+        now = self._now()
+        self._following_of[follower['id']][target['id']] = now
+        self._followers_of[target['id']][follower['id']] = now
+        self._notify(target, follower, 'follow', follower['id'])
+
+    def _owned_files(self, viewer: dict, ids: Iterable[Any]) -> List[str]:
+        ids = [str(i) for i in ids or []]
+        for file_id in ids:
+            file = self.files.get(file_id)
+            if file is None:
+                raise ApiError(404, 'NOT_FOUND', 'Файл не найден')
+            if file['ownerId'] != viewer['id']:
+                raise ApiError(403, 'FORBIDDEN', 'Некоторые файлы не принадлежат вам')
+        return ids
+
+    def _new_post(self, author: dict, content: str, created_at: Optional[datetime] = None, **fields) -> dict:
+        post = {
+            'id': str(uuid4()),
+            'authorId': author['id'],
+            'content': content,
+            'spans': [],
+            'attachmentIds': [],
+            'createdAt': created_at or self._now(),
+            'updatedAt': None,
+            'deletedAt': None,
+            'wallRecipientId': None,
+            'originalPostId': None,
+            'pollId': None,
+            'likes': {},
+            'views': set(),
+            'reposts': set(),
+            'commentIds': [],
+            **fields
+        }
+        post['hashtags'] = [tag.lower() for tag in _HASHTAG.findall(content)]
+        post['spans'] = list(post['spans']) + [
+            {'type': 'hashtag', 'offset': m.start(), 'length': len(m.group(0))}
+            for m in _HASHTAG.finditer(content)
+        ]
+        self.posts[post['id']] = post
+        return post
+
+    def _new_comment(self, author: dict, post: dict, content: str, parent: Optional[dict] = None, attachment_ids: Iterable[str] = (), reply_to: Optional[str] = None) -> dict:
+        comment = {
+            'id': str(uuid4()),
+            'postId': post['id'],
+            'parentId': parent['id'] if parent else None,
+            'authorId': author['id'],
+            'content': content,
+            'attachmentIds': list(attachment_ids),
+            'createdAt': self._now(),
+            'likes': {},
+            'replyIds': [],
+            'replyToUserId': reply_to,
+            'deleted': False,
+        }
+        self.comments[comment['id']] = comment
+        if parent:
+            parent['replyIds'].append(comment['id'])
+        else:
+            post['commentIds'].append(comment['id'])
+        return comment
+
+    def _comments_count(self, post: dict) -> int:
+        count = 0
+        for comment_id in post['commentIds']:
+            comment = self.comments[comment_id]
+            if not comment['deleted']:
+                count += 1 + sum(not self.comments[r]['deleted'] for r in comment['replyIds'])
+        return count
+
+# --- rendering ---
+
+    def _render_user(self, user: dict) -> dict:
+        return {
+            'id': user['id'],
+            'username': user['username'],
+            'displayName': user['displayName'],
+            'avatar': user['avatar'],
+            'verified': user['verified'],
+            'followersCount': len(self._followers_of[user['id']]),
+        }
+
+    def _render_user_full(self, user: dict, viewer: dict) -> dict:
+        pin = user['pin']
+        return {
+            **self._render_user(user),
+            'banner': user['banner'],
+            'bio': user['bio'],
+            'pin': {'slug': pin, 'name': PINS[pin][0], 'description': PINS[pin][1]} if pin else None,
+            'pinnedPostId': user['pinnedPostId'],
+            'isPrivate': user['isPrivate'],
+            'wallClosed': user['wallAccess'] == 'nobody',
+            'followingCount': len(self._following_of[user['id']]),
+            'postsCount': sum(1 for p in self.posts.values() if p['authorId'] == user['id'] and not p['deletedAt']),
+            'createdAt': _iso(user['createdAt']),
+            'isFollowing': user['id'] in self._following_of[viewer['id']],
+            'isFollowedBy': viewer['id'] in self._following_of[user['id']],
+            'online': user is viewer,
+        }
+
+    def _render_file(self, file: dict) -> dict:
+        split = urlsplit(self.base_url)
+        url = f'{split.scheme}://{split.netloc}/media/{file["id"]}'
+        return {
+            'id': file['id'],
+            'type': file['type'],
+            'url': url,
+            'thumbnailUrl': url if file['type'] == 'image' else None,
+            'filename': file['filename'],
+            'mimeType': file['mimeType'],
+            'size': file['size'],
+            'createdAt': _iso(file['createdAt']),
+        }
+
+    def _render_poll(self, poll: dict, viewer: dict) -> dict:
+        voted = poll['votes'].get(viewer['id'], [])
+        return {
+            'id': poll['id'],
+            'postId': poll['postId'],
+            'question': poll['question'],
+            'options': [
+                {'id': o['id'], 'text': o['text'], 'position': i, 'votesCount': sum(o['id'] in v for v in poll['votes'].values())}
+                for i, o in enumerate(poll['options'])
+            ],
+            'multipleChoice': poll['multipleChoice'],
+            'totalVotes': len(poll['votes']),
+            'hasVoted': bool(voted),
+            'votedOptionIds': voted,
+            'createdAt': _iso(poll['createdAt']),
+        }
+
+    def _render_post(self, post: dict, viewer: dict, nested: bool = False) -> dict:
+        author = self.users[post['authorId']]
+        original = self.posts.get(post['originalPostId'] or '')
+        recipient = self.users.get(post['wallRecipientId'] or '')
+        return {
+            'id': post['id'],
+            'content': post['content'],
+            'author': self._render_user(author),
+            'attachments': [self._render_file(self.files[i]) for i in post['attachmentIds'] if i in self.files],
+            'spans': post['spans'],
+            'likesCount': len(post['likes']),
+            'commentsCount': self._comments_count(post),
+            'repostsCount': len(post['reposts']),
+            'viewsCount': len(post['views']),
+            'createdAt': _iso(post['createdAt']),
+            'isLiked': viewer['id'] in post['likes'],
+            'isReposted': viewer['id'] in post['reposts'],
+            'isOwner': author is viewer,
+            'isViewed': viewer['id'] in post['views'],
+            'isPinned': author['pinnedPostId'] == post['id'],
+            'wallRecipientId': recipient['id'] if recipient else None,
+            'wallRecipient': self._render_user(recipient) if recipient else None,
+            'originalPost': self._render_post(original, viewer, True) if original and not nested else None,
+            'poll': self._render_poll(self.polls[post['pollId']], viewer) if post['pollId'] else None,
+        }
+
+    def _render_comment(self, comment: dict, viewer: dict) -> dict:
+        return {
+            'id': comment['id'],
+            'content': comment['content'],
+            'author': self._render_user(self.users[comment['authorId']]),
+            'likesCount': len(comment['likes']),
+            'repliesCount': sum(not self.comments[r]['deleted'] for r in comment['replyIds']),
+            'isLiked': viewer['id'] in comment['likes'],
+            'createdAt': _iso(comment['createdAt']),
+            'attachments': [self._render_file(self.files[i]) for i in comment['attachmentIds'] if i in self.files],
+            'replies': [],
+        }
+
+    def _render_notification(self, notification: dict) -> dict:
+        actor = self.users[notification['actorId']]
+        return {
+            'id': notification['id'],
+            'type': notification['type'],
+            'targetType': notification['targetType'],
+            'targetId': notification['targetId'],
+            'preview': notification['preview'],
+            'readAt': _iso(notification['readAt']),
+            'createdAt': _iso(notification['createdAt']),
+            'actor': {'id': actor['id'], 'displayName': actor['displayName'], 'username': actor['username'], 'avatar': actor['avatar']},
+            'read': notification['readAt'] is not None,
+        }
+
+    def _feed(self, posts: List[dict], viewer: dict, limit: int, offset: int) -> dict:
+        # offset cursor: `nextCursor` is the number of posts already returned
+        page = posts[offset:offset + limit]
+        has_more = offset + limit < len(posts)
+        return {
+            'posts': [self._render_post(p, viewer) for p in page],
+            'pagination': {'limit': limit, 'nextCursor': str(offset + limit) if has_more else None, 'hasMore': has_more},
+        }
+
+    def _user_page(self, request: LocalRequest, ids: List[str]) -> dict:
+        page, limit = self._int(request, 'page', 1), self._limit(request, 30)
+        start = (max(page, 1) - 1) * limit
+        return {
+            'users': [self._render_user(self.users[i]) for i in ids[start:start + limit]],
+            'pagination': {'page': page, 'limit': limit, 'total': len(ids), 'hasMore': start + limit < len(ids)},
+        }
+
+    def _visible_posts(self) -> List[dict]:
+        return sorted((p for p in self.posts.values() if not p['deletedAt']), key=lambda p: p['createdAt'], reverse=True)
+
+# --- auth ---
+
+    def _refresh(self, request):
+        refresh = _cookie(request, 'refresh_token')
+        if not refresh:
+            raise ApiError(401, 'REFRESH_TOKEN_MISSING', 'Refresh token missing')
+        user_id = self.refresh_tokens.pop(refresh, None)
+        if user_id is None:
+            raise ApiError(401, 'SESSION_NOT_FOUND', 'Session not found')
+        rotated = uuid4().hex
+        self.refresh_tokens[rotated] = user_id
+        return {'accessToken': self._issue_token(self.users[user_id])}, {'Set-Cookie': f'refresh_token={rotated}; Path=/; HttpOnly'}
+
+    def _change_password(self, request):
+        viewer = self._viewer(request)
+        body = self._body(request)
+        if body.get('oldPassword') != viewer['password']:
+            raise ApiError(400, 'INVALID_OLD_PASSWORD', 'Неверный текущий пароль')
+        if body.get('newPassword') == viewer['password']:
+            raise ApiError(400, 'SAME_PASSWORD', 'Новый пароль совпадает с текущим')
+        viewer['password'] = body.get('newPassword')
+        return {'message': 'Password changed successfully'}
+
+    def _logout(self, request):
+        refresh = _cookie(request, 'refresh_token')
+        if refresh not in self.refresh_tokens:
+            raise ApiError(401, 'SESSION_NOT_FOUND', 'Session not found')
+        user_id = self.refresh_tokens.pop(refresh)
+        for token, (owner, _) in list(self.tokens.items()):
+            if owner == user_id:
+                del self.tokens[token]
+        return {'success': True}
+
+# --- users ---
+
+    def _get_user(self, request, username):
+        viewer = self._viewer(request)
+        return self._render_user_full(self._user_by_name(username, viewer), viewer)
+
+    def _update_profile(self, request):
+        viewer = self._viewer(request)
+        body = self._body(request)
+        if 'username' in body:
+            username = body['username']
+            if not re.fullmatch(r'\w{3,32}', username):
+                raise ApiError(400, 'VALIDATION_ERROR', 'Invalid username')
+            owner = self._usernames.get(username.lower())
+            if owner and owner != viewer['id']:
+                raise ApiError(409, 'USERNAME_TAKEN', 'Имя пользователя занято')
+            del self._usernames[viewer['username'].lower()]
+            self._usernames[username.lower()] = viewer['id']
+            viewer['username'] = username
+        if 'displayName' in body:
+            viewer['displayName'] = body['displayName']
+        if 'bio' in body:
+            viewer['bio'] = body['bio']
+        if 'bannerId' in body:
+            file = self.files.get(str(body['bannerId']))
+            if file is None or file['ownerId'] != viewer['id']:
+                raise ApiError(404, 'NOT_FOUND', 'Файл не найден')
+            if file['type'] != 'image':
+                raise ApiError(400, 'VALIDATION_ERROR', 'Баннер может быть только изображением')
+            viewer['banner'] = self._render_file(file)['url']
+        return {'id': viewer['id'], 'username': viewer['username'], 'displayName': viewer['displayName'], 'bio': viewer['bio'], 'updatedAt': _iso(self._now())}
+
+    def _update_privacy(self, request):
+        viewer = self._viewer(request)
+        body = self._body(request)
+        for key in ('isPrivate', 'wallAccess', 'likesVisibility'):
+            if key in body:
+                viewer[key] = body[key]
+        return {'isPrivate': viewer['isPrivate'], 'wallAccess': viewer['wallAccess'], 'likesVisibility': viewer['likesVisibility']}
+
+    def _follow(self, request, username):
+        viewer = self._viewer(request)
+        target = self._user_by_name(username, viewer)
+        if target is viewer:
+            raise ApiError(400, 'VALIDATION_ERROR', 'Нельзя подписаться на себя')
+        self._add_follow(viewer, target)
+        return {'following': True, 'followersCount': len(self._followers_of[target['id']])}
+
+    def _unfollow(self, request, username):
+        viewer = self._viewer(request)
+        target = self._user_by_name(username, viewer)
+        self._following_of[viewer['id']].pop(target['id'], None)
+        self._followers_of[target['id']].pop(viewer['id'], None)
+        return {'following': False, 'followersCount': len(self._followers_of[target['id']])}
+
+    def _followers(self, request, username):
+        user = self._user_by_name(username, self._viewer(request))
+        return self._user_page(request, list(reversed(self._followers_of[user['id']])))
+
+    def _following(self, request, username):
+        user = self._user_by_name(username, self._viewer(request))
+        return self._user_page(request, list(reversed(self._following_of[user['id']])))
+
+    def _get_pins(self, request):
+        viewer = self._viewer(request)
+        return {
+            'pins': [{'slug': slug, 'name': PINS[slug][0], 'description': PINS[slug][1], 'grantedAt': _iso(at)} for slug, at in viewer['pins'].items()],
+            'activePin': viewer['pin'],
+        }
+
+    def _set_pin(self, request):
+        viewer = self._viewer(request)
+        slug = self._body(request).get('slug')
+        if slug not in PINS:
+            raise ApiError(400, 'VALIDATION_ERROR', 'Unknown pin')
+        if slug not in viewer['pins']:
+            raise ApiError(403, 'PIN_NOT_OWNED', 'У вас нет этого значка')
+        viewer['pin'] = slug
+        return {'pin': {'slug': slug, 'name': PINS[slug][0], 'description': PINS[slug][1]}}
+
+    def _remove_pin(self, request):
+        self._viewer(request)['pin'] = None
+        return {'success': True}
+
+    def _top_clans(self, request):
+        self._viewer(request)
+        clans = Counter(u['avatar'] for u in self.users.values())
+        return {'clans': [{'avatar': avatar, 'memberCount': count} for avatar, count in clans.most_common(10)]}
+
+    def _who_to_follow(self, request):
+        viewer = self._viewer(request)
+        candidates = [u for u in self.users.values() if u is not viewer and u['id'] not in self._following_of[viewer['id']]]
+        candidates.sort(key=lambda u: len(self._followers_of[u['id']]), reverse=True)
+        return {'users': [self._render_user(u) for u in candidates[:10]]}
+
+# --- posts ---
+
+    def _get_posts(self, request):
+        viewer = self._viewer(request)
+        posts = self._visible_posts()
+        if request.query.get('username'):
+            author = self._user_by_name(request.query['username'], viewer)
+            posts = [p for p in posts if p['authorId'] == author['id']]
+        tab = request.query.get('tab')
+        if tab == 'following':
+            following = self._following_of[viewer['id']]
+            posts = [p for p in posts if p['authorId'] in following]
+        elif tab == 'popular' or request.query.get('sort') == 'popular':
+            posts.sort(key=lambda p: len(p['likes']), reverse=True)
+        return self._feed(posts, viewer, self._limit(request, 20), self._int(request, 'cursor', 0))
+
+    def _user_posts(self, request, username):
+        # datetime cursor: posts created before `cursor`
+        viewer = self._viewer(request)
+        author = self._user_by_name(username, viewer)
+        limit = self._limit(request, 20)
+        posts = [p for p in self._visible_posts() if p['authorId'] == author['id'] or p['wallRecipientId'] == author['id']]
+        if request.query.get('cursor'):
+            try:
+                cursor = _parse_datetime(request.query['cursor'])
+            except ValueError:
+                raise ApiError(400, 'VALIDATION_ERROR', 'Invalid cursor')
+            posts = [p for p in posts if p['createdAt'] < cursor]
+        page = posts[:limit]
+        has_more = len(posts) > limit
+        return {
+            'posts': [self._render_post(p, viewer) for p in page],
+            'pagination': {'limit': limit, 'nextCursor': _iso(page[-1]['createdAt']) if has_more else None, 'hasMore': has_more},
+        }
+
+    def _liked_posts(self, request, username):
+        viewer = self._viewer(request)
+        user = self._user_by_name(username, viewer)
+        if user is not viewer and user['likesVisibility'] == 'nobody':
+            raise ApiError(403, 'FORBIDDEN', 'Лайки скрыты')
+        posts = [p for p in self.posts.values() if user['id'] in p['likes'] and not p['deletedAt']]
+        posts.sort(key=lambda p: p['likes'][user['id']], reverse=True)
+        return self._feed(posts, viewer, self._limit(request, 20), self._int(request, 'cursor', 0))
+
+    def _get_post(self, request, id):
+        viewer = self._viewer(request)
+        return self._render_post(self._post(id), viewer)
+
+    def _create_post(self, request):
+        viewer = self._viewer(request)
+        body = self._body(request)
+        content = body.get('content') or ''
+        attachment_ids = self._owned_files(viewer, body.get('attachmentIds'))
+        if not content.strip() and not attachment_ids and not body.get('poll'):
+            raise ApiError(400, 'VALIDATION_ERROR', 'Пост не может быть пустым')
+        if len(content) > 10000:
+            raise ApiError(400, 'VALIDATION_ERROR', 'Пост слишком длинный')
+
+        recipient = None
+        if body.get('wallRecipientId'):
+            recipient = self.users.get(str(body['wallRecipientId']))
+            if recipient is None:
+                raise ApiError(404, 'NOT_FOUND', 'Пользователь не найден')
+            if recipient['wallAccess'] == 'nobody' and recipient is not viewer:
+                raise ApiError(403, 'FORBIDDEN', 'Стена закрыта')
+
+        post = self._new_post(viewer, content, spans=body.get('spans') or [], attachmentIds=attachment_ids, wallRecipientId=recipient['id'] if recipient else None)
+        if body.get('poll'):
+            poll = body['poll']
+            options = poll.get('options') or []
+            if len(options) < 2:
+                raise ApiError(400, 'VALIDATION_ERROR', 'В опросе должно быть минимум 2 варианта')
+            post['pollId'] = str(uuid4())
+            self.polls[post['pollId']] = {
+                'id': post['pollId'],
+                'postId': post['id'],
+                'question': poll.get('question'),
+                'options': [{'id': str(uuid4()), 'text': o['text']} for o in options],
+                'multipleChoice': bool(poll.get('multipleChoice')),
+                'votes': {},
+                'createdAt': post['createdAt'],
+            }
+        if recipient:
+            self._notify(recipient, viewer, 'wall_post', post['id'], content)
+        return self._render_post(post, viewer)
+
+    def _edit_post(self, request, id):
+        viewer = self._viewer(request)
+        post = self._post(id)
+        if post['authorId'] != viewer['id']:
+            raise ApiError(403, 'FORBIDDEN', 'Нет доступа')
+        content = self._body(request).get('content') or ''
+        if not content.strip():
+            raise ApiError(400, 'VALIDATION_ERROR', 'Пост не может быть пустым')
+        post['content'] = content
+        post['updatedAt'] = self._now()
+        return {'id': post['id'], 'content': content, 'updatedAt': _iso(post['updatedAt'])}
+
+    def _delete_post(self, request, id):
+        viewer = self._viewer(request)
+        post = self._post(id)
+        if post['authorId'] != viewer['id']:
+            raise ApiError(403, 'FORBIDDEN', 'Нет доступа')
+        post['deletedAt'] = self._now()
+        return {'success': True}
+
+    def _restore_post(self, request, id):
+        viewer = self._viewer(request)
+        post = self._post(id, deleted=True)
+        if post['authorId'] != viewer['id']:
+            raise ApiError(403, 'FORBIDDEN', 'Нет доступа')
+        post['deletedAt'] = None
+        return {'success': True}
+
+    def _pin_post(self, request, id):
+        viewer = self._viewer(request)
+        post = self._post(id)
+        if post['authorId'] != viewer['id']:
+            raise ApiError(403, 'FORBIDDEN', 'Нет доступа')
+        viewer['pinnedPostId'] = None if viewer['pinnedPostId'] == id else id
+        return {'success': True, 'pinnedPostId': viewer['pinnedPostId']}
+
+    def _repost(self, request, id):
+        viewer = self._viewer(request)
+        original = self._post(id)
+        if original['authorId'] == viewer['id']:
+            raise ApiError(400, 'VALIDATION_ERROR', 'Cannot repost your own post')
+        if viewer['id'] in original['reposts']:
+            raise ApiError(409, 'CONFLICT', 'Вы уже сделали репост')
+        original['reposts'].add(viewer['id'])
+        post = self._new_post(viewer, self._body(request).get('content') or '', originalPostId=original['id'])
+        self._notify(self.users[original['authorId']], viewer, 'repost', original['id'], original['content'])
+        return self._render_post(post, viewer)
+
+    def _view_post(self, request, id):
+        self._post(id)['views'].add(self._viewer(request)['id'])
+        return {'success': True}
+
+    def _like_post(self, request, id):
+        viewer = self._viewer(request)
+        post = self._post(id)
+        if viewer['id'] not in post['likes']:
+            post['likes'][viewer['id']] = self._now()
+            self._notify(self.users[post['authorId']], viewer, 'like', post['id'], post['content'])
+        return {'liked': True, 'likesCount': len(post['likes'])}
+
+    def _unlike_post(self, request, id):
+        viewer = self._viewer(request)
+        post = self._post(id)
+        post['likes'].pop(viewer['id'], None)
+        return {'liked': False, 'likesCount': len(post['likes'])}
+
+# --- comments ---
+
+    def _get_comments(self, request, id):
+        # offset cursor: `nextCursor` is the number of comments already returned
+        viewer = self._viewer(request)
+        post = self._post(id)
+        limit, offset = self._limit(request, 20), self._int(request, 'cursor', 0)
+        comments = [self.comments[i] for i in post['commentIds'] if not self.comments[i]['deleted']]
+        sort = request.query.get('sort', 'popular')
+        if sort == 'popular':
+            comments.sort(key=lambda c: len(c['likes']), reverse=True)
+        elif sort == 'newest':
+            comments.reverse()
+        page = comments[offset:offset + limit]
+        has_more = offset + limit < len(comments)
+        return {
+            'comments': [self._render_comment(c, viewer) for c in page],
+            'total': len(comments),
+            'hasMore': has_more,
+            'nextCursor': offset + limit if has_more else None,
+        }
+
+    def _get_replies(self, request, id):
+        viewer = self._viewer(request)
+        comment = self._comment(id)
+        page, limit = self._int(request, 'page', 1), self._limit(request, 50)
+        replies = [self.comments[i] for i in comment['replyIds'] if not self.comments[i]['deleted']]
+        if request.query.get('sort') == 'newest':
+            replies.reverse()
+        start = (max(page, 1) - 1) * limit
+        return {
+            'replies': [self._render_comment(c, viewer) for c in replies[start:start + limit]],
+            'pagination': {'page': page, 'limit': limit, 'total': len(replies), 'hasMore': start + limit < len(replies)},
+        }
+
+    def _comment_body(self, request, viewer) -> Tuple[str, List[str]]:
+        body = self._body(request)
+        content = body.get('content') or ''
+        attachment_ids = self._owned_files(viewer, body.get('attachmentIds'))
+        if not content.strip() and not attachment_ids:
+            raise ApiError(400, 'VALIDATION_ERROR', 'Комментарий не может быть пустым')
+        return content, attachment_ids
+
+    def _add_comment(self, request, id):
+        viewer = self._viewer(request)
+        post = self._post(id)
+        content, attachment_ids = self._comment_body(request, viewer)
+        comment = self._new_comment(viewer, post, content, attachment_ids=attachment_ids)
+        self._notify(self.users[post['authorId']], viewer, 'comment', post['id'], content)
+        return self._render_comment(comment, viewer)
+
+    def _add_reply(self, request, id):
+        viewer = self._viewer(request)
+        parent = self._comment(id)
+        content, attachment_ids = self._comment_body(request, viewer)
+        reply_to = self._body(request).get('replyToUserId')
+        if reply_to is not None and str(reply_to) not in self.users:
+            raise ApiError(500, 'FAILED_QUERY', 'Failed query')
+        recipient = self.users[str(reply_to)] if reply_to else self.users[parent['authorId']]
+        comment = self._new_comment(viewer, self.posts[parent['postId']], content, parent, attachment_ids, recipient['id'])
+        self._notify(recipient, viewer, 'reply', parent['postId'], content)
+        return self._render_comment(comment, viewer)
+
+    def _like_comment(self, request, id):
+        viewer = self._viewer(request)
+        comment = self._comment(id)
+        if viewer['id'] not in comment['likes']:
+            comment['likes'][viewer['id']] = self._now()
+            self._notify(self.users[comment['authorId']], viewer, 'like', comment['postId'], comment['content'])
+        return {'liked': True, 'likesCount': len(comment['likes'])}
+
+    def _unlike_comment(self, request, id):
+        viewer = self._viewer(request)
+        comment = self._comment(id)
+        comment['likes'].pop(viewer['id'], None)
+        return {'liked': False, 'likesCount': len(comment['likes'])}
+
+    def _delete_comment(self, request, id):
+        viewer = self._viewer(request)
+        comment = self._comment(id)
+        post_author = self.posts[comment['postId']]['authorId']
+        if viewer['id'] not in (comment['authorId'], post_author):
+            raise ApiError(403, 'FORBIDDEN', 'Нет доступа')
+        comment['deleted'] = True
+        return {'success': True}
+
+# --- hashtags and search ---
+
+    def _hashtag(self, name: str) -> dict:
+        count = sum(1 for p in self.posts.values() if name in p['hashtags'] and not p['deletedAt'])
+        return {'id': str(uuid5(NAMESPACE_URL, name)), 'name': name, 'postsCount': count}
+
+    def _trending(self, request):
+        self._viewer(request)
+        tags = Counter(t for p in self.posts.values() if not p['deletedAt'] for t in set(p['hashtags']))
+        return {'hashtags': [self._hashtag(t) for t, _ in tags.most_common(self._limit(request, 10))]}
+
+    def _hashtag_posts(self, request, hashtag):
+        viewer = self._viewer(request)
+        name = hashtag.lower().lstrip('#')
+        posts = [p for p in self._visible_posts() if name in p['hashtags']]
+        offset = request.query.get('offset', '0')
+        if offset.isdigit():
+            offset = int(offset)
+        else:
+            # a post id: continue after that post
+            ids = [p['id'] for p in posts]
+            if offset not in ids:
+                raise ApiError(400, 'VALIDATION_ERROR', 'Invalid offset')
+            offset = ids.index(offset) + 1
+        return {**self._feed(posts, viewer, self._limit(request, 20), offset), 'hashtag': self._hashtag(name)}
+
+    def _search(self, request):
+        self._viewer(request)
+        query = request.query.get('q', '').lower().lstrip('#@')
+        if len(query) > 500:
+            raise ApiError(414, 'URI_TOO_LONG', 'Слишком длинный запрос')
+        users = [u for u in self.users.values() if query in u['username'].lower() or query in u['displayName'].lower()]
+        tags = sorted({t for p in self.posts.values() for t in p['hashtags'] if query in t})
+        return {
+            'users': [self._render_user(u) for u in users[:self._int(request, 'userLimit', 5)]],
+            'hashtags': [self._hashtag(t) for t in tags[:self._int(request, 'hashtagLimit', 5)]],
+        }
+
+# --- notifications ---
+
+    def _get_notifications(self, request):
+        viewer = self._viewer(request)
+        limit, offset = self._limit(request, 20), self._int(request, 'cursor', 0)
+        notifications = self.notifications[viewer['id']]
+        if request.query.get('type'):
+            notifications = [n for n in notifications if n['type'] == request.query['type']]
+        return {
+            'notifications': [self._render_notification(n) for n in notifications[offset:offset + limit]],
+            'hasMore': offset + limit < len(notifications),
+        }
+
+    def _notifications_count(self, request):
+        viewer = self._viewer(request)
+        return {'count': sum(n['readAt'] is None for n in self.notifications[viewer['id']])}
+
+    def _mark_read(self, viewer: dict, ids: Iterable[str]) -> int:
+        ids = set(map(str, ids))
+        now = self._now()
+        marked = 0
+        for notification in self.notifications[viewer['id']]:
+            if notification['id'] in ids and notification['readAt'] is None:
+                notification['readAt'] = now
+                marked += 1
+        return marked
+
+    def _read(self, request, id):
+        viewer = self._viewer(request)
+        if not any(n['id'] == id for n in self.notifications[viewer['id']]):
+            raise ApiError(404, 'NOT_FOUND', 'Уведомление не найдено')
+        self._mark_read(viewer, [id])
+        return {'success': True}
+
+    def _read_batch(self, request):
+        viewer = self._viewer(request)
+        ids = self._body(request).get('ids') or []
+        if not ids or len(ids) > 100:
+            raise ApiError(400, 'VALIDATION_ERROR', 'ids must contain 1 to 100 items')
+        return {'success': True, 'count': self._mark_read(viewer, ids)}
+
+    def _read_all(self, request):
+        viewer = self._viewer(request)
+        return {'success': True, 'count': self._mark_read(viewer, [n['id'] for n in self.notifications[viewer['id']]])}
+
+# --- files ---
+
+    max_upload_size = 50 * 1024 * 1024
+
+    def _upload(self, request):
+        viewer = self._viewer(request)
+        if not request.files or 'file' not in request.files:
+            raise ApiError(400, 'VALIDATION_ERROR', 'Файл не передан')
+        name, data, mime = (tuple(request.files['file']) + (None,))[:3]
+        content = _read(data)
+        if len(content) > self.max_upload_size:
+            raise ApiError(413, 'FILE_TOO_LARGE', 'Файл слишком большой')
+        mime = mime or 'application/octet-stream'
+        file = {
+            'id': str(uuid4()),
+            'ownerId': viewer['id'],
+            'filename': name,
+            'mimeType': mime,
+            'type': _attach_type(mime),
+            'size': len(content),
+            'content': content,
+            'createdAt': self._now(),
+        }
+        self.files[file['id']] = file
+        return self._render_file(file)
+
+    def _get_file(self, request, id):
+        viewer = self._viewer(request)
+        file = self.files.get(id)
+        if file is None or file['ownerId'] != viewer['id']:
+            raise ApiError(404, 'NOT_FOUND', 'Файл не найден или нет доступа')
+        return self._render_file(file)
+
+    def _delete_file(self, request, id):
+        viewer = self._viewer(request)
+        file = self.files.get(id)
+        if file is None:
+            raise ApiError(404, 'NOT_FOUND', 'Файл не найден')
+        if file['ownerId'] != viewer['id']:
+            raise ApiError(403, 'FORBIDDEN', 'Нет доступа')
+        del self.files[id]
+        return self._render_file(file)
+
+# --- polls, reports, verification, platform ---
+
+    def _vote(self, request):
+        viewer = self._viewer(request)
+        ids = [str(i) for i in self._body(request).get('optionIds') or []]
+        if not ids:
+            raise ApiError(400, 'VALIDATION_ERROR', 'Выберите хотя бы один вариант')
+        polls = [p for p in self.polls.values() if any(o['id'] in ids for o in p['options'])]
+        if not polls:
+            raise ApiError(404, 'NOT_FOUND', 'Опрос не найден')
+        poll = polls[0]
+        if len(polls) > 1 or not set(ids) <= {o['id'] for o in poll['options']}:
+            raise ApiError(400, 'VALIDATION_ERROR', 'Один или несколько вариантов не принадлежат этому опросу')
+        if len(ids) > 1 and not poll['multipleChoice']:
+            raise ApiError(400, 'VALIDATION_ERROR', 'В этом опросе можно выбрать только один вариант')
+        poll['votes'][viewer['id']] = ids
+        return self._render_poll(poll, viewer)
+
+    def _report(self, request):
+        viewer = self._viewer(request)
+        body = self._body(request)
+        target_id, target_type = str(body.get('targetId')), body.get('targetType')
+        targets = {'post': self.posts, 'comment': self.comments, 'user': self.users}
+        if target_type not in targets or target_id not in targets[target_type]:
+            raise ApiError(400, 'VALIDATION_ERROR', 'Объект жалобы не найден')
+        if any(r['userId'] == viewer['id'] and r['targetId'] == target_id for r in self.reports):
+            raise ApiError(400, 'VALIDATION_ERROR', 'Вы уже отправляли жалобу')
+        report = {'id': str(uuid4()), 'userId': viewer['id'], 'targetId': target_id, 'targetType': target_type, 'reason': body.get('reason'), 'createdAt': self._now()}
+        self.reports.append(report)
+        return {'id': report['id'], 'createdAt': _iso(report['createdAt'])}
+
+    def _verify(self, request):
+        viewer = self._viewer(request)
+        current = self.verifications.get(viewer['id'])
+        if current and current['status'] == 'pending':
+            raise ApiError(409, 'PENDING_REQUEST_EXISTS', 'Заявка уже на рассмотрении')
+        now = self._now()
+        current = self.verifications[viewer['id']] = {
+            'id': str(uuid4()), 'userId': viewer['id'], 'videoUrl': self._body(request).get('videoUrl'),
+            'status': 'pending', 'rejectionReason': None, 'reviewedBy': None, 'reviewedAt': None,
+            'createdAt': _iso(now), 'updatedAt': _iso(now),
+        }
+        return {'success': True, 'request': current}
+
+    def _verification_status(self, request):
+        viewer = self._viewer(request)
+        current = self.verifications.get(viewer['id'])
+        if current is None:
+            return {'status': 'none'}
+        return {'status': current['status'], 'requestId': current['id'], 'submittedAt': current['createdAt']}
+
+    def _platform_status(self, request):
+        self._viewer(request)
+        return {'readOnly': self.read_only}
+
+# --- HTTP ---
+
+    def serve(self, host: str = '127.0.0.1', port: int = 0) -> 'FakeServer':
+        """Serve the API over HTTP on a background thread and update `base_url`
+
+        Port 0 picks a free port. Stop with `shutdown()` or a `with` block.
+        """
+        self._http = ThreadingHTTPServer((host, port), _HTTPHandler)
+        self._http.daemon_threads = True
+        setattr(self._http, 'fake', self)
+        self.base_url = f'http://{host}:{self._http.server_address[1]}{urlsplit(self.base_url).path}'
+        threading.Thread(target=self._http.serve_forever, name='fake-itd-server', daemon=True).start()
+        logger.info(f'Fake ITD API serving on {self.base_url}')
+        return self
+
+    def shutdown(self):
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+            self._http = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _handle(self):
+        fake: FakeServer = getattr(self.server, 'fake')
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+
+        content_type = self.headers.get('Content-Type') or ''
+        data, files = None, None
+        if content_type.startswith('multipart/form-data'):
+            files = parse_multipart(content_type, raw)
+        elif raw:
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                data = None
+
+        request = LocalRequest(self.command, f'http://{self.headers.get("Host")}{self.path}', dict(self.headers), None, data, files)
+        delay = fake._delay()
+        if delay:
+            time.sleep(delay)
+        result = fake.dispatch(request)
+        if result is None:
+            self.close_connection = True
+            return
+
+        status, body, headers = result
+        headers = dict(headers)
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode()
+            headers.setdefault('Content-Type', 'application/json; charset=utf-8')
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        logger.debug('Fake ITD API: ' + format % args)
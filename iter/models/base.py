@@ -13,7 +13,8 @@ def validate_datetime(v: Any):
 PostgresDateTime = Annotated[datetime, BeforeValidator(validate_datetime)]
 
 class IterBaseModel(BaseModel):
-    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True, serialize_by_alias=True)
+    # validators are built on first use, not when the module is imported
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True, serialize_by_alias=True, defer_build=True)
 
     @model_validator(mode='before')
     @classmethod
@@ -42,6 +42,3 @@ class Post(IterBaseModel):
     comments: Optional[List[Comment]] = None
     poll: Optional[Poll] = None
     dominant_emoji: Optional[str] = None
-
-Post.model_rebuild()
-Comment.model_rebuild()
\ No newline at end of file
@@ -72,6 +72,10 @@ class NotificationListResponse(IterBaseModel):
 class NotificationCountResponse(IterBaseModel):
     count: int
 
+class ReadBatchResponse(IterBaseModel):
+    success: bool = True
+    count: int = 0
+
 class PlatformStatusResponse(IterBaseModel):
     read_only: bool
 
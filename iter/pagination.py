@@ -0,0 +1,172 @@
+import base64
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+from requests import Response
+
+from iter.exceptions import RequestFailed
+from iter.models.base import Error
+
+T = TypeVar('T')
+
+# `limit` of most list endpoints when none is passed
+DEFAULT_PAGE_SIZE = 20
+
+# fetch_page(cursor, limit) -> (items, cursor of the next page or None)
+FetchPage = Callable[[Any, int], Tuple[List[T], Any]]
+
+
+def checked(res: Any) -> Any:
+    """`res` if it is a parsed page
+
+    Raises:
+        RequestFailed: The API returned an error instead of the page
+    """
+    if isinstance(res, Error):
+        raise RequestFailed(res.code, res.message)
+    if isinstance(res, Response):
+        raise RequestFailed(str(res.status_code), res.text[:200])
+    return res
+
+
+def _encode(cursor: Any, skip: int, page_size: int) -> str:
+    data = json.dumps([cursor, skip, page_size], default=str, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+def _decode(position: str) -> Tuple[Any, int, int]:
+    try:
+        data = base64.urlsafe_b64decode(position + '=' * (-len(position) % 4))
+        cursor, skip, page_size = json.loads(data)
+        return cursor, int(skip), int(page_size)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f'Invalid position: {position!r}') from e
+
+
+class Pager(Generic[T]):
+    """Iterator over the items of a paginated endpoint
+
+    Pages are requested with `page_size` items (fewer if only `limit` items
+    are wanted), and the next page is requested in a background
+    thread while the current one is consumed. `position` is an opaque token of
+    the next item; pass it to the same `iter_*` call to continue from there,
+    e.g. after a restart:
+
+        followers = client.iter_followers('nick')
+        for user in itertools.islice(followers, 250):
+            ...
+        saved = followers.position
+        ...
+        for user in client.iter_followers('nick', position=saved):
+            ...
+    """
+    def __init__(self, fetch_page: FetchPage, first_cursor: Any = None, limit: Optional[int] = None, page_size: Optional[int] = None, prefetch: bool = True, position: Optional[str] = None, fixed_page_size: bool = False):
+        """
+        Args:
+            fetch_page (Callable[[cursor, int], tuple[list, cursor | None]]): Requests one page with the given cursor and page size, returns its items and the cursor of the next page (None after the last one).
+            first_cursor (Any, optional): Cursor of the first page. Defaults to None.
+            limit (int | None, optional): Items to return at most, None for all. Defaults to None.
+            page_size (int | None, optional): Items per request, within what the endpoint accepts. Defaults to `DEFAULT_PAGE_SIZE`.
+            prefetch (bool, optional): Request the next page while the current one is consumed. Defaults to True.
+            position (str | None, optional): `position` of an earlier iterator over the same endpoint to continue from. Defaults to None.
+            fixed_page_size (bool, optional): Cursors are page numbers, so the page size can not change between requests. Defaults to False.
+
+        Raises:
+            ValueError: Invalid position
+        """
+        self._fetch_page = fetch_page
+        self.limit = limit
+        self.prefetch = prefetch
+        self.fixed_page_size = fixed_page_size
+
+        page_size = page_size or DEFAULT_PAGE_SIZE
+        if fixed_page_size and limit:
+            page_size = min(page_size, limit)
+        if position:
+            self._cursor, self._skip, saved_size = _decode(position)
+            if fixed_page_size:
+                # page numbers only mean the same thing with the same page size
+                page_size = saved_size
+        else:
+            self._cursor, self._skip = first_cursor, 0
+        self.page_size = page_size
+
+        self.remaining = limit
+        self._items: Optional[List[T]] = None # page of `_cursor`, None until it is loaded
+        self._next_cursor: Any = None
+        self._pending: Optional[Tuple[Any, Future]] = None # (cursor, page) being prefetched
+        self._lock = threading.Lock()
+
+        self.requests = 0 # pages requested
+
+    @property
+    def position(self) -> str:
+        """Token of the next item"""
+        if self._items is not None and self._skip >= len(self._items) and self._next_cursor is not None:
+            return _encode(self._next_cursor, 0, self.page_size)
+        return _encode(self._cursor, self._skip, self.page_size)
+
+    def _size(self) -> int:
+        if self.fixed_page_size or self.remaining is None:
+            return self.page_size
+        # resuming in the middle of a page refetches the skipped items
+        return max(1, min(self.page_size, self.remaining + self._skip))
+
+    def _request(self, cursor: Any, size: int) -> Tuple[List[T], Any]:
+        with self._lock:
+            self.requests += 1
+        return self._fetch_page(cursor, size)
+
+    def _start(self, cursor: Any, size: int) -> Future:
+        future: Future = Future()
+
+        def run():
+            try:
+                future.set_result(self._request(cursor, size))
+            except BaseException as e:
+                future.set_exception(e)
+
+        if self.prefetch:
+            threading.Thread(target=run, name='iter-prefetch', daemon=True).start()
+        else:
+            run()
+        return future
+
+    def _load(self):
+        if self._pending is not None and self._pending[0] == self._cursor:
+            future = self._pending[1]
+        else:
+            future = self._start(self._cursor, self._size())
+        self._pending = None
+
+        items, next_cursor = future.result()
+        self._items = list(items)
+        self._next_cursor = next_cursor if self._items else None
+        self._skip = min(self._skip, len(self._items))
+
+        left = len(self._items) - self._skip
+        if self.prefetch and self._next_cursor is not None and (self.remaining is None or self.remaining > left):
+            size = self.page_size if self.fixed_page_size or self.remaining is None else min(self.page_size, self.remaining - left)
+            self._pending = (self._next_cursor, self._start(self._next_cursor, max(1, size)))
+
+    def __iter__(self) -> Iterator[T]:
+        return self
+
+    def __next__(self) -> T:
+        while True:
+            if self.remaining is not None and self.remaining <= 0:
+                raise StopIteration
+            if self._items is None:
+                self._load()
+            if self._skip < len(self._items):
+                break
+            if self._next_cursor is None:
+                raise StopIteration
+            self._cursor, self._skip, self._items = self._next_cursor, 0, None
+
+        item = self._items[self._skip]
+        self._skip += 1
+        if self.remaining is not None:
+            self.remaining -= 1
+        return item
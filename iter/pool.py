@@ -0,0 +1,246 @@
+import itertools
+import math
+import threading
+import time
+from typing import Any, Iterable, List, Optional, Sequence
+
+import verboselogs
+
+from iter.batch import Batch, Call, gather
+from iter.client import Client, _is_expired_token
+from iter.exceptions import AccountBanned, InvalidCookie, InvalidRefreshToken, InvalidToken, NoAccountAvailable, NoAuthData, NoCookie, RateLimitExceeded
+from iter.retry import RetryPolicy
+from iter.transport import RequestsTransport
+
+logger = verboselogs.VerboseLogger(__name__)
+
+# single-request reads whose data does not depend on the account making them,
+# except `is_following` / `is_followed_by` of profiles. Posts and comments
+# (`is_liked`, `is_owner`) and `iter_*` pagers, whose page requests would run
+# outside the pool's failover, go to `primary`.
+SHARED_READS = frozenset({
+    'get_user', 'get_followers', 'get_following',
+    'get_hashtags', 'search', 'search_user', 'search_hashtag',
+    'get_file', 'get_top_clans', 'get_platform_status',
+})
+
+_LOGGED_OUT = (NoCookie, NoAuthData, InvalidCookie, InvalidToken, InvalidRefreshToken)
+
+
+class Account:
+    """A client of `ClientPool` and its state"""
+    def __init__(self, client: Client, name: str):
+        self.client = client
+        self.name = name
+        self.in_flight = 0
+        self.calls = 0
+        self.quarantined_until = 0.0 # monotonic time, inf until `ClientPool.restore`
+        self.reason: Optional[str] = None
+
+    def available(self, now: float) -> bool:
+        return self.quarantined_until <= now
+
+    def __repr__(self) -> str:
+        state = f'quarantined: {self.reason}' if self.quarantined_until > time.monotonic() else f'{self.in_flight} in flight'
+        return f'<Account {self.name} {state}>'
+
+
+class ClientPool:
+    """Spreads reads over the `Client`s of several accounts
+
+    Methods in `SHARED_READS` (`get_user`, `get_followers`, `search`, ...) go
+    to the least loaded available account (or round robin), so read
+    throughput grows with the number of accounts, each staying under its own
+    rate limits. Profiles they return have `is_following` / `is_followed_by`
+    of the account that served them. Every other `Client` method, and shared
+    reads of 'me', act as an account and are sent to the first one, `primary`.
+
+    An account is quarantined when it hits `RateLimitExceeded` (until
+    `retry_after` passes), gets banned (`AccountBanned`) or its session ends
+    (refresh failed); the call is then repeated on another account. Banned and
+    logged out accounts stay out until `restore()`.
+
+        pool = ClientPool.from_sessions(['a.json', 'b.json', 'c.json'])
+        users = pool.gather((pool.get_user, name) for name in names)
+    """
+    def __init__(self, clients: Iterable[Client], strategy: str = 'least_loaded', max_in_flight: Optional[int] = None, max_wait: float = 60, quarantine: float = 60):
+        """
+        Args:
+            clients (Iterable[Client]): Clients of different accounts.
+            strategy (str, optional): 'least_loaded' or 'round_robin'. Defaults to 'least_loaded'.
+            max_in_flight (int | None, optional): Calls one account runs at the same time, None for no limit. Defaults to None.
+            max_wait (float, optional): Seconds to wait for an account to become available before raising `NoAccountAvailable`. Defaults to 60.
+            quarantine (float, optional): Seconds a rate-limited account is skipped when the server sends no `retryAfter`. Defaults to 60.
+
+        Raises:
+            ValueError: No clients or unknown strategy
+        """
+        if strategy not in ('least_loaded', 'round_robin'):
+            raise ValueError(f'Unknown strategy: {strategy}')
+        self.accounts: List[Account] = [Account(client, _name(client, i)) for i, client in enumerate(clients)]
+        if not self.accounts:
+            raise ValueError('ClientPool needs at least one client')
+        self.strategy = strategy
+        self.max_in_flight = max_in_flight
+        self.max_wait = max_wait
+        self.quarantine_time = quarantine
+        self._cond = threading.Condition()
+        self._turn = itertools.count()
+
+    @classmethod
+    def from_sessions(cls, session_files: Sequence[str], proxies: Optional[Sequence[Optional[str]]] = None, strategy: str = 'least_loaded', max_in_flight: Optional[int] = None, **client_options) -> 'ClientPool':
+        """Pool of clients logged in from session files
+
+        Clients give up on rate limits right away (`RetryPolicy(max_retry_after=0)`)
+        so the pool can move the call to another account, unless
+        `retry_policy` is passed.
+
+        Args:
+            session_files (Sequence[str]): Session file (or `SessionStore`) of each account.
+            proxies (Sequence[str | None] | None, optional): Proxy URL of each account, None for direct connections. Defaults to None.
+            strategy (str, optional): See `ClientPool`. Defaults to 'least_loaded'.
+            max_in_flight (int | None, optional): See `ClientPool`. Defaults to None.
+            **client_options: Passed to every `Client`.
+        """
+        if proxies is not None and len(proxies) != len(session_files):
+            raise ValueError('Pass one proxy (or None) per session file')
+        client_options.setdefault('use_manual_login', False)
+        clients = []
+        for i, session_file in enumerate(session_files):
+            options = dict(client_options)
+            options.setdefault('retry_policy', RetryPolicy(max_retry_after=0))
+            if proxies is not None and proxies[i]:
+                options['transport'] = RequestsTransport(proxy=proxies[i])
+            clients.append(Client(session_file=session_file, **options))
+        return cls(clients, strategy, max_in_flight)
+
+    @property
+    def primary(self) -> Client:
+        """Client of the first account, used for everything but shared reads"""
+        return self.accounts[0].client
+
+    @property
+    def available(self) -> List[Account]:
+        now = time.monotonic()
+        return [account for account in self.accounts if account.available(now)]
+
+    def _acquire(self) -> Account:
+        deadline = time.monotonic() + self.max_wait
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                free = [a for a in self.accounts if a.available(now) and (self.max_in_flight is None or a.in_flight < self.max_in_flight)]
+                if free:
+                    turn = next(self._turn)
+                    if self.strategy == 'round_robin':
+                        account = free[turn % len(free)]
+                    else:
+                        # rotate the start so equally loaded accounts take turns
+                        least = min(a.in_flight for a in free)
+                        idle = [a for a in free if a.in_flight == least]
+                        account = idle[turn % len(idle)]
+                    account.in_flight += 1
+                    account.calls += 1
+                    return account
+
+                if all(a.quarantined_until == math.inf for a in self.accounts):
+                    raise NoAccountAvailable('all accounts are banned or logged out')
+                if now >= deadline:
+                    raise NoAccountAvailable(f'none became available in {self.max_wait}s')
+                # busy accounts notify on release; quarantines end on their own
+                wake = min([a.quarantined_until for a in self.accounts if a.quarantined_until > now] + [deadline])
+                self._cond.wait(wake - now)
+
+    def _release(self, account: Account):
+        with self._cond:
+            account.in_flight -= 1
+            self._cond.notify()
+
+    def quarantine(self, account: Account, seconds: float, reason: str):
+        """Skip `account` for `seconds` (`math.inf` until `restore()`)"""
+        with self._cond:
+            account.quarantined_until = max(account.quarantined_until, time.monotonic() + seconds)
+            account.reason = reason
+        logger.warning(f"Account {account.name} quarantined ({reason})" + ('' if seconds == math.inf else f' for {seconds:.0f}s'))
+
+    def restore(self, account: Account | Client | None = None):
+        """Make a quarantined account (all accounts if None) available again"""
+        with self._cond:
+            for a in self.accounts:
+                if account is None or account is a or account is a.client:
+                    a.quarantined_until = 0.0
+                    a.reason = None
+            self._cond.notify_all()
+
+    def call(self, name: str, *args, **kwargs) -> Any:
+        """Run the `Client` method `name` on an available account, moving to another one if it gets quarantined"""
+        error: Optional[BaseException] = None
+        for _ in range(len(self.accounts)):
+            account = self._acquire()
+            try:
+                return getattr(account.client, name)(*args, **kwargs)
+            except RateLimitExceeded as e:
+                self.quarantine(account, e.retry_after or self.quarantine_time, 'rate limited')
+                error = e
+            except AccountBanned as e:
+                self.quarantine(account, math.inf, 'banned')
+                error = e
+            except Exception as e:
+                # a 401 that survived the token refresh means the session is gone
+                if not isinstance(e, _LOGGED_OUT) and not _is_expired_token(e):
+                    raise
+                self.quarantine(account, math.inf, 'logged out')
+                error = e
+            finally:
+                self._release(account)
+        raise error
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in SHARED_READS:
+            def shared(*args, **kwargs):
+                # 'me' is whichever account serves the call, so it stays on primary
+                if _about_me(args, kwargs):
+                    return getattr(self.primary, name)(*args, **kwargs)
+                return self.call(name, *args, **kwargs)
+            return shared
+        return getattr(self.primary, name)
+
+    def batch(self, max_workers: int = 8) -> Batch:
+        """Run many calls concurrently over the pool, see `Batch`"""
+        return Batch(self, max_workers)
+
+    def gather(self, calls: Iterable[Call], max_workers: int = 8, return_exceptions: bool = True) -> list:
+        """Run calls concurrently and return their results in order, see `Client.gather`"""
+        return gather(calls, max_workers, return_exceptions)
+
+    def stats(self) -> List[dict]:
+        now = time.monotonic()
+        return [{
+            'name': a.name,
+            'calls': a.calls,
+            'in_flight': a.in_flight,
+            'available': a.available(now),
+            'reason': a.reason if not a.available(now) else None,
+        } for a in self.accounts]
+
+    def close(self):
+        for account in self.accounts:
+            account.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _about_me(args: tuple, kwargs: dict) -> bool:
+    return any(isinstance(arg, str) and arg.lower() == 'me' for arg in (*args, *kwargs.values()))
+
+
+def _name(client: Client, index: int) -> str:
+    # `_me`, so clients created with `lazy_me` are not made to fetch it
+    me = getattr(client, '_me', None)
+    return getattr(me, 'username', None) or f'#{index}'
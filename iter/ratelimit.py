@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+import verboselogs
+
+logger = verboselogs.VerboseLogger(__name__)
+
+# (requests per second, burst) until the server tells us its real budget
+DEFAULT_LIMITS: Dict[str, Tuple[float, int]] = {
+    'read': (20, 40),
+    'write': (5, 10),
+    'upload': (1, 3),
+    'auth': (1, 2),
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket
+
+    Callers reserve a token and sleep until it is available, so waiting callers
+    are served in order instead of racing for the next free token.
+    """
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self._last:
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            ready_at = self._last + max(0.0, -self._tokens) / self.rate
+            return max(0.0, ready_at - now)
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for `seconds`"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._last = max(self._last, now + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+    def renew_in(self, seconds: float):
+        """Wait for a budget the server renews in `seconds`
+
+        Does nothing if the refill alone hands out no token before then,
+        otherwise no tokens are handed out until the renewal, which brings a full burst.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._last + (1 - self._tokens) / self.rate >= now + seconds:
+                return
+            self._last = now + seconds
+            self._tokens = min(self._tokens, 0.0) + self.capacity
+
+    def update(self, limit: Optional[int] = None, remaining: Optional[int] = None, window: Optional[float] = None):
+        """Adjust the bucket to a budget reported by the server"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if limit and window:
+                self.rate = limit / window
+                self.capacity = limit
+            if remaining is not None:
+                self._tokens = min(self._tokens, float(remaining))
+
+
+class RateLimiter:
+    """Per-client limiter with a token bucket for each endpoint class
+
+    Endpoint classes are `read` (GET), `write` (other methods), `upload`
+    (multipart requests) and `auth` (`auth_fetch`). Buckets are throttled
+    further by `RateLimitExceeded.retry_after`, `Retry-After` and rate-limit
+    headers (`X-RateLimit-*` / `RateLimit-*`) when the server sends them.
+    Classes that report the same limit and window share one budget, so what
+    one of them learns throttles the others too.
+    """
+    def __init__(self, limits: Optional[Mapping[str, Tuple[float, int]]] = None):
+        """
+        Args:
+            limits (Mapping[str, tuple[float, int]] | None, optional): `(rate per second, burst)` per endpoint class, merged over `DEFAULT_LIMITS`. Defaults to None.
+        """
+        limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.buckets = {kind: TokenBucket(rate, burst) for kind, (rate, burst) in limits.items()}
+        self.waited = 0.0
+        # last (limit, window) reported per endpoint class
+        self._budgets: Dict[str, Tuple[int, Optional[int]]] = {}
+
+    @staticmethod
+    def classify(method: str, files: bool = False) -> str:
+        if files:
+            return 'upload'
+        return 'read' if method.upper() == 'GET' else 'write'
+
+    def acquire(self, kind: str):
+        """Block the calling thread until a request of `kind` may be sent"""
+        delay = self.buckets[kind].reserve()
+        if delay > 0:
+            self.waited += delay
+            logger.debug(f'Rate limiter: waiting {delay:.2f}s for {kind}')
+            time.sleep(delay)
+
+    async def aacquire(self, kind: str):
+        """Async version of `acquire`"""
+        delay = self.buckets[kind].reserve()
+        if delay > 0:
+            self.waited += delay
+            logger.debug(f'Rate limiter: waiting {delay:.2f}s for {kind}')
+            await asyncio.sleep(delay)
+
+    def rate_limited(self, kind: str, retry_after: Optional[float]):
+        """Pause `kind` after the server rejected a request with a rate limit error"""
+        seconds = retry_after if retry_after else 1
+        logger.warning(f'Rate limit exceeded for {kind} requests, pausing for {seconds}s')
+        self.buckets[kind].pause(seconds)
+
+    def observe(self, kind: str, headers: Mapping[str, str]):
+        """Learn the budget of `kind` from response headers"""
+        limit = _int_header(headers, 'X-RateLimit-Limit', 'RateLimit-Limit')
+        remaining = _int_header(headers, 'X-RateLimit-Remaining', 'RateLimit-Remaining')
+        reset = _int_header(headers, 'X-RateLimit-Reset', 'RateLimit-Reset')
+        retry_after = _int_header(headers, 'Retry-After')
+        window = _policy_window(headers.get('RateLimit-Policy')) or _int_header(headers, 'X-RateLimit-Window')
+
+        if reset is not None and reset > 1_000_000_000:
+            # some servers send an epoch timestamp instead of seconds left
+            reset = max(0, int(reset - time.time()))
+
+        if limit is None and remaining is None and retry_after is None:
+            return
+
+        kinds = [kind]
+        if limit is not None:
+            self._budgets[kind] = (limit, window)
+            kinds = [other for other, budget in self._budgets.items() if budget == (limit, window)]
+
+        for other in kinds:
+            bucket = self.buckets[other]
+            bucket.update(limit, remaining, window)
+            if retry_after:
+                bucket.pause(retry_after)
+            elif remaining == 0 and reset:
+                bucket.renew_in(reset)
+
+
+def _int_header(headers: Mapping[str, str], *names: str) -> Optional[int]:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return int(float(value))
+        except ValueError:
+            pass
+    return None
+
+def _policy_window(policy: Optional[str]) -> Optional[int]:
+    # RateLimit-Policy: 100;w=60
+    if not policy:
+        return None
+    for part in policy.split(',')[0].split(';')[1:]:
+        key, _, value = part.strip().partition('=')
+        if key == 'w' and value.isdigit():
+            return int(value)
+    return None
@@ -1,18 +1,84 @@
+import asyncio
+import json
+import logging
+import time
 import verboselogs
-from requests import RequestException, Session, Response, PreparedRequest, Request, JSONDecodeError
+from contextlib import contextmanager
+from contextvars import ContextVar
+from requests import Response, PreparedRequest
 from typing import Optional, Union, Dict, Any, Tuple
 from pydantic import BaseModel, ValidationError
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 
+from iter.conditional import ValidatorCache
+from iter.upload import MultipartUpload
 from iter.exceptions import AccountBanned, InvalidToken, InvalidCookie, RateLimitExceeded, Unauthorized
 from iter.models.base import Error
+from iter.ratelimit import RateLimiter
+from iter.retry import RetryPolicy
+from iter.singleflight import SingleFlight
+from iter.transport import AsyncHttpxTransport, RequestsTransport, Transport
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
 
 # Use a named logger for this module
 logger = verboselogs.VerboseLogger(__name__)
-s = Session()
+
+DEFAULT_BASE_URL = 'https://xn--d1ah4a.com/api/'
+
+# Used by route functions called outside of a client
+default_transport = RequestsTransport()
+s = default_transport.session
+
+# Client whose transport is used for requests made in the current thread/task
+_current_client: ContextVar[Any] = ContextVar('iter_current_client', default=None)
+
+@contextmanager
+def bind_client(client):
+    """Route requests made inside the block through `client`
+
+    Async clients make `fetch` and `auth_fetch` return coroutines, so the same
+    route functions can be awaited by `AsyncClient`.
+    """
+    token = _current_client.set(client)
+    try:
+        yield client
+    finally:
+        _current_client.reset(token)
+
+class _Unbound:
+    """Settings for requests made outside of a client"""
+    transport: Transport = default_transport
+    base_url = DEFAULT_BASE_URL
+    rate_limiter: Optional[RateLimiter] = None
+    retry_policy: Optional[RetryPolicy] = None
+    single_flight: Optional[SingleFlight] = None
+    validator_cache: Optional[ValidatorCache] = None
+
+def _bound_client():
+    """Client bound to the current thread/task, or the module-level settings"""
+    client = _current_client.get()
+    return client if client is not None else _Unbound
 
 def dump_res(res: Response, err: Error | None = None):
     return f'Request dump:\n> {res.request.method} {res.request.url}\n> {str(res.request.body) if len(str(res.request.body)) < 1000 else str(res.request.body)[:1000] + '...'}\n> {res.reason} {res.status_code} {res.text if len(res.text) < 1000 else res.text[:1000] + '...'}\n> {err.code + ': ' + err.message if err else ''}'
+def dump_httpx_res(res, err: Error | None = None):
+    try:
+        body = res.request.content.decode(errors='replace')
+    except Exception: # streamed request bodies are not kept
+        body = '<stream>'
+    text = res.text
+    return (
+        f'Request dump:\n'
+        f'> {res.request.method} {res.request.url}\n'
+        f'> {body if len(body) < 1000 else body[:1000] + "..."}\n'
+        f'> {res.reason_phrase} {res.status_code} {text if len(text) < 1000 else text[:1000] + "..."}\n'
+        f'> {err.code + ": " + err.message if err else ""}'
+    )
 def dump_req(req: PreparedRequest):
     body = str(req.body) if req.body is not None else ""
     return (
@@ -20,53 +86,67 @@ def dump_req(req: PreparedRequest):
         f'> {req.method} {req.url}\n'
         f'> {body if len(body) < 1000 else body[:1000] + "..."}'
     )
+def dump_exchange(request: Dict[str, Any], res=None, err: Error | None = None):
+    """Dump of a transport request and its response (if any)"""
+    if res is None:
+        body = request.get('json')
+        return f'Request dump:\n> {request["method"]} {request["url"]}\n> {body if body is not None else ""}'
+    if hasattr(res, 'reason_phrase'):
+        return dump_httpx_res(res, err)
+    return dump_res(res, err)
 
-def fetch(
-    token: str,
-    method: str,
-    endpoint: str, 
-    params: Optional[Dict[str, Any]] = None, 
-    files: Optional[Dict[str, Tuple[str, Any]]] = None, 
-    response_schema: Optional[type[BaseModel]] = None
-) -> Union[BaseModel, Response]:
-    
-    base_url = 'https://xn--d1ah4a.com/api/'
+def _build_fetch_request(token: str, method: str, endpoint: str, params: Optional[Dict[str, Any]], files: Optional[Dict[str, Tuple[str, Any]] | MultipartUpload], accept_encoding: str = 'gzip, deflate', base_url: str = DEFAULT_BASE_URL) -> Dict[str, Any]:
     url = urljoin(base_url, endpoint.lstrip('/'))
 
     headers = {
         "Authorization": f'Bearer {token}',
         "Accept": "application/json",
+        "Accept-Encoding": accept_encoding,
         "User-Agent": "Iter-Python-Client/1.0"
     }
 
     is_get = method.upper() == "GET"
 
-    request = Request(
+    data = None
+    if isinstance(files, MultipartUpload):
+        # streamed body instead of a multipart body built in memory by the HTTP library
+        data, files = files, None
+        headers['Content-Type'] = data.content_type
+        headers['Content-Length'] = str(len(data))
+
+    return dict(
         method=method.upper(),
         url=url,
         headers=headers,
         params=params if is_get else None,
         json=params if not is_get else None,
-        files=files
+        files=files,
+        data=data
     )
 
-    prepared = s.prepare_request(request)
-    error_obj = None
+def _timeout(files) -> float:
+    if isinstance(files, MultipartUpload):
+        return files.timeout
+    return 120 if files else 20
 
-    response = None
 
-    try:
-        response = s.send(
-            prepared, 
-            timeout=120 if files else 20
-        )
-        
+def _parse_response(response, response_schema: Optional[type[BaseModel]] = None):
+    """Map a `requests` or `httpx` response to a model, an `Error` or the response itself
+
+    The body is parsed once, from bytes: successful responses are validated
+    straight from JSON by pydantic, and only error responses (or successful
+    ones mentioning an `error` key) are decoded to a dict.
+    """
+    content = response.content
+    # cheap pre-filter, the decoded dict decides wherever the key is
+    if response.status_code >= 400 or b'"error"' in content:
         try:
-            data = response.json()
+            data = loads(content)
             if isinstance(data, dict) and data.get('error'):
-                
-                error_obj = Error.model_validate_json(response.text)
-                
+
+                # the envelope may carry other keys, e.g. {"success": false, "error": {...}}
+                error_obj = Error.model_validate(data['error'] if isinstance(data['error'], dict) else data)
+
                 match error_obj.code:
                     case 'RATE_LIMIT_EXCEEDED':
                         raise RateLimitExceeded(error_obj.retry_after)
@@ -76,65 +156,286 @@ def fetch(
                         raise AccountBanned()
                     case _:
                         return error_obj
-                        
-        except (JSONDecodeError, ValidationError):
+
+        except (ValueError, ValidationError):
             pass
 
-        response.raise_for_status()
+    response.raise_for_status()
 
-        if response_schema:
-            try:
-                return response_schema.model_validate_json(response.text)
-            except ValidationError as e:
-                logger.error(f"Response did not match schema {response_schema.__name__}")
-                raise e
-
-        return response
-    
-    except RequestException as e:
-        error_obj = Error(
-            code="REQUEST_FAILED",
-            message=str(e)
-        )
-        logger.error(f"Network error: {str(e)}")
-        return error_obj
-    except Exception as e:
-        logger.error(f"Request failed: {str(e)}")
+    if response_schema:
+        try:
+            return response_schema.model_validate_json(content)
+        except ValidationError as e:
+            logger.error(f"Response did not match schema {response_schema.__name__}")
+            raise e
+
+    return response
+
+def _parse_cached(response, response_schema: type[BaseModel], cache: ValidatorCache, key, entry):
+    """`_parse_response` reusing the model stored in `cache` when the response did not change"""
+    if response.status_code == 304 and entry is not None:
+        cache.not_modified += 1
+        return entry.result
+    if response.status_code != 200:
+        return _parse_response(response, response_schema)
+
+    digest = cache.digest(response.content)
+    if entry is not None and entry.digest == digest:
+        cache.unchanged += 1
+        cache.store(key, response.headers, digest, entry.result)
+        return entry.result
+
+    result = _parse_response(response, response_schema)
+    if isinstance(result, response_schema):
+        cache.store(key, response.headers, digest, result)
+    return result
+
+def _retry_after(response) -> Optional[float]:
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+def _retry_reason(e: Exception, policy: RetryPolicy, network_errors: Tuple[type, ...]) -> Tuple[Optional[str], Optional[float]]:
+    """Why a failed attempt may be retried (None if it may not) and the delay the server asked for"""
+    if isinstance(e, RateLimitExceeded):
+        return 'rate_limited', e.retry_after
+    response = getattr(e, 'response', None)
+    if response is not None:
+        if response.status_code in policy.status_codes:
+            return f'http_{response.status_code}', _retry_after(response)
+        return None, None
+    if isinstance(e, network_errors):
+        return 'network', None
+    return None, None
+
+def _conditional(request: Dict[str, Any], cache: Optional[ValidatorCache], key):
+    """Stored response for `key` and the request with its validators"""
+    entry = cache.get(key) if cache else None
+    if entry is not None:
+        request = {**request, 'headers': {**request['headers'], **cache.headers(entry)}}
+    return entry, request
+
+def _unconditional(request: Dict[str, Any], cache: Optional[ValidatorCache], key) -> Dict[str, Any]:
+    """The request to repeat after a 304 with no stored model to reuse (e.g. sent by a proxy)"""
+    if cache:
+        cache.discard(key)
+    headers = {name: value for name, value in request['headers'].items() if name not in ('If-None-Match', 'If-Modified-Since')}
+    headers['Cache-Control'] = 'no-cache' # past caches on the way, to the server
+    return {**request, 'headers': headers}
+
+def _send(transport: Transport, request: Dict[str, Any], kind: str, limiter: Optional[RateLimiter], response_schema: Optional[type[BaseModel]], timeout: float, cache: Optional[ValidatorCache] = None, key=None):
+    result = None
+    response = None
+    entry, request = _conditional(request, cache, key)
+
+    try:
+        if limiter: limiter.acquire(kind)
+        response = transport.send(**request, timeout=timeout)
+        if limiter: limiter.observe(kind, response.headers)
+        if response.status_code == 304 and entry is None:
+            request = _unconditional(request, cache, key)
+            if limiter: limiter.acquire(kind)
+            response = transport.send(**request, timeout=timeout)
+            if limiter: limiter.observe(kind, response.headers)
+
+        if cache and response_schema:
+            result = _parse_cached(response, response_schema, cache, key, entry)
+        else:
+            result = _parse_response(response, response_schema)
+        return result
+    except RateLimitExceeded as e:
+        if limiter: limiter.rate_limited(kind, e.retry_after)
+        raise
+    finally:
+        # dumps decode the whole body, skip them unless they are logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(dump_exchange(request, response, result if isinstance(result, Error) else None))
+
+def _request_key(token: str, method: str, endpoint: str, params: Optional[Dict[str, Any]], files, response_schema: Optional[type[BaseModel]]):
+    """Identity of a GET request for coalescing and revalidation, None for other requests"""
+    if files or method.upper() != 'GET':
+        return None
+    return (token, endpoint.strip('/'), json.dumps(params, sort_keys=True, default=str) if params else None, response_schema)
+
+def fetch(
+    token: str,
+    method: str,
+    endpoint: str, 
+    params: Optional[Dict[str, Any]] = None, 
+    files: Optional[Dict[str, Tuple[str, Any]] | MultipartUpload] = None, 
+    response_schema: Optional[type[BaseModel]] = None,
+    idempotent: Optional[bool] = None
+) -> Union[BaseModel, Response]:
+    """Send a request to the API
+
+    Identical GET requests of the bound client that are in flight at the same
+    time are sent once (see `SingleFlight`), and GET responses parsed to
+    `response_schema` are revalidated with conditional requests (see
+    `ValidatorCache`).
+
+    Args:
+        idempotent (bool | None, optional): Whether the request may be retried by the client's `RetryPolicy`. GET requests are retried if None. Defaults to None.
+    """
+    client = _bound_client()
+    transport = client.transport
+    if transport.is_async:
+        return afetch(token, method, endpoint, params, files, response_schema, idempotent)
+
+    key = _request_key(token, method, endpoint, params, files, response_schema)
+    if key and client.single_flight:
+        return client.single_flight.do(key, lambda: _fetch(client, transport, key, token, method, endpoint, params, files, response_schema, idempotent))
+    return _fetch(client, transport, key, token, method, endpoint, params, files, response_schema, idempotent)
+
+def _fetch(client, transport: Transport, key, token: str, method: str, endpoint: str, params, files, response_schema, idempotent):
+    cache = client.validator_cache if key and response_schema else None
+    policy = client.retry_policy
+    if policy: policy.request_sent()
+    if not RetryPolicy.allows(method, idempotent):
+        policy = None
+
+    request = _build_fetch_request(token, method, endpoint, params, files, transport.accept_encoding, client.base_url)
+    kind = RateLimiter.classify(method, bool(files))
+
+    attempt = 0
+    while True:
+        try:
+            return _send(transport, request, kind, client.rate_limiter, response_schema, _timeout(files), cache, key)
+        except Exception as e:
+            delay = policy.delay(attempt, *_retry_reason(e, policy, transport.network_errors)) if policy else None
+            if delay is None:
+                if isinstance(e, transport.request_errors):
+                    logger.error(f"Network error: {str(e)}")
+                    return Error(
+                        code="REQUEST_FAILED",
+                        message=str(e)
+                    )
+                logger.error(f"Request failed: {str(e)}")
+                raise
+            attempt += 1
+            time.sleep(delay)
+
+async def _asend(transport: Transport, request: Dict[str, Any], kind: str, limiter: Optional[RateLimiter], response_schema: Optional[type[BaseModel]], timeout: float, cache: Optional[ValidatorCache] = None, key=None):
+    result = None
+    response = None
+    entry, request = _conditional(request, cache, key)
+
+    try:
+        if limiter: await limiter.aacquire(kind)
+        response = await transport.send(**request, timeout=timeout)
+        if limiter: limiter.observe(kind, response.headers)
+        if response.status_code == 304 and entry is None:
+            request = _unconditional(request, cache, key)
+            if limiter: await limiter.aacquire(kind)
+            response = await transport.send(**request, timeout=timeout)
+            if limiter: limiter.observe(kind, response.headers)
+
+        if cache and response_schema:
+            result = _parse_cached(response, response_schema, cache, key, entry)
+        else:
+            result = _parse_response(response, response_schema)
+        return result
+    except RateLimitExceeded as e:
+        if limiter: limiter.rate_limited(kind, e.retry_after)
         raise
     finally:
-        dump = dump_req(prepared)
-        if response: dump = dump_res(response, error_obj)
-        logger.debug(dump)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(dump_exchange(request, response, result if isinstance(result, Error) else None))
+
+async def afetch(
+    token: str,
+    method: str,
+    endpoint: str,
+    params: Optional[Dict[str, Any]] = None,
+    files: Optional[Dict[str, Tuple[str, Any]] | MultipartUpload] = None,
+    response_schema: Optional[type[BaseModel]] = None,
+    idempotent: Optional[bool] = None,
+    transport: Optional[Transport] = None
+):
+    """Async version of `fetch`
+
+    Args:
+        transport (Transport | None, optional): Async transport to send with. The bound `AsyncClient` transport or a temporary `AsyncHttpxTransport` is used if None.
+    """
+    client = _bound_client()
+    if transport is None:
+        if not client.transport.is_async:
+            transport = AsyncHttpxTransport()
+            try:
+                return await afetch(token, method, endpoint, params, files, response_schema, idempotent, transport)
+            finally:
+                await transport.aclose()
+        transport = client.transport
+
+    key = _request_key(token, method, endpoint, params, files, response_schema)
+    if key and client.single_flight:
+        return await client.single_flight.ado(key, lambda: _afetch(client, transport, key, token, method, endpoint, params, files, response_schema, idempotent))
+    return await _afetch(client, transport, key, token, method, endpoint, params, files, response_schema, idempotent)
+
+async def _afetch(client, transport: Transport, key, token: str, method: str, endpoint: str, params, files, response_schema, idempotent):
+    cache = client.validator_cache if key and response_schema else None
+    policy = client.retry_policy
+    if policy: policy.request_sent()
+    if not RetryPolicy.allows(method, idempotent):
+        policy = None
+
+    request = _build_fetch_request(token, method, endpoint, params, files, transport.accept_encoding, client.base_url)
+    kind = RateLimiter.classify(method, bool(files))
+
+    attempt = 0
+    while True:
+        try:
+            return await _asend(transport, request, kind, client.rate_limiter, response_schema, _timeout(files), cache, key)
+        except Exception as e:
+            delay = policy.delay(attempt, *_retry_reason(e, policy, transport.network_errors)) if policy else None
+            if delay is None:
+                if isinstance(e, transport.request_errors):
+                    logger.error(f"Network error: {str(e)}")
+                    return Error(
+                        code="REQUEST_FAILED",
+                        message=str(e)
+                    )
+                logger.error(f"Request failed: {str(e)}")
+                raise
+            attempt += 1
+            await asyncio.sleep(delay)
+
 
+def _cookie_jar(transport):
+    # requests keeps a CookieJar on the session, httpx wraps one in `Cookies.jar`
+    return getattr(transport.cookies, 'jar', transport.cookies)
 
-def get_cookies_string() -> str:
-    """Converts the session cookie jar into a string for storage."""
-    return "; ".join([f"{k}={v}" for k, v in s.cookies.get_dict().items()])
+def get_cookies_string(transport: Optional[Transport] = None) -> str:
+    """Converts the transport cookie jar into a string for storage."""
+    transport = transport if transport is not None else default_transport
+    return "; ".join([f"{k}={v}" for k, v in {c.name: c.value for c in _cookie_jar(transport)}.items()])
 
-def set_cookies(cookies: str):
+def set_cookies(cookies: str, transport: Optional[Transport] = None, domain: str = urlsplit(DEFAULT_BASE_URL).hostname):
+    transport = transport if transport is not None else default_transport
     # Clear existing cookies to prevent mixing old/new sessions
-    s.cookies.clear()
+    transport.cookies.clear()
     if not cookies:
         return
     for cookie in cookies.split('; '):
         if '=' in cookie:
             name, value = cookie.split('=', 1)
             # Fixed the .com.com typo found in your code
-            s.cookies.set(name, value, path='/', domain='xn--d1ah4a.com')
+            transport.cookies.set(name, value, path='/', domain=domain)
 
-def auth_fetch(cookies: str | list, method: str, url: str, params: dict = {}, token: str | None = None):
-    base = 'https://xn--d1ah4a.com/api/'
+def _build_auth_request(cookies: str | list, method: str, url: str, params: dict, token: str | None, accept_encoding: str = 'gzip, deflate', base_url: str = DEFAULT_BASE_URL) -> Dict[str, Any]:
+    split = urlsplit(base_url)
+    origin = f'{split.scheme}://{split.netloc}'
     if isinstance(cookies, list):
         cookies = "; ".join([f"{c['name']}={c['value']}" for c in cookies])
     headers = {
-        "Host": "xn--d1ah4a.com",
+        "Host": split.netloc,
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:140.0) Gecko/20100101 Firefox/140.0",
         "Accept": "*/*",
         "Accept-Language": "ru-RU,ru;q=0.8,en-US;q=0.5,en;q=0.3",
-        "Accept-Encoding": "gzip, deflate, br, zstd",
-        "Referer": "https://xn--d1ah4a.com/",
+        "Accept-Encoding": accept_encoding,
+        "Referer": origin + "/",
         "Content-Type": "application/json",
-        "Origin": "https://xn--d1ah4a.com",
+        "Origin": origin,
         "Sec-GPC": "1",
         "Connection": "keep-alive",
         "Cookie": cookies,
@@ -150,48 +451,97 @@ def auth_fetch(cookies: str | list, method: str, url: str, params: dict = {}, to
     if token:
         headers['Authorization'] = 'Bearer ' + token
 
-    req = Request(
+    return dict(
         method=method.upper(),
-        url=base + url,
+        url=urljoin(base_url, url),
         headers=headers,
         params=params if method.upper() == "GET" else None,
         json=params if method.upper() != "GET" else None
     )
-    res = None
-    err = None
 
-    prepared = s.prepare_request(req)
+def _parse_auth_response(res):
+    # 204 No Content has no body, so we return immediately
+    if res.status_code == 204:
+        return None
 
+    content = res.content
+    if content == b'UNAUTHORIZED':
+        raise InvalidToken()
     try:
-        res = s.send(
-            prepared, 
-            timeout=20
-        )
+        data = loads(content)
+    except ValueError as e:
+        data = e
 
-        # 204 No Content has no body, so we return immediately
-        if res.status_code == 204:
-            return None
-
-        if res.text == 'UNAUTHORIZED':
-            raise InvalidToken()
+    if isinstance(data, dict) and 'error' in data:
         try:
-            res.json()['error']
-            err = Error.model_validate_json(res.text)
+            err = Error.model_validate(data)
+        except ValidationError:
+            pass
+        else:
             match err.code:
                 case 'RATE_LIMIT_EXCEEDED':
                     raise RateLimitExceeded(err.retry_after)
                 case 'UNAUTHORIZED':
                     raise Unauthorized()
-        except (KeyError, JSONDecodeError):
-            pass # not an error
 
-        res.raise_for_status()
-        return res.json()
+    res.raise_for_status()
+    if isinstance(data, ValueError):
+        raise data
+    return data
+
+def auth_fetch(cookies: str | list, method: str, url: str, params: dict = {}, token: str | None = None):
+    client = _bound_client()
+    transport, limiter = client.transport, client.rate_limiter
+    if transport.is_async:
+        return auth_afetch(cookies, method, url, params, token)
+
+    req = _build_auth_request(cookies, method, url, params, token, transport.accept_encoding, client.base_url)
+    res = None
+
+    try:
+        if limiter: limiter.acquire('auth')
+        res = transport.send(**req, timeout=20)
+        if limiter: limiter.observe('auth', res.headers)
+
+        return _parse_auth_response(res)
+    except RateLimitExceeded as e:
+        if limiter: limiter.rate_limited('auth', e.retry_after)
+        raise
     except Exception as e:
         logger.error(f'Auth request failed: {e}')
         raise
     finally:
-        dump = dump_req(prepared)
-        if res: dump = dump_res(res, err)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(dump_exchange(req, res))
+
+async def auth_afetch(cookies: str | list, method: str, url: str, params: dict = {}, token: str | None = None, transport: Optional[Transport] = None):
+    """Async version of `auth_fetch`"""
+    client = _bound_client()
+    if transport is None:
+        if not client.transport.is_async:
+            transport = AsyncHttpxTransport()
+            try:
+                return await auth_afetch(cookies, method, url, params, token, transport)
+            finally:
+                await transport.aclose()
+        transport = client.transport
+    limiter = client.rate_limiter
+
+    req = _build_auth_request(cookies, method, url, params, token, transport.accept_encoding, client.base_url)
+    res = None
+
+    try:
+        if limiter: await limiter.aacquire('auth')
+        res = await transport.send(**req, timeout=20)
+        if limiter: limiter.observe('auth', res.headers)
 
-        logger.debug(dump)
+        return _parse_auth_response(res)
+    except RateLimitExceeded as e:
+        if limiter: limiter.rate_limited('auth', e.retry_after)
+        raise
+    except Exception as e:
+        logger.error(f'Auth request failed: {e}')
+        raise
+    finally:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(dump_exchange(req, res))
@@ -0,0 +1,94 @@
+import random
+import threading
+from collections import Counter
+from typing import Iterable, Optional
+
+import verboselogs
+
+logger = verboselogs.VerboseLogger(__name__)
+
+
+class RetryPolicy:
+    """Automatic retries with exponential backoff and full jitter
+
+    Only GET requests and writes the route marks as idempotent are retried,
+    on network errors, `RateLimitExceeded` and the HTTP statuses in
+    `status_codes`. Retries are also limited by a budget shared by all
+    requests of the client: every request adds `budget_ratio` retries to it
+    (up to `budget_reserve`), so a failing server is not hit with
+    `max_retries` times more requests.
+    """
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30,
+        max_retry_after: float = 60,
+        status_codes: Iterable[int] = (408, 429, 500, 502, 503, 504),
+        budget_ratio: float = 0.2,
+        budget_reserve: float = 10
+    ):
+        """
+        Args:
+            max_retries (int, optional): Retries of one request. Defaults to 3.
+            backoff (float, optional): Base delay in seconds, doubled on each retry. Defaults to 0.5.
+            max_backoff (float, optional): Upper bound of one delay. Defaults to 30.
+            max_retry_after (float, optional): Give up instead of waiting longer than this for a rate limit. Defaults to 60.
+            status_codes (Iterable[int], optional): HTTP statuses worth retrying. Defaults to (408, 429, 500, 502, 503, 504).
+            budget_ratio (float, optional): Retries earned by each request. Defaults to 0.2.
+            budget_reserve (float, optional): Maximum (and initial) retry budget. Defaults to 10.
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.status_codes = set(status_codes)
+        self.budget_ratio = budget_ratio
+        self.budget_reserve = budget_reserve
+
+        self.retries = Counter()
+        self.given_up = 0
+        self.budget_exhausted = 0
+        self._budget = float(budget_reserve)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def allows(method: str, idempotent: Optional[bool] = None) -> bool:
+        """Whether a request may be retried at all"""
+        return idempotent if idempotent is not None else method.upper() == 'GET'
+
+    def request_sent(self):
+        with self._lock:
+            self._budget = min(self.budget_reserve, self._budget + self.budget_ratio)
+
+    def delay(self, attempt: int, reason: Optional[str], retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to wait before retrying failed attempt `attempt` (0-based), or None to give up
+
+        Args:
+            attempt (int): Number of retries already made
+            reason (str | None): Why the attempt failed (`network`, `rate_limited`, `http_503`...), None if not retryable
+            retry_after (float | None, optional): Delay requested by the server. Defaults to None.
+        """
+        if reason is None:
+            return None
+        if attempt >= self.max_retries or (retry_after or 0) > self.max_retry_after:
+            with self._lock:
+                self.given_up += 1
+            return None
+
+        with self._lock:
+            if self._budget < 1:
+                self.budget_exhausted += 1
+                return None
+            self._budget -= 1
+            self.retries[reason] += 1
+
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if retry_after:
+            delay += retry_after
+        logger.info(f'Retrying request after {reason} in {delay:.2f}s (retry {attempt + 1}/{self.max_retries})')
+        return delay
+
+    @property
+    def total_retries(self) -> int:
+        return sum(self.retries.values())
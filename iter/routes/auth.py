@@ -1,7 +1,16 @@
+from inspect import isawaitable
+
 from iter.request import auth_fetch
 
+async def _access_token(res) -> str:
+    return (await res)['accessToken']
+
 def refresh_token(cookies: str):
-    return auth_fetch(cookies, 'post', 'v1/auth/refresh')['accessToken']
+    res = auth_fetch(cookies, 'post', 'v1/auth/refresh')
+    if isawaitable(res):
+        # bound to an async client, the caller awaits
+        return _access_token(res)
+    return res['accessToken']
 
 def change_password(cookies: str, token: str, old: str, new: str):
     return auth_fetch(cookies, 'post', 'v1/auth/change-password', {'newPassword': new, 'oldPassword': old}, token)
@@ -32,7 +32,7 @@ def like_comment(token: str, comment_id: UUID) -> LikeResponse | Error:
     return fetch(token, 'post', f'comments/{comment_id}/like', response_schema=LikeResponse)
 
 def unlike_comment(token: str, comment_id: UUID) -> LikeResponse | Error:
-    return fetch(token, 'delete', f'comments/{comment_id}/like', response_schema=LikeResponse)
+    return fetch(token, 'delete', f'comments/{comment_id}/like', response_schema=LikeResponse, idempotent=True)
 
 def delete_comment(token: str, comment_id: UUID) -> Response:
     return fetch(token, 'delete', f'comments/{comment_id}')
@@ -1,23 +1,21 @@
-from _io import BufferedReader
-import mimetypes
 from uuid import UUID
 
 from iter.models.base import Error
 from iter.request import fetch
 from iter.models.media import Attachment
+from iter.upload import MultipartUpload, Progress, Source
 
 
-def upload_file(token: str, name: str, data: BufferedReader) -> Attachment | Error:
-    mime_type, _ = mimetypes.guess_type(name)
-
-    if not mime_type:
-        mime_type = 'application/octet-stream'
+def upload_file(token: str, name: str, data: Source | MultipartUpload | None = None, progress: Progress | None = None) -> Attachment | Error:
+    if not isinstance(data, MultipartUpload):
+        # without data, name is the path of the file
+        data = MultipartUpload(name if data is None else data, name if data is not None else None, progress=progress)
 
     return fetch(
         token, 
         'post', 
         'files/upload', 
-        files={'file': (name, data, mime_type)}, 
+        files=data, 
         response_schema=Attachment
     )
 
@@ -1,8 +1,11 @@
 from requests import Response
 from iter.request import fetch
-from iter.models.responses import NotificationListResponse, NotificationCountResponse, StatusResponse
+from iter.models.responses import NotificationListResponse, NotificationCountResponse, ReadBatchResponse, StatusResponse
 from uuid import UUID
 
+# ids the read-batch endpoint accepts at once
+MAX_READ_BATCH = 100
+
 def get_notifications(token: str, limit: int = 20, offset: int = 0, type: str | None = None) -> NotificationListResponse:
     data = {'limit': str(limit), 'cursor': str(offset)}
     if type:
@@ -10,14 +13,14 @@ def get_notifications(token: str, limit: int = 20, offset: int = 0, type: str |
     return fetch(token, 'get', 'notifications', data, response_schema=NotificationListResponse)
 
 def mark_as_read(token: str, id: UUID) -> Response:
-    return fetch(token, 'post', f'notifications/{id}/read')
+    return fetch(token, 'post', f'notifications/{id}/read', idempotent=True)
 
-def mark_batch_as_read(token: str, ids: list[UUID]) -> Response:
-    data = {'ids': ids}
-    return fetch(token, 'post', 'notifications/read-batch', data)
+def mark_batch_as_read(token: str, ids: list[UUID]) -> ReadBatchResponse:
+    data = {'ids': [str(id) for id in ids]}
+    return fetch(token, 'post', 'notifications/read-batch', data, response_schema=ReadBatchResponse, idempotent=True)
 
 def mark_all_as_read(token: str) ->Response:
-    return fetch(token, 'post', 'notifications/read-all')
+    return fetch(token, 'post', 'notifications/read-all', idempotent=True)
 
 def get_unread_notifications_count(token: str) -> NotificationCountResponse:
     return fetch(token, 'get', 'notifications/count', response_schema=NotificationCountResponse)
\ No newline at end of file
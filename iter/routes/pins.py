@@ -7,7 +7,7 @@ def get_pins(token: str) -> PinsListResponse | Error:
     return fetch(token, 'get', 'users/me/pins', response_schema=PinsListResponse)
 
 def remove_pin(token: str) -> Response:
-    return fetch(token, 'delete', 'users/me/pin')
+    return fetch(token, 'delete', 'users/me/pin', idempotent=True)
 
 def set_pin(token: str, slug: str):
-    return fetch(token, 'put', 'users/me/pin', {'slug': slug}, response_schema=SetPinResponse)
\ No newline at end of file
+    return fetch(token, 'put', 'users/me/pin', {'slug': slug}, response_schema=SetPinResponse, idempotent=True)
\ No newline at end of file
@@ -3,7 +3,7 @@ from typing import List
 from iter.models.span import Span
 from iter.request import fetch
 from iter.models.post import Post
-from iter.models.responses import PostFeedResponse, Post, PostUpdateResponse, PinResponse
+from iter.models.responses import PostFeedResponse, Post, PostUpdateResponse, PinResponse, LikeResponse
 from iter.models.media import NewPoll
 from requests import Response
 from iter.models.base import Error
@@ -63,8 +63,8 @@ def get_user_posts(token: str, username_or_id: str | UUID, limit: int = 20, curs
 def restore_post(token: str, post_id: UUID) -> Response:
     return fetch(token, "post", f"posts/{post_id}/restore")
 
-def like_post(token: str, post_id: UUID):
-    return fetch(token, "post", f"posts/{post_id}/like")
+def like_post(token: str, post_id: UUID) -> LikeResponse | Error:
+    return fetch(token, "post", f"posts/{post_id}/like", response_schema=LikeResponse)
 
-def unlike_post(token: str, post_id: UUID):
-    return fetch(token, "delete", f"posts/{post_id}/like")
\ No newline at end of file
+def unlike_post(token: str, post_id: UUID) -> LikeResponse | Error:
+    return fetch(token, "delete", f"posts/{post_id}/like", response_schema=LikeResponse, idempotent=True)
\ No newline at end of file
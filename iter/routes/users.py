@@ -21,13 +21,13 @@ def update_profile(token: str, bio: str | None = None, display_name: str | None
     return fetch(token, 'put', 'users/me', data, response_schema=ProfileUpdateResponse)
 
 def update_privacy(token: str, privacy: UserPrivacyData) -> PrivacyUpdateResponse | Error:
-    return fetch(token, 'put', 'users/me/privacy', privacy.to_dict(), response_schema=PrivacyUpdateResponse)
+    return fetch(token, 'put', 'users/me/privacy', privacy.to_dict(), response_schema=PrivacyUpdateResponse, idempotent=True)
 
 def follow(token: str, username: str) -> FollowResponse | Error:
     return fetch(token, 'post', f'users/{username}/follow', response_schema=FollowResponse)
 
 def unfollow(token: str, username: str) -> FollowResponse | Error:
-    return fetch(token, 'delete', f'users/{username}/follow', response_schema=FollowResponse)
+    return fetch(token, 'delete', f'users/{username}/follow', response_schema=FollowResponse, idempotent=True)
 
 def get_followers(token: str, username: str, limit: int = 30, page: int = 1) -> UserListResponse | Error:
     return fetch(token, 'get', f'users/{username}/followers', {'limit': limit, 'page': page}, response_schema=UserListResponse)
@@ -0,0 +1,189 @@
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, TypedDict
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+
+def write_atomic(path: str, text: str):
+    """Replace `path` with `text` so readers see the old or the new content, never a part"""
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with open(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class Session(TypedDict):
+    token: Optional[str]
+    cookies: Optional[str]
+
+
+class FileLock:
+    """Exclusive lock between processes (and threads) on a lock file
+
+    Uses `flock` on POSIX and `msvcrt.locking` on Windows, so the lock is
+    released by the OS if the holding process dies.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def acquire(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError: # gives up after 10 seconds
+                        pass
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def release(self):
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class SessionStore:
+    """Where a client keeps its token and refresh cookies
+
+    Several clients (threads or processes) of one account can share a store.
+    A client refreshes its token under `lock()` and first checks with `load()`
+    whether another one already has: then it takes the stored token and
+    cookies instead of refreshing again with a rotated cookie.
+    """
+    def load(self) -> Optional[Session]:
+        """Saved session, None if there is none"""
+        raise NotImplementedError
+
+    def save(self, session: Session):
+        raise NotImplementedError
+
+    def lock(self) -> FileLock:
+        """Exclusive lock held while refreshing the session"""
+        raise NotImplementedError
+
+    def snapshot_path(self) -> Optional[str]:
+        """File next to the session for the client's `Snapshot`, None if the store has no place for one"""
+        return None
+
+
+class FileSessionStore(SessionStore):
+    """Session in a JSON file (the `session.json` format)
+
+    The file is replaced atomically (write to a temporary file, then rename),
+    so readers never see a half-written session, and refreshes are serialized
+    with a `<path>.lock` file.
+    """
+    def __init__(self, path: str = 'session.json'):
+        """
+        Args:
+            path (str, optional): JSON file with `token` and `cookies`. Defaults to 'session.json'.
+        """
+        self.path = path
+
+    def load(self) -> Optional[Session]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {'token': data.get('token'), 'cookies': data.get('cookies')}
+
+    def save(self, session: Session):
+        write_atomic(self.path, json.dumps({'token': session['token'], 'cookies': session['cookies']}, indent=4))
+
+    def lock(self) -> FileLock:
+        return FileLock(f'{self.path}.lock')
+
+    def snapshot_path(self) -> str:
+        return os.path.splitext(self.path)[0] + '.snapshot.json'
+
+    def __repr__(self) -> str:
+        return f'<FileSessionStore {self.path!r}>'
+
+
+class SqliteSessionStore(SessionStore):
+    """Sessions of one or more accounts in a SQLite database
+
+    Every account is a row keyed by `name`. Writes are transactions, so
+    processes on one machine can share the database safely.
+    """
+    def __init__(self, path: str = 'sessions.db', name: str = 'default'):
+        """
+        Args:
+            path (str, optional): Database file. Defaults to 'sessions.db'.
+            name (str, optional): Account the session belongs to. Defaults to 'default'.
+        """
+        self.path = path
+        self.name = name
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('CREATE TABLE IF NOT EXISTS sessions (name TEXT PRIMARY KEY, token TEXT, cookies TEXT, updated_at REAL)')
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db: # commits or rolls back
+                yield db
+        finally:
+            db.close()
+
+    def load(self) -> Optional[Session]:
+        with self._connect() as db:
+            row = db.execute('SELECT token, cookies FROM sessions WHERE name = ?', (self.name,)).fetchone()
+        return {'token': row[0], 'cookies': row[1]} if row else None
+
+    def save(self, session: Session):
+        with self._connect() as db:
+            db.execute(
+                'INSERT INTO sessions (name, token, cookies, updated_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET token = excluded.token, cookies = excluded.cookies, updated_at = excluded.updated_at',
+                (self.name, session['token'], session['cookies'], time.time())
+            )
+
+    def lock(self) -> FileLock:
+        return FileLock(f'{self.path}.{self.name}.lock')
+
+    def snapshot_path(self) -> str:
+        return f'{os.path.splitext(self.path)[0]}.{self.name}.snapshot.json'
+
+    def __repr__(self) -> str:
+        return f'<SqliteSessionStore {self.path!r} {self.name!r}>'
@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional
+
+import verboselogs
+from pydantic import BaseModel, ValidationError
+from requests import Response
+
+from iter.session import write_atomic
+
+logger = verboselogs.VerboseLogger(__name__)
+
+# format of the file, snapshots of other versions are ignored
+SNAPSHOT_VERSION = 1
+
+# seconds an item is used without asking the server, per item
+DEFAULT_MAX_AGE: Dict[str, float] = {
+    'me': 3600,
+    'pins': 3600,
+    'platform_status': 300,
+    'verification_status': 3600,
+}
+
+
+class Snapshot:
+    """Client state kept between runs, so a new process starts without requests
+
+    Items are the current user (`me`), `pins`, `platform_status` and
+    `verification_status`, stored as versioned JSON next to the session file.
+    A client returns an item without a request while it is younger than its
+    `max_age`, and revalidates items older than `revalidate_after` in a
+    background thread after starting. The snapshot of another account (by the
+    token's `sub`) or of another format version is ignored.
+    """
+    def __init__(self, path: str, max_age: Optional[Mapping[str, float]] = None, revalidate_after: float = 60):
+        """
+        Args:
+            path (str): JSON file of the snapshot.
+            max_age (Mapping[str, float] | None, optional): Seconds per item, merged over `DEFAULT_MAX_AGE`. Defaults to None.
+            revalidate_after (float, optional): Age in seconds from which a starting client fetches an item again in the background. Defaults to 60.
+        """
+        self.path = path
+        self.max_age = {**DEFAULT_MAX_AGE, **(max_age or {})}
+        self.revalidate_after = revalidate_after
+        self.account: Optional[str] = None
+        self._items: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, account: Optional[str] = None):
+        """Read the file, keeping nothing if it is of another version or another `account`"""
+        self.account = account
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load snapshot: {e}")
+            return
+        if data.get('version') != SNAPSHOT_VERSION:
+            return
+        if account is not None and data.get('account') is not None and data['account'] != account:
+            return
+        with self._lock:
+            self._items = data.get('items', {})
+
+    def age(self, name: str) -> Optional[float]:
+        """Seconds since the item was stored, None if there is none"""
+        with self._lock:
+            item = self._items.get(name)
+        return time.time() - item['saved_at'] if item else None
+
+    def get(self, name: str, schema: Optional[type[BaseModel]] = None) -> Any:
+        """Stored item as a `schema` model (a `Response` without one), None if missing or older than its max age"""
+        with self._lock:
+            item = self._items.get(name)
+        if item is None or time.time() - item['saved_at'] >= self.max_age.get(name, 0):
+            self.misses += 1
+            return None
+        if schema is not None:
+            try:
+                value = schema.model_validate(item['data'])
+            except ValidationError:
+                # stored by a release whose model differs
+                self.discard(name)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return value
+        self.hits += 1
+        res = Response()
+        res.status_code = 200
+        res._content = item['data'].encode()
+        res.encoding = 'utf-8'
+        res.headers['Content-Type'] = 'application/json'
+        return res
+
+    def put(self, name: str, value: BaseModel | Response) -> bool:
+        """Store a successful result, returns False if `value` can not be stored"""
+        if isinstance(value, BaseModel):
+            data: Any = value.model_dump(mode='json', exclude_none=False)
+        elif isinstance(value, Response) and value.ok:
+            data = value.text
+        else:
+            return False
+        with self._lock:
+            self._items[name] = {'saved_at': time.time(), 'data': data}
+        return True
+
+    def stale(self) -> List[str]:
+        """Stored items due for revalidation"""
+        now = time.time()
+        with self._lock:
+            return [name for name, item in self._items.items() if now - item['saved_at'] >= self.revalidate_after]
+
+    def discard(self, name: str):
+        with self._lock:
+            self._items.pop(name, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def save(self):
+        with self._lock:
+            text = json.dumps({'version': SNAPSHOT_VERSION, 'account': self.account, 'items': self._items}, ensure_ascii=False)
+        try:
+            write_atomic(self.path, text)
+        except OSError as e:
+            logger.warning(f"Failed to save snapshot: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            names = list(self._items)
+        return {'items': {name: round(self.age(name) or 0, 1) for name in names}, 'hits': self.hits, 'misses': self.misses}
+
+    def __repr__(self) -> str:
+        return f'<Snapshot {self.path!r}>'
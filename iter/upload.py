@@ -0,0 +1,134 @@
+import mimetypes
+import os
+from typing import AsyncIterator, BinaryIO, Callable, Iterator, Optional, Tuple
+from uuid import uuid4
+
+# bytes read from the source at a time
+CHUNK_SIZE = 64 * 1024
+# slowest upload speed (bytes/s) the timeout allows for
+MIN_UPLOAD_RATE = 64 * 1024
+
+Progress = Callable[[int, int], None]
+Source = str | os.PathLike | bytes | bytearray | memoryview | BinaryIO
+# a path, or a (filename, source) pair
+Upload = str | os.PathLike | Tuple[str, Source]
+
+
+def upload_timeout(size: int, base: float = 120) -> float:
+    """Seconds to wait for an upload of `size` bytes"""
+    return max(base, size / MIN_UPLOAD_RATE)
+
+
+class MultipartUpload:
+    """`multipart/form-data` body with one file, streamed from its source
+
+    The body is produced chunk by chunk while it is sent, so memory use does
+    not depend on the file size. `source` is a path (opened while sending), a
+    bytes-like object or a binary file object. Seekable files are read from
+    their current position and rewound when the body is sent again (e.g. after
+    a token refresh); other streams are read into memory once, as their size
+    must be known for `Content-Length`.
+
+    Pass it as `files` to `fetch`. Iterating (sync or async) yields the body.
+    """
+    def __init__(self, source: Source, filename: Optional[str] = None, mime_type: Optional[str] = None, field: str = 'file', progress: Optional[Progress] = None, chunk_size: int = CHUNK_SIZE):
+        """
+        Args:
+            source (str | PathLike | bytes | BinaryIO): File to upload.
+            filename (str | None, optional): Name sent to the server. Taken from the path or file object if None. Defaults to None.
+            mime_type (str | None, optional): Content type, guessed from the filename if None. Defaults to None.
+            field (str, optional): Form field name. Defaults to 'file'.
+            progress (Callable[[int, int], None] | None, optional): Called with `(bytes sent, total bytes)` after every chunk. Defaults to None.
+            chunk_size (int, optional): Bytes read at a time. Defaults to 64 KiB.
+        """
+        self.progress = progress
+        self.chunk_size = chunk_size
+        self._path: Optional[str] = None
+        self._file: Optional[BinaryIO] = None
+        self._data: Optional[memoryview] = None
+
+        if isinstance(source, (str, os.PathLike)):
+            self._path = os.fspath(source)
+            self.size = os.path.getsize(self._path)
+            filename = filename or os.path.basename(self._path)
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            self._data = memoryview(source).cast('B')
+            self.size = self._data.nbytes
+        else:
+            if filename is None and isinstance(getattr(source, 'name', None), str):
+                filename = os.path.basename(source.name)
+            if source.seekable():
+                self._file = source
+                self._start = source.tell()
+                self.size = source.seek(0, os.SEEK_END) - self._start
+                source.seek(self._start)
+            else:
+                self._data = memoryview(source.read())
+                self.size = self._data.nbytes
+
+        self.filename = filename or 'file'
+        self.mime_type = mime_type or mimetypes.guess_type(self.filename)[0] or 'application/octet-stream'
+        self.boundary = uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+
+        name = self.filename.replace('\\', '\\\\').replace('"', '\\"')
+        self._head = (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field}"; filename="{name}"\r\n'
+            f'Content-Type: {self.mime_type}\r\n\r\n'
+        ).encode()
+        self._tail = f'\r\n--{self.boundary}--\r\n'.encode()
+
+    def __len__(self) -> int:
+        return len(self._head) + self.size + len(self._tail)
+
+    @property
+    def timeout(self) -> float:
+        return upload_timeout(len(self))
+
+    def iter_content(self) -> Iterator[bytes]:
+        """File content in chunks, without the multipart framing"""
+        if self._data is not None:
+            for offset in range(0, self.size, self.chunk_size):
+                yield self._data[offset:offset + self.chunk_size].tobytes()
+            return
+
+        file = open(self._path, 'rb') if self._path is not None else self._file
+        try:
+            if self._path is None:
+                file.seek(self._start)
+            remaining = self.size
+            while remaining > 0:
+                chunk = file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    raise IOError(f'{self.filename} is shorter than {self.size} bytes')
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            if self._path is not None:
+                file.close()
+
+    def __iter__(self) -> Iterator[bytes]:
+        total = len(self)
+        sent = len(self._head)
+        yield self._head
+        for chunk in self.iter_content():
+            sent += len(chunk)
+            if self.progress:
+                self.progress(sent, total)
+            yield chunk
+        yield self._tail
+        if self.progress:
+            self.progress(total, total)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        # file reads are short (one chunk), so they do not block the loop for long
+        for chunk in self:
+            yield chunk
+
+    def to_bytes(self) -> bytes:
+        """Whole body in memory, for small uploads and tests"""
+        return b''.join(self)
+
+    def __repr__(self) -> str:
+        return f'<MultipartUpload {self.filename!r} {self.mime_type} {self.size} bytes>'
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+from uuid import UUID
+
+import verboselogs
+
+from iter.models.media import Attachment
+from iter.upload import MultipartUpload
+
+logger = verboselogs.VerboseLogger(__name__)
+
+
+def content_key(upload: MultipartUpload, account: Optional[str] = None) -> str:
+    """`account:sha256:size:mime` of an upload, reads its source once"""
+    digest = hashlib.sha256()
+    for chunk in upload.iter_content():
+        digest.update(chunk)
+    return f'{account or ""}:{digest.hexdigest()}:{upload.size}:{upload.mime_type}'
+
+
+class UploadCache:
+    """Attachments of already uploaded content, keyed by content hash
+
+    Uploading identical content again returns the stored `Attachment` instead
+    of sending the bytes. Entries are checked with `get_file` before reuse
+    unless they were checked less than `verify_interval` seconds ago, and are
+    dropped when the file is deleted or the server no longer has it. With a
+    `path`, entries are kept in a JSON file between runs.
+    """
+    def __init__(self, path: Optional[str] = None, verify_interval: float = 3600):
+        """
+        Args:
+            path (str | None, optional): JSON file the entries are stored in, None to keep them in memory. Defaults to None.
+            verify_interval (float, optional): Seconds an entry is reused without asking the server if the file still exists, 0 to always check. Defaults to 3600.
+        """
+        self.path = path
+        self.verify_interval = verify_interval
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0 # uploads skipped
+        self.misses = 0
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Failed to load upload cache: {e}")
+
+    def lookup(self, key: str, check: Callable[[Attachment], Optional[Attachment]]) -> Optional[Attachment]:
+        """Stored attachment of `key`, None if the content has to be uploaded
+
+        Args:
+            key (str): `content_key` of the upload.
+            check (Callable[[Attachment], Attachment | None]): Called with a stale entry, returns the file as the server has it or None if it is gone.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        attachment = Attachment.model_validate(entry['attachment'])
+        if time.time() - entry['verified'] >= self.verify_interval:
+            attachment = check(attachment)
+            if attachment is None:
+                self.discard(key)
+                self.misses += 1
+                return None
+            self.put(key, attachment)
+        self.hits += 1
+        return attachment
+
+    def put(self, key: str, attachment: Attachment):
+        """Store an uploaded (or re-checked) attachment"""
+        with self._lock:
+            self._entries[key] = {'attachment': attachment.model_dump(mode='json'), 'verified': time.time()}
+            self._save()
+
+    def discard(self, key: str):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def discard_id(self, id: UUID | str):
+        """Drop entries of a deleted file"""
+        id = str(id)
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry['attachment']['id'] == id]
+            for key in keys:
+                del self._entries[key]
+            if keys:
+                self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        # write-rename, so a crash never leaves a truncated file
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f)
+        os.replace(tmp, self.path)
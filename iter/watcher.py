@@ -0,0 +1,328 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+import verboselogs
+
+from iter.enums import NotificationType
+from iter.models.notification import Notification
+from iter.routes.notifications import MAX_READ_BATCH
+
+logger = verboselogs.VerboseLogger(__name__)
+
+Handler = Callable[[Notification], None]
+
+
+class NotificationWatcher:
+    """Calls handlers for new notifications, polling only the unread counter
+
+    The cheap `get_unread_notifications_count` is polled with an adaptive
+    interval: it drops to `min_interval` when something happens and grows by
+    `backoff` on every idle poll up to `max_interval`. Notifications are only
+    fetched when the counter changes, and only of the types handlers are
+    registered for (with the API's `type` filter), then passed to the handlers
+    on a thread pool, oldest first. With `acks`, handled notifications are
+    marked as read in batches.
+
+        watcher = NotificationWatcher(client)
+
+        @watcher.on(NotificationType.FOLLOW)
+        def greet(notification):
+            client.follow(notification.actor.username)
+
+        watcher.run()
+    """
+    def __init__(self, client, min_interval: float = 2, max_interval: float = 60, backoff: float = 1.5, max_workers: int = 4, skip_existing: bool = True, acks: 'AckQueue | bool' = False):
+        """
+        Args:
+            client (Client): Client polling the notifications.
+            min_interval (float, optional): Seconds between polls while there is activity. Defaults to 2.
+            max_interval (float, optional): Longest wait between polls when idle. Defaults to 60.
+            backoff (float, optional): Factor the interval grows by after an idle poll. Defaults to 1.5.
+            max_workers (int, optional): Handlers running at the same time. Defaults to 4.
+            skip_existing (bool, optional): Ignore notifications that exist when the watcher starts. Defaults to True.
+            acks (AckQueue | bool, optional): Queue that marks notifications as read once their handlers succeed, True to create one. Defaults to False.
+        """
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_workers = max_workers
+        self.skip_existing = skip_existing
+        self.interval = min_interval
+        if acks is True:
+            acks = AckQueue(client)
+        self.acks = acks or None
+
+        # None is the key of handlers of every type
+        self._handlers: Dict[Optional[NotificationType], List[Handler]] = {}
+        self._seen: Set[UUID] = set()
+        self._seen_order: Deque[UUID] = deque()
+        # newest seen notification per type filter (None for all types)
+        self._since: Dict[Optional[NotificationType], datetime] = {}
+        self._baselined: Set[Optional[NotificationType]] = set()
+        self._count: Optional[int] = None
+        self._acked = 0 # `acks.acked` at the last poll
+        self._stop = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+
+        self.polls = 0
+        self.fetches = 0
+        self.dispatched = 0
+
+    def add_handler(self, handler: Handler, *types: NotificationType):
+        """Call `handler` with new notifications of `types` (of every type if none given)"""
+        for type in types or (None,):
+            self._handlers.setdefault(type, []).append(handler)
+
+    def on(self, *types: NotificationType) -> Callable[[Handler], Handler]:
+        """Decorator form of `add_handler`"""
+        def decorator(handler: Handler) -> Handler:
+            self.add_handler(handler, *types)
+            return handler
+        return decorator
+
+    def _types(self) -> Iterable[Optional[NotificationType]]:
+        """Type filters to fetch with, [None] to fetch everything at once"""
+        if None in self._handlers or not self._handlers:
+            return [None]
+        return list(self._handlers)
+
+    def _remember(self, id: UUID):
+        self._seen.add(id)
+        self._seen_order.append(id)
+        if len(self._seen_order) > 1000:
+            self._seen.discard(self._seen_order.popleft())
+
+    def _new(self, type: Optional[NotificationType], expected: int) -> List[Notification]:
+        """Notifications of `type` newer than the last dispatched ones, newest first"""
+        # one more than expected, so the first page already reaches a seen notification,
+        # within the endpoint's default limit
+        page_size = min(expected + 1, 20)
+        since = self._since.get(type)
+        # without a baseline nothing marks the end, so only the unread ones are taken
+        limit = max(expected, 1) if since is None else None
+        found = []
+        # the pager stops requesting pages as soon as the loop breaks
+        for notification in self.client.iter_notifications(type, page_size=page_size, prefetch=False):
+            # newest first: everything after a dispatched notification is older
+            if notification.id in self._seen or (since is not None and notification.createdAt < since):
+                break
+            found.append(notification)
+            if limit is not None and len(found) >= limit:
+                break
+        if found:
+            self._since[type] = found[0].createdAt if since is None else max(since, found[0].createdAt)
+        return found
+
+    def _baseline(self, type: Optional[NotificationType]):
+        """Start after the newest existing notification of `type`"""
+        self._baselined.add(type)
+        res = self.client.get_notifications(1, type=type)
+        if res.notifications:
+            self._since[type] = res.notifications[0].createdAt
+            self._remember(res.notifications[0].id)
+
+    def poll(self) -> int:
+        """Check the counter once and dispatch new notifications, returns how many"""
+        self.polls += 1
+        count = self.client.get_unread_notifications_count().count
+        previous, self._count = self._count, count
+        acked = self.acks.acked if self.acks is not None else 0
+        own, self._acked = acked - self._acked, acked
+        types = self._types()
+        if self.skip_existing:
+            # types of handlers added since the last poll start after their newest notification too
+            for type in types:
+                if type not in self._baselined:
+                    self._baseline(type)
+            if previous is None:
+                return 0
+        # the count also drops when notifications are read, by our acks or elsewhere
+        expected = count - (previous - own) if previous is not None else count
+        if expected <= 0:
+            return 0
+
+        self.fetches += 1
+        notifications: Dict[UUID, Notification] = {}
+        for type in types:
+            for notification in self._new(type, expected):
+                notifications[notification.id] = notification
+
+        new = sorted(notifications.values(), key=lambda n: n.createdAt)
+        for notification in new:
+            self._remember(notification.id)
+            self._dispatch(notification)
+        return len(new)
+
+    def _dispatch(self, notification: Notification):
+        handlers = self._handlers.get(notification.type, []) + self._handlers.get(None, [])
+        self.dispatched += 1
+        if self._executor is None:
+            self._handle(handlers, notification)
+        else:
+            self._executor.submit(self._handle, handlers, notification)
+
+    def _handle(self, handlers: List[Handler], notification: Notification):
+        ok = True
+        for handler in handlers:
+            try:
+                handler(notification)
+            except Exception:
+                ok = False
+                logger.exception(f"Notification handler {getattr(handler, '__name__', handler)} failed")
+        # a notification stays unread if one of its handlers failed
+        if ok and self.acks is not None:
+            self.acks.ack(notification.id)
+
+    def run(self):
+        """Poll until `stop()`, blocking the calling thread"""
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='iter-notify')
+        try:
+            while not self._stop.is_set():
+                try:
+                    active = self.poll() > 0
+                except Exception as e:
+                    logger.warning(f"Notification poll failed: {e}")
+                    active = False
+                self.interval = self.min_interval if active else min(self.interval * self.backoff, self.max_interval)
+                self._stop.wait(self.interval)
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            if self.acks is not None:
+                self.acks.flush()
+
+    def start(self) -> threading.Thread:
+        """Run in a background thread"""
+        self._thread = threading.Thread(target=self.run, name='iter-notifications', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, wait: bool = True):
+        """Stop polling, waiting for running handlers if `wait`"""
+        self._stop.set()
+        if wait and self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+class AckQueue:
+    """Collects notification ids and marks them as read in bulk
+
+    `ack()` only queues the id; a background thread sends them with
+    `mark_batch_as_read` when `max_batch` ids are queued or the oldest one has
+    waited `max_delay` seconds. `close()` (or leaving the `with` block) sends
+    the rest. Ids of a failed request are queued again for the next flush.
+
+        with AckQueue(client) as acks:
+            for notification in notifications:
+                handle(notification)
+                acks.ack(notification.id)
+    """
+    def __init__(self, client, max_batch: int = MAX_READ_BATCH, max_delay: float = 2):
+        """
+        Args:
+            client (Client): Client marking the notifications.
+            max_batch (int, optional): Ids sent in one request. Defaults to `MAX_READ_BATCH` (100).
+            max_delay (float, optional): Seconds an id waits at most before it is sent. Defaults to 2.
+        """
+        self.client = client
+        self.max_batch = min(max_batch, MAX_READ_BATCH)
+        self.max_delay = max_delay
+
+        self._ids: Dict[UUID, None] = {} # ordered set
+        self._oldest: Optional[float] = None
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='iter-ack', daemon=True)
+        self._thread.start()
+
+        self.acked = 0
+        self.requests = 0
+
+    def ack(self, id: UUID):
+        """Queue a notification to be marked as read"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('AckQueue is closed')
+            self._ids[id] = None
+            if self._oldest is None:
+                # start the time window
+                self._oldest = time.monotonic()
+                self._cond.notify()
+            elif len(self._ids) >= self.max_batch:
+                self._cond.notify()
+
+    @property
+    def pending(self) -> int:
+        """Ids waiting to be sent"""
+        return len(self._ids)
+
+    def _take(self) -> List[UUID]:
+        ids = list(self._ids)[:self.max_batch]
+        for id in ids:
+            del self._ids[id]
+        self._oldest = time.monotonic() if self._ids else None
+        return ids
+
+    def flush(self):
+        """Send every queued id now"""
+        while True:
+            with self._cond:
+                ids = self._take()
+            if not ids:
+                return
+            if not self._send(ids):
+                return
+
+    def _send(self, ids: List[UUID]) -> bool:
+        with self._flush_lock:
+            try:
+                self.client.mark_batch_as_read(ids)
+            except Exception as e:
+                logger.warning(f"Failed to mark {len(ids)} notifications as read: {e}")
+                with self._cond:
+                    # keep them for the next flush, before ids queued since
+                    self._ids = {**dict.fromkeys(ids), **self._ids}
+                    self._oldest = time.monotonic()
+                return False
+            self.requests += 1
+            self.acked += len(ids)
+            return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and len(self._ids) < self.max_batch:
+                    timeout = None if self._oldest is None else self._oldest + self.max_delay - time.monotonic()
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if self._closed:
+                    return
+                ids = self._take()
+            if ids:
+                self._send(ids)
+
+    def close(self):
+        """Stop the background thread and send the queued ids"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
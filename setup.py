@@ -9,5 +9,11 @@ setup(
     install_requires=[
         'requests', 'DrissionPage', 'verboselogs'
     ],
+    extras_require={
+        'async': ['httpx'],
+        'fast': ['orjson'],
+        'http2': ['httpx[http2,brotli,zstd]'],
+        'test': ['pytest'],
+    },
     python_requires=">=3.9"
 )
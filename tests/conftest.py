@@ -0,0 +1,22 @@
+import pytest
+
+from iter.fake_server import FakeServer
+from iter.retry import RetryPolicy
+
+
+@pytest.fixture
+def server() -> FakeServer:
+    return FakeServer(seed=1)
+
+
+@pytest.fixture
+def users(server) -> list:
+    return server.populate(users=20, posts_per_user=2, comments_per_post=0, follows_per_user=3)
+
+
+@pytest.fixture
+def client(server, users):
+    # short backoff, so retried requests do not slow the tests down
+    client = server.client(users[0], retry_policy=RetryPolicy(backoff=0.01))
+    server.calls.clear()
+    return client
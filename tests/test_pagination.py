@@ -0,0 +1,27 @@
+import pytest
+
+
+@pytest.fixture
+def star(server, users) -> dict:
+    star = server.add_user('star')
+    for user in users:
+        server.add_follow(user, star)
+    return star
+
+
+def test_pager_resumes_from_position(users, client, star):
+    expected = [user.username for user in client.iter_followers('star', page_size=6)]
+    assert sorted(expected) == sorted(user['username'] for user in users)
+
+    first = client.iter_followers('star', page_size=6, prefetch=False)
+    taken = [next(first).username for _ in range(8)]
+    rest = [user.username for user in client.iter_followers('star', position=first.position)]
+
+    assert taken + rest == expected
+
+
+def test_pager_stops_at_limit(server, client, star):
+    pager = client.iter_followers('star', limit=2, page_size=1, prefetch=False)
+
+    assert len(list(pager)) == 2
+    assert server.calls['GET users/{username}/followers'] == 2
@@ -0,0 +1,81 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+from iter.models.base import Error
+
+
+def run_together(count: int, func, args: list) -> list:
+    barrier = Barrier(count)
+
+    def call(arg):
+        barrier.wait()
+        return func(arg)
+
+    with ThreadPoolExecutor(count) as executor:
+        return list(executor.map(call, args))
+
+
+def test_identical_reads_are_sent_once(server, users, client):
+    server.latency = 0.2
+    results = run_together(10, client.get_user, [users[1]['username']] * 10)
+
+    assert server.calls['GET users/{username}'] == 1
+    assert {user.username for user in results} == {users[1]['username']}
+
+
+def test_concurrent_expired_tokens_refresh_once(server, users, client):
+    server.expire_tokens()
+    names = [user['username'] for user in users]
+    results = run_together(20, client.get_user, names)
+
+    assert server.calls['POST v1/auth/refresh'] == 1
+    assert [user.username for user in results] == names
+
+
+def test_async_expired_tokens_refresh_once(server, users):
+    client = server.async_client(users[0])
+    server.expire_tokens()
+    names = [user['username'] for user in users]
+
+    async def main():
+        return await asyncio.gather(*(client.get_user(name) for name in names))
+
+    results = asyncio.run(main())
+    assert server.calls['POST v1/auth/refresh'] == 1
+    assert [user.username for user in results] == names
+
+
+def test_read_is_retried_after_server_errors(server, users, client):
+    server.fail(503, times=2)
+
+    assert client.get_user(users[1]['username']).username == users[1]['username']
+    assert server.calls['GET users/{username}'] == 3
+
+
+def test_retries_stop_at_max_retries(server, users, client):
+    server.fail(503, times=10)
+
+    assert isinstance(client.get_user(users[1]['username']), Error)
+    assert server.calls['GET users/{username}'] == 1 + client.retry_policy.max_retries
+
+
+def test_like_is_not_retried(server, users, client):
+    post = next(post for post in server.posts.values() if post['authorId'] != users[0]['id'])
+    server.fail(503)
+
+    assert isinstance(client.like_post(post['id']), Error)
+    assert server.calls['POST posts/{id}/like'] == 1
+
+
+def test_unchanged_resource_is_revalidated(server, users):
+    client = server.client(users[0], validator_cache=True)
+    name = users[1]['username']
+
+    first = client.get_user(name)
+    assert client.get_user(name) is first
+    assert client.validator_cache.not_modified == 1
+
+    users[1]['displayName'] = 'Renamed'
+    assert client.get_user(name).display_name == 'Renamed'
+    assert client.validator_cache.not_modified == 1
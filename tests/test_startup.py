@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from iter.fake_server import FakeServer
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# imported only by the features that need them
+LAZY_MODULES = ('DrissionPage', 'iter.manual_auth', 'iter.async_client')
+
+
+def imported_modules(statement: str) -> set:
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=ROOT, capture_output=True, text=True, check=True)
+    return {line.rsplit('|', 1)[1].strip() for line in result.stderr.splitlines() if line.startswith('import time:') and 'self [us]' not in line}
+
+
+def test_import_skips_lazy_modules():
+    modules = imported_modules('import iter')
+    assert 'iter.client' in modules
+    for name in LAZY_MODULES:
+        assert name not in modules
+
+
+def test_lazy_me_requests_nothing_until_read():
+    srv = FakeServer()
+    user = srv.add_user('lazy')
+    client = srv.client(user, lazy_me=True)
+    assert sum(srv.calls.values()) == 0
+
+    assert client.me.username == 'lazy'
+    assert sum(srv.calls.values()) == 1
+    client.me
+    assert sum(srv.calls.values()) == 1